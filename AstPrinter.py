@@ -1,12 +1,37 @@
+import io
+import json
+import sys
 import Expr
+import Stmt
+import Scanner
+from PrattParser import PrattParser
 from TokenType import *
 from Token import Token
-from typing import List
+from LazyBody import LazyBody
+from ErrorReporter import ErrorHandling
+from typing import Callable, Dict, List, TextIO
 
-class AstPrinter(Expr.Visitor[str]):
+class AstPrinter:
+
+    # Writes trees to a text stream as S-expressions or as JSON lines,
+    # one top-level statement per line. A node is expanded into a list
+    # of parts (strings, nodes and lists of nodes) pushed onto an
+    # explicit stack, so output is streamed in one linear pass and
+    # nesting depth is bounded by memory rather than the Python stack.
+    FORMATS = ("sexpr", "json")
 
     @staticmethod
     def main(args: List[str]):
+        if args:
+            format = "json" if "--json" in args else "sexpr"
+            paths = [arg for arg in args if not arg.startswith("--")]
+            with open(paths[0], "r") as file:
+                source = file.read()
+            statements = PrattParser(Scanner.Scanner(source).scanTokens()).parse()
+            ErrorHandling.flush()
+            AstPrinter(sys.stdout, format).write(statements)
+            exit(65 if ErrorHandling.hadError else 0)
+
         expression: Expr = Expr.Binary(
             Expr.Unary(
                 Token(TokenType.MINUS, "-", None, 1),
@@ -20,37 +45,138 @@ class AstPrinter(Expr.Visitor[str]):
 
         print(AstPrinter().print(expression))
 
+    def __init__(self, out: TextIO = None, format: str = "sexpr"):
+        if format not in AstPrinter.FORMATS:
+            raise ValueError(f"Unknown AST format '{format}'.")
+        self.out = out
+        self.expand: Callable[[object], list] = self.sexpr if format == "sexpr" else self.json
+
     def print(self, expr: Expr) -> str:
-        return expr.accept(self)
-    
-    def visitBinaryExpr(self, expr: Expr.Binary) -> str:
-        return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
-    
-    def visitTernaryExpr(self, expr: Expr.Ternary) -> str:
-        return self.parenthesize("?",expr.condition, expr.trueExpr, expr.falseExpr)
-
-    def visitUnaryExpr(self, expr: Expr.Unary) -> str:
-        return self.parenthesize(expr.operator.lexeme, expr.right)
-
-    def visitLiteralExpr(self, expr: Expr.Literal) -> str:
+        out = io.StringIO()
+        self.dump(expr, out.write)
+        return out.getvalue()
+
+    def write(self, statements: List[Stmt.Stmt]):
+        write = self.out.write
+        for statement in statements:
+            self.dump(statement, write)
+            write("\n")
+
+    def dump(self, root: object, write: Callable[[str], object]):
+        work: list = [root]
+        expand = self.expand
+        while work:
+            item = work.pop()
+            if type(item) is str:
+                write(item)
+            else:
+                parts = expand(item)
+                parts.reverse()
+                work.extend(parts)
+
+    # S-expressions
+
+    def sexpr(self, node: object) -> list:
+        if node is None:
+            return ["nil"]
+        if type(node) is Token:
+            return [node.lexeme]
+        if type(node) is LazyBody:
+            return [repr(node)]
+        if isinstance(node, list):
+            return AstPrinter.spaced(node, "[", "]")
+        if not isinstance(node, (Expr.Expr, Stmt.Stmt)):
+            return [str(node)]
+
+        form = SEXPR.get(type(node))
+        if form is None:
+            return AstPrinter.form(type(node).__name__, *vars(node).values())
+        return form(node)
+
+    @staticmethod
+    def form(head: str, *children: object) -> list:
+        parts: list = ["(" + head]
+        for child in children:
+            parts.append(" ")
+            parts.append(child)
+        parts.append(")")
+        return parts
+
+    @staticmethod
+    def spaced(items: List[object], opening: str, closing: str) -> list:
+        parts: list = [opening]
+        for index, item in enumerate(items):
+            if index:
+                parts.append(" ")
+            parts.append(item)
+        parts.append(closing)
+        return parts
+
+    @staticmethod
+    def literal(expr: Expr.Literal) -> list:
         if expr.value == None:
-            return 'nil'
-        return str(expr.value)
-
-    def visitGroupingExpr(self, expr: Expr.Grouping) -> str:
-        return self.parenthesize("group", expr.expression)
-    
-    def parenthesize(self, name: str, *exprs: Expr):
-        builder = ""
-        builder += f"({name}"
-        for expr in exprs:
-            builder += " "
-            builder += expr.accept(self)
-        
-        builder += ")"
-
-        return builder
-    
+            return ["nil"]
+        if isinstance(expr.value, bool):
+            return ["true" if expr.value else "false"]
+        if isinstance(expr.value, str):
+            return [json.dumps(expr.value)]
+        return [str(expr.value)]
+
+    # JSON lines
+
+    def json(self, node: object) -> list:
+        if node is None:
+            return ["null"]
+        if type(node) is Token:
+            return [json.dumps(node.lexeme)]
+        if type(node) is LazyBody:
+            return [json.dumps({"lazy": repr(node)})]
+        if isinstance(node, list):
+            parts: list = ["["]
+            for index, item in enumerate(node):
+                if index:
+                    parts.append(", ")
+                parts.append(item)
+            parts.append("]")
+            return parts
+        if not isinstance(node, (Expr.Expr, Stmt.Stmt)):
+            return [json.dumps(node)]
+
+        kind = "Expr" if isinstance(node, Expr.Expr) else "Stmt"
+        parts = [f'{{"node": "{kind}.{type(node).__name__}"']
+        for name, value in vars(node).items():
+            parts.append(f', "{name}": ')
+            parts.append(value if isinstance(value, (list, Expr.Expr, Stmt.Stmt, Token)) or value is None
+                         else json.dumps(value))
+        parts.append("}")
+        return parts
+
+SEXPR: Dict[type, Callable[[object], list]] = {
+    Expr.Assign: lambda e: AstPrinter.form("=", e.name, e.value),
+    Expr.Binary: lambda e: AstPrinter.form(e.operator.lexeme, e.left, e.right),
+    Expr.Call: lambda e: AstPrinter.form("call", e.callee, *e.arguments),
+    Expr.Grouping: lambda e: AstPrinter.form("group", e.expression),
+    Expr.Index: lambda e: AstPrinter.form("index", e.object, e.index),
+    Expr.Literal: AstPrinter.literal,
+    Expr.Logical: lambda e: AstPrinter.form(e.operator.lexeme, e.left, e.right),
+    Expr.SetIndex: lambda e: AstPrinter.form("set-index", e.object, e.index, e.value),
+    Expr.Ternary: lambda e: AstPrinter.form("?", e.condition, e.trueExpr, e.falseExpr),
+    Expr.Unary: lambda e: AstPrinter.form(e.operator.lexeme, e.right),
+    Expr.Variable: lambda e: [e.name.lexeme],
+    Expr.Yield: lambda e: AstPrinter.form("yield", e.value),
+    Stmt.Block: lambda s: AstPrinter.form("block", *s.statements)
+        if type(s.statements) is not LazyBody else AstPrinter.form("block", s.statements),
+    Stmt.Expression: lambda s: AstPrinter.form(";", s.expression),
+    Stmt.Function: lambda s: AstPrinter.form("fun" if s.memo is None else f"memo({s.memo}) fun",
+                                             s.name, s.params, s.body),
+    Stmt.If: lambda s: AstPrinter.form("if", s.condition, s.thenBranch, s.elseBranch),
+    Stmt.Import: lambda s: AstPrinter.form("import", s.path),
+    Stmt.Parallel: lambda s: AstPrinter.form("parallel", s.reduction, s.target, s.loop),
+    Stmt.Print: lambda s: AstPrinter.form("print", s.expression),
+    Stmt.Return: lambda s: AstPrinter.form("return", s.value),
+    Stmt.Var: lambda s: AstPrinter.form("var", s.name, s.initializer),
+    Stmt.While: lambda s: AstPrinter.form("while", s.condition, s.body),
+}
+
 if __name__ == "__main__":
-    import sys
-    AstPrinter.main(sys.argv[1:])    
\ No newline at end of file
+    AstPrinter.main(sys.argv[1:])
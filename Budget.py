@@ -0,0 +1,51 @@
+import time
+from Token import Token
+from ErrorReporter import BudgetExceeded
+
+class Budget:
+
+    # Loops and calls report their steps in batches of BATCH, so a limit
+    # can be overshot by up to one batch and the clock is read at most
+    # once per batch.
+    BATCH = 1024
+    # maxDepth caps call depth. Each call pushes one environment and
+    # blocks can only nest as deep as the source does, so this also
+    # bounds how deep the environment chain can grow.
+
+    def __init__(self, maxSteps: int = None, seconds: float = None, maxDepth: int = None):
+        self.maxSteps = maxSteps
+        self.seconds = seconds
+        self.maxDepth = maxDepth
+        self.start()
+
+    def start(self):
+        self.steps = 0
+        self.pending = 0
+        self.depth = 0
+        self.deadline = None if self.seconds is None else time.monotonic() + self.seconds
+
+    def charge(self, token: Token, steps: int):
+        self.steps += steps
+        if self.maxSteps is not None and self.steps > self.maxSteps:
+            raise BudgetExceeded(token, f"Execution budget of {self.maxSteps} steps exhausted.")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded(token, f"Execution time limit of {self.seconds} seconds exceeded.")
+
+    def tick(self, token: Token):
+        self.pending += 1
+        if self.pending >= Budget.BATCH:
+            steps, self.pending = self.pending, 0
+            self.charge(token, steps)
+
+    def settle(self, token: Token):
+        if self.pending >= Budget.BATCH:
+            steps, self.pending = self.pending, 0
+            self.charge(token, steps)
+
+    def enter(self, token: Token):
+        self.depth += 1
+        if self.maxDepth is not None and self.depth > self.maxDepth:
+            raise BudgetExceeded(token, f"Call depth limit of {self.maxDepth} exceeded.")
+
+    def leave(self):
+        self.depth -= 1
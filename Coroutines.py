@@ -0,0 +1,381 @@
+import asyncio
+import weakref
+from typing import Generator, List, Set
+import Expr
+import Stmt
+import Environment
+from TokenType import TokenType
+from ErrorReporter import LoxRuntimeError
+from NativeFunction import NativeFunction
+from Return import Return
+from LazyBody import LazyBody
+
+class YieldFinder(Expr.Visitor[bool], Stmt.Visitor[bool]):
+
+    # Collects the nodes of one function body that contain a yield, not
+    # counting nested functions. Only those nodes need the suspendable
+    # walker; everything else runs on the ordinary interpreter.
+    found: 'weakref.WeakKeyDictionary[Stmt.Function, Set[object]]' = weakref.WeakKeyDictionary()
+
+    def __init__(self):
+        self.suspending: Set[object] = set()
+
+    # Closures re-create LoxFunctions for the same declaration, so the
+    # scan is done once per declaration.
+    @staticmethod
+    def suspendingNodes(function: Stmt.Function) -> Set[object]:
+        suspending = YieldFinder.found.get(function)
+        if suspending is None:
+            suspending = YieldFinder().find(function)
+            YieldFinder.found[function] = suspending
+        return suspending
+
+    def find(self, function: Stmt.Function) -> Set[object]:
+        self.any(function.body)
+        return self.suspending
+
+    def any(self, nodes: List[object]) -> bool:
+        found = False
+        for node in nodes:
+            if node is not None and node.accept(self):
+                found = True
+        return found
+
+    def mark(self, node: object, found: bool) -> bool:
+        if found:
+            self.suspending.add(node)
+        return found
+
+    def visitBlockStmt(self, stmt: Stmt.Block) -> bool:
+        # A yield may sit in a block that has not run yet, so parse it.
+        if type(stmt.statements) is LazyBody:
+            stmt.statements = stmt.statements.parse()
+        return self.mark(stmt, self.any(stmt.statements))
+
+    def visitExpressionStmt(self, stmt: Stmt.Expression) -> bool:
+        return self.mark(stmt, self.any([stmt.expression]))
+
+    def visitFunctionStmt(self, stmt: Stmt.Function) -> bool:
+        return False
+
+    def visitIfStmt(self, stmt: Stmt.If) -> bool:
+        return self.mark(stmt, self.any([stmt.condition, stmt.thenBranch, stmt.elseBranch]))
+
+    def visitImportStmt(self, stmt: Stmt.Import) -> bool:
+        return False
+
+    def visitParallelStmt(self, stmt: Stmt.Parallel) -> bool:
+        return False
+
+    def visitPrintStmt(self, stmt: Stmt.Print) -> bool:
+        return self.mark(stmt, self.any([stmt.expression]))
+
+    def visitReturnStmt(self, stmt: Stmt.Return) -> bool:
+        return self.mark(stmt, self.any([stmt.value]))
+
+    def visitWhileStmt(self, stmt: Stmt.While) -> bool:
+        return self.mark(stmt, self.any([stmt.condition, stmt.body]))
+
+    def visitVarStmt(self, stmt: Stmt.Var) -> bool:
+        return self.mark(stmt, self.any([stmt.initializer]))
+
+    def visitAssignExpr(self, expr: Expr.Assign) -> bool:
+        return self.mark(expr, self.any([expr.value]))
+
+    def visitBinaryExpr(self, expr: Expr.Binary) -> bool:
+        return self.mark(expr, self.any([expr.left, expr.right]))
+
+    def visitCallExpr(self, expr: Expr.Call) -> bool:
+        return self.mark(expr, self.any([expr.callee] + expr.arguments))
+
+    def visitGroupingExpr(self, expr: Expr.Grouping) -> bool:
+        return self.mark(expr, self.any([expr.expression]))
+
+    def visitIndexExpr(self, expr: Expr.Index) -> bool:
+        return self.mark(expr, self.any([expr.object, expr.index]))
+
+    def visitLiteralExpr(self, expr: Expr.Literal) -> bool:
+        return False
+
+    def visitLogicalExpr(self, expr: Expr.Logical) -> bool:
+        return self.mark(expr, self.any([expr.left, expr.right]))
+
+    def visitSetIndexExpr(self, expr: Expr.SetIndex) -> bool:
+        return self.mark(expr, self.any([expr.object, expr.index, expr.value]))
+
+    def visitTernaryExpr(self, expr: Expr.Ternary) -> bool:
+        return self.mark(expr, self.any([expr.condition, expr.trueExpr, expr.falseExpr]))
+
+    def visitUnaryExpr(self, expr: Expr.Unary) -> bool:
+        return self.mark(expr, self.any([expr.right]))
+
+    def visitVariableExpr(self, expr: Expr.Variable) -> bool:
+        return False
+
+    def visitYieldExpr(self, expr: Expr.Yield) -> bool:
+        self.any([expr.value])
+        return self.mark(expr, True)
+
+class LoxGenerator:
+
+    # The state of one call to a generator function: a chain of Python
+    # generators mirroring the Lox statements that are mid-execution,
+    # plus the environment that was current when it last suspended.
+    def __init__(self, interpreter, function, arguments: List[object], suspending: Set[object]):
+        self.interpreter = interpreter
+        self.function = function
+        self.suspending = suspending
+        self.environment = interpreter.environment
+        self.done = False
+        self.started = False
+        self.running = False
+        self.frames = self.run(arguments)
+
+    def __str__(self) -> str:
+        return f'<generator {self.function.declaration.name.lexeme}>'
+
+    def resume(self, token, value: object) -> object:
+        if self.running:
+            raise LoxRuntimeError(token, "Generator is already running.")
+        if self.done:
+            return None
+
+        interpreter = self.interpreter
+        caller = interpreter.environment
+        interpreter.environment = self.environment
+        self.running = True
+        try:
+            # The first resume starts the body, so there is no pending
+            # yield to receive its value.
+            if not self.started:
+                self.started = True
+                value = None
+            yielded = self.frames.send(value)
+            self.environment = interpreter.environment
+            return yielded
+        except StopIteration:
+            self.done = True
+            return None
+        except BaseException:
+            self.done = True
+            raise
+        finally:
+            self.running = False
+            interpreter.environment = caller
+
+    def run(self, arguments: List[object]) -> Generator:
+        declaration = self.function.declaration
+        environment = Environment.Environment(self.function.closure)
+        for param, argument in zip(declaration.params, arguments):
+            environment.define(param.lexeme, argument)
+
+        try:
+            yield from self.block(declaration.body, environment)
+        except Return:
+            return
+
+    # resume() puts the caller's environment back after every step, so
+    # only a block that finishes has to restore its own. Restoring in a
+    # finally would also run when an abandoned generator is collected,
+    # clobbering whatever environment is current at that moment.
+    def block(self, statements: List[Stmt.Stmt], environment: Environment) -> Generator:
+        interpreter = self.interpreter
+        previous = interpreter.environment
+        interpreter.environment = environment
+        for statement in statements:
+            yield from self.execute(statement)
+        interpreter.environment = previous
+
+    def execute(self, stmt: Stmt.Stmt) -> Generator:
+        interpreter = self.interpreter
+        if stmt not in self.suspending:
+            interpreter.execute(stmt)
+            return
+
+        match stmt:
+            case Stmt.Block():
+                yield from self.block(stmt.statements, Environment.Environment(interpreter.environment))
+            case Stmt.Expression():
+                yield from self.evaluate(stmt.expression)
+            case Stmt.If():
+                if interpreter.isTruthy((yield from self.evaluate(stmt.condition))):
+                    yield from self.execute(stmt.thenBranch)
+                elif stmt.elseBranch:
+                    yield from self.execute(stmt.elseBranch)
+            case Stmt.Print():
+                print(interpreter.stringify((yield from self.evaluate(stmt.expression))))
+            case Stmt.Return():
+                raise Return((yield from self.evaluate(stmt.value)))
+            case Stmt.Var():
+                value = yield from self.evaluate(stmt.initializer)
+                interpreter.environment.define(stmt.name.lexeme, value)
+            case Stmt.While():
+                while interpreter.isTruthy((yield from self.evaluate(stmt.condition))):
+                    if interpreter.budget is not None:
+                        interpreter.budget.tick(stmt.keyword)
+                    yield from self.execute(stmt.body)
+
+    def evaluate(self, expr: Expr.Expr) -> Generator:
+        interpreter = self.interpreter
+        if expr not in self.suspending:
+            return None if expr is None else interpreter.evaluate(expr)
+
+        match expr:
+            case Expr.Yield():
+                value = yield from self.evaluate(expr.value)
+                return (yield value)
+            case Expr.Assign():
+                value = yield from self.evaluate(expr.value)
+                interpreter.environment.assign(expr.name, value)
+                return value
+            case Expr.Binary():
+                left = yield from self.evaluate(expr.left)
+                return interpreter.binary(expr, left, (yield from self.evaluate(expr.right)))
+            case Expr.Call():
+                callee = yield from self.evaluate(expr.callee)
+                arguments = []
+                for argument in expr.arguments:
+                    arguments.append((yield from self.evaluate(argument)))
+                return interpreter.call(expr, callee, arguments)
+            case Expr.Grouping():
+                return (yield from self.evaluate(expr.expression))
+            case Expr.Index():
+                obj = yield from self.evaluate(expr.object)
+                return interpreter.index(expr, obj, (yield from self.evaluate(expr.index)))
+            case Expr.Logical():
+                left = yield from self.evaluate(expr.left)
+                if expr.operator.type == TokenType.OR:
+                    if interpreter.isTruthy(left): return left
+                else:
+                    if not interpreter.isTruthy(left): return left
+                return (yield from self.evaluate(expr.right))
+            case Expr.SetIndex():
+                obj = yield from self.evaluate(expr.object)
+                index = yield from self.evaluate(expr.index)
+                return interpreter.setIndex(expr, obj, index, (yield from self.evaluate(expr.value)))
+            case Expr.Ternary():
+                if interpreter.isTruthy((yield from self.evaluate(expr.condition))):
+                    return (yield from self.evaluate(expr.trueExpr))
+                return (yield from self.evaluate(expr.falseExpr))
+            case Expr.Unary():
+                return interpreter.unary(expr, (yield from self.evaluate(expr.right)))
+
+class LoxAwaitable:
+
+    # What async natives return. A task that yields one is suspended on
+    # the event loop until it completes and resumed with its result.
+    def __init__(self, name: str, start):
+        self.name = name
+        self.start = start
+
+    def __str__(self) -> str:
+        return f'<awaitable {self.name}>'
+
+class LoxPipe:
+
+    def __init__(self, command: str):
+        self.command = command
+        self.process: asyncio.subprocess.Process = None
+
+    async def readLine(self) -> object:
+        if self.process is None:
+            self.process = await asyncio.create_subprocess_shell(self.command, stdout=asyncio.subprocess.PIPE)
+        line = await self.process.stdout.readline()
+        if not line:
+            await self.process.wait()
+            return None
+        return line.decode("utf-8").rstrip("\r\n")
+
+    def __str__(self) -> str:
+        return f'<pipe {self.command}>'
+
+class Scheduler:
+
+    # Runs spawned generators as asyncio tasks on one event loop owned
+    # by the interpreter, so pipes survive between runTasks() calls.
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.loop: asyncio.AbstractEventLoop = None
+        self.waiting: List[LoxGenerator] = []
+        self.tasks: Set[asyncio.Task] = set()
+
+    def spawn(self, generator: object) -> None:
+        Scheduler.checkGenerator(generator, "spawn")
+        if self.loop is not None and self.loop.is_running():
+            self.tasks.add(self.loop.create_task(self.drive(generator)))
+        else:
+            self.waiting.append(generator)
+        return None
+
+    async def drive(self, generator: LoxGenerator):
+        value = None
+        while True:
+            yielded = generator.resume(None, value)
+            if generator.done:
+                return
+            if isinstance(yielded, LoxAwaitable):
+                value = await yielded.start()
+            else:
+                await asyncio.sleep(0)
+                value = None
+
+    def runTasks(self) -> float:
+        if self.loop is not None and self.loop.is_running():
+            raise LoxRuntimeError(None, "runTasks() cannot be called from a task.")
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        return float(self.loop.run_until_complete(self.runAll()))
+
+    async def runAll(self) -> int:
+        for generator in self.waiting:
+            self.tasks.add(asyncio.ensure_future(self.drive(generator)))
+        self.waiting.clear()
+
+        completed = 0
+        while self.tasks:
+            done, _ = await asyncio.wait(self.tasks, return_when=asyncio.FIRST_EXCEPTION)
+            self.tasks -= done
+            completed += len(done)
+            for task in done:
+                if task.exception() is not None:
+                    for pending in self.tasks:
+                        pending.cancel()
+                    self.tasks.clear()
+                    raise task.exception()
+        return completed
+
+    @staticmethod
+    def checkGenerator(value: object, name: str) -> LoxGenerator:
+        if not isinstance(value, LoxGenerator):
+            raise LoxRuntimeError(None, f"{name}() expects a generator.")
+        return value
+
+    @staticmethod
+    def sleep(seconds: object) -> LoxAwaitable:
+        if not isinstance(seconds, float) or seconds < 0:
+            raise LoxRuntimeError(None, "sleep() expects a non-negative number of seconds.")
+        return LoxAwaitable("sleep", lambda: asyncio.sleep(seconds))
+
+    @staticmethod
+    def pipe(command: object) -> LoxPipe:
+        if not isinstance(command, str):
+            raise LoxRuntimeError(None, "pipe() expects a command string.")
+        return LoxPipe(command)
+
+    @staticmethod
+    def pipeLine(pipe: object) -> LoxAwaitable:
+        if not isinstance(pipe, LoxPipe):
+            raise LoxRuntimeError(None, "pipeLine() expects a pipe.")
+        return LoxAwaitable("pipeLine", pipe.readLine)
+
+    def natives(self) -> List[NativeFunction]:
+        return [
+            NativeFunction("next", 1, lambda g: Scheduler.checkGenerator(g, "next").resume(None, None)),
+            NativeFunction("send", 2, lambda g, v: Scheduler.checkGenerator(g, "send").resume(None, v)),
+            NativeFunction("done", 1, lambda g: Scheduler.checkGenerator(g, "done").done),
+            NativeFunction("spawn", 1, self.spawn),
+            NativeFunction("runTasks", 0, self.runTasks),
+            NativeFunction("sleep", 1, Scheduler.sleep),
+            NativeFunction("pipe", 1, Scheduler.pipe),
+            NativeFunction("pipeLine", 1, Scheduler.pipeLine),
+        ]
@@ -1,5 +1,7 @@
 import Token 
+from typing import Callable, Dict
 from ErrorReporter import LoxRuntimeError
+from NativeFunction import NativeFunction
 
 class Environment:
 
@@ -26,4 +28,20 @@ class Environment:
             self.enclosing.assign(name, value)
             return
         
-        raise LoxRuntimeError(name, f"Undefined variable {name.lexeme}.")
\ No newline at end of file
+        raise LoxRuntimeError(name, f"Undefined variable {name.lexeme}.")
+
+class GlobalEnvironment(Environment):
+
+    # The outermost frame, which also keeps the native registry. Call and
+    # block frames are plain Environments and carry no registry.
+    def __init__(self):
+        super().__init__()
+        self.natives: Dict[str, NativeFunction] = {}
+
+    def register(self, name: str, arity: int, function: Callable[..., object]) -> NativeFunction:
+        return self.registerNative(NativeFunction(name, arity, function))
+
+    def registerNative(self, native: NativeFunction) -> NativeFunction:
+        self.natives[native.name] = native
+        self.define(native.name, native)
+        return native
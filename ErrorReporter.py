@@ -1,4 +1,7 @@
 # ErrorHandling.py
+import json
+from typing import Dict, List, Tuple
+from TokenType import TokenType
 
 class LoxRuntimeError(RuntimeError):
     def __init__(self, token, message: str):
@@ -6,26 +9,109 @@ class LoxRuntimeError(RuntimeError):
         self.message = message
         self.token = token  
 
+class BudgetExceeded(LoxRuntimeError):
+    pass
+
+# Raised by Diagnostics.record past the error cap; the scanner and the
+# parser stop where they are.
+class TooManyErrors(Exception):
+    pass
+
+class Diagnostic:
+
+    def __init__(self, line: int, where: str, message: str):
+        self.line = line
+        self.where = where
+        self.message = message
+        # Later reports of the same error on the same line, usually a
+        # cascade from this one.
+        self.repeats = 0
+
+    def __str__(self) -> str:
+        text = f'[line {self.line}] Error {self.where}: {self.message}'
+        if self.repeats:
+            text += f' (+{self.repeats} more like this on this line)'
+        return text
+
+    def toJson(self) -> dict:
+        return {"line": self.line, "where": self.where.strip(), "message": self.message, "repeats": self.repeats}
+
+class Diagnostics:
+
+    # Collects scanner and parser errors and prints them in one batch,
+    # ordered by line. An error repeating one already recorded on its
+    # line is counted on that entry instead; after `limit` distinct
+    # errors, recording raises TooManyErrors.
+    FORMATS = ("text", "json")
+    DEFAULT_LIMIT = 100
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, format: str = "text"):
+        self.limit = limit
+        self.format = format
+        self.entries: List[Diagnostic] = []
+        self.seen: Dict[Tuple[int, str], Diagnostic] = {}
+        self.truncated = False
+
+    def record(self, line: int, where: str, message: str):
+        entry = self.seen.get((line, message))
+        if entry is not None:
+            entry.repeats += 1
+            return
+        if self.limit is not None and len(self.entries) >= self.limit:
+            self.truncated = True
+            raise TooManyErrors()
+
+        entry = Diagnostic(line, where, message)
+        self.entries.append(entry)
+        self.seen[line, message] = entry
+
+    def flush(self, out=None):
+        if not self.entries:
+            return
+        entries = sorted(self.entries, key=lambda entry: entry.line)
+        if self.format == "json":
+            print(json.dumps({"errors": [entry.toJson() for entry in entries], "truncated": self.truncated}),
+                  file=out)
+        else:
+            print("\n".join(str(entry) for entry in entries), file=out)
+            if self.truncated:
+                print(f'Too many errors; stopped after {self.limit}.', file=out)
+        self.entries = []
+        self.seen = {}
+        self.truncated = False
+
 class ErrorHandling:
     hadError = False
     hadRuntimeError = False
+    hadBudgetError = False
+    # Where diagnostics are printed; None means the current sys.stdout.
+    output = None
+    diagnostics = Diagnostics()
+
     @staticmethod
     def error(line: int, message: str):
         ErrorHandling.report(line, "", message)
 
     @staticmethod
     def report(line: int, where: str, message: str):
-        print(f'[line {line}] Error {where}: {message}')
         ErrorHandling.hadError = True
+        ErrorHandling.diagnostics.record(line, where, message)
+
+    # Prints the collected scanner and parser errors.
+    @staticmethod
+    def flush():
+        ErrorHandling.diagnostics.flush(ErrorHandling.output)
 
     @staticmethod
     def runtimeError(error: LoxRuntimeError):
-        print(f'{str(error)} \n [line {error.token.line}]')
+        print(f'{str(error)} \n [line {error.token.line}]', file=ErrorHandling.output)
         ErrorHandling.hadRuntimeError = True
+        if isinstance(error, BudgetExceeded):
+            ErrorHandling.hadBudgetError = True
 
     @staticmethod
     def error_with_token(token, message: str):
-        if token.type == "EOF":
+        if token.type == TokenType.EOF:
             ErrorHandling.report(token.line, " at end", message)
         else:
             ErrorHandling.report(token.line, f" at '{token.lexeme}'", message)
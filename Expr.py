@@ -18,14 +18,20 @@ class Visitor(Generic[R]):
         pass
     def visitGroupingExpr(self, Expr: 'Grouping') -> R:
         pass
+    def visitIndexExpr(self, Expr: 'Index') -> R:
+        pass
     def visitLiteralExpr(self, Expr: 'Literal') -> R:
         pass
     def visitLogicalExpr(self, Expr: 'Logical') -> R:
         pass
+    def visitSetIndexExpr(self, Expr: 'SetIndex') -> R:
+        pass
     def visitUnaryExpr(self, Expr: 'Unary') -> R:
         pass
     def visitVariableExpr(self, Expr: 'Variable') -> R:
         pass
+    def visitYieldExpr(self, Expr: 'Yield') -> R:
+        pass
 
 class Ternary(Expr):
     def __init__(self, condition: Expr, trueExpr: Expr, falseExpr: Expr):
@@ -69,6 +75,15 @@ class Grouping(Expr):
     def accept(self, visitor: 'Visitor[R]') -> R:
         return visitor.visitGroupingExpr(self)
 
+class Index(Expr):
+    def __init__(self, object: Expr, bracket: Token, index: Expr):
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitIndexExpr(self)
+
 class Literal(Expr):
     def __init__(self, value: object):
         self.value = value
@@ -85,6 +100,16 @@ class Logical(Expr):
     def accept(self, visitor: 'Visitor[R]') -> R:
         return visitor.visitLogicalExpr(self)
 
+class SetIndex(Expr):
+    def __init__(self, object: Expr, bracket: Token, index: Expr, value: Expr):
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+        self.value = value
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitSetIndexExpr(self)
+
 class Unary(Expr):
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
@@ -100,3 +125,11 @@ class Variable(Expr):
     def accept(self, visitor: 'Visitor[R]') -> R:
         return visitor.visitVariableExpr(self)
 
+class Yield(Expr):
+    def __init__(self, keyword: Token, value: Expr):
+        self.keyword = keyword
+        self.value = value
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitYieldExpr(self)
+
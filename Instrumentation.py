@@ -0,0 +1,113 @@
+import sys
+from typing import Dict, Set
+import Expr
+import Stmt
+from Token import Token
+from ErrorReporter import LoxRuntimeError
+
+class Instrumentation:
+
+    # Callbacks an interpreter makes while instrumented. Attaching one
+    # with Interpreter.instrument swaps in traced execute/evaluate on
+    # that interpreter only; the uninstrumented path has no checks.
+    def __init__(self):
+        self.lines: Dict[object, int] = {}
+
+    def onStatement(self, interpreter, stmt: Stmt.Stmt):
+        pass
+
+    def onExpression(self, interpreter, expr: Expr.Expr, value: object):
+        pass
+
+    # Called once per error, for the innermost statement it escapes.
+    def onError(self, interpreter, stmt: Stmt.Stmt, error: LoxRuntimeError):
+        pass
+
+    # The line of the first token in a node, or None for nodes without
+    # one, such as a bare literal.
+    def line(self, node: object) -> int:
+        line = self.lines.get(node, -1)
+        if line != -1:
+            return line
+
+        line = None
+        work: list = [node]
+        while work:
+            item = work.pop()
+            if type(item) is Token:
+                line = item.line
+                break
+            if isinstance(item, list):
+                work.extend(reversed(item))
+            elif isinstance(item, (Expr.Expr, Stmt.Stmt)):
+                work.extend(reversed(list(vars(item).values())))
+        self.lines[node] = line
+        return line
+
+class Tracer(Instrumentation):
+
+    def __init__(self, out=None):
+        super().__init__()
+        self.out = out or sys.stderr
+
+    def onStatement(self, interpreter, stmt: Stmt.Stmt):
+        print(f'[trace] line {self.line(stmt)}: {type(stmt).__name__}', file=self.out)
+
+    def onError(self, interpreter, stmt: Stmt.Stmt, error: LoxRuntimeError):
+        print(f'[trace] line {self.line(stmt)}: error {error}', file=self.out)
+
+class Debugger(Instrumentation):
+
+    # Stops before the first statement on a breakpoint line, or before
+    # every new line while stepping, and reads commands from input:
+    #   c - continue, s - step, p NAME - print a variable, q - quit
+    def __init__(self, breakpoints: Set[int], input=None, out=None):
+        super().__init__()
+        self.breakpoints = breakpoints
+        self.input = input or sys.stdin
+        self.out = out or sys.stderr
+        self.stepping = False
+        self.lastLine: int = None
+
+    def onStatement(self, interpreter, stmt: Stmt.Stmt):
+        line = self.line(stmt)
+        if line is None or line == self.lastLine:
+            return
+        self.lastLine = line
+        if self.stepping or line in self.breakpoints:
+            self.pause(interpreter, line)
+
+    def onError(self, interpreter, stmt: Stmt.Stmt, error: LoxRuntimeError):
+        print(f'[debug] line {self.line(stmt)}: {error}', file=self.out)
+        self.pause(interpreter, self.line(stmt))
+
+    def pause(self, interpreter, line: int):
+        while True:
+            print(f'[debug] line {line}> ', end="", file=self.out, flush=True)
+            command = self.input.readline()
+            if not command:
+                self.stepping = False
+                return
+            name, _, argument = command.strip().partition(" ")
+            match name:
+                case "c" | "":
+                    self.stepping = False
+                    return
+                case "s":
+                    self.stepping = True
+                    return
+                case "p":
+                    self.show(interpreter, argument.strip())
+                case "q":
+                    raise SystemExit(0)
+                case _:
+                    print("[debug] commands: c, s, p NAME, q", file=self.out)
+
+    def show(self, interpreter, name: str):
+        environment = interpreter.environment
+        while environment is not None:
+            if name in environment.values:
+                print(f'[debug] {name} = {interpreter.stringify(environment.values[name])}', file=self.out)
+                return
+            environment = environment.enclosing
+        print(f"[debug] '{name}' is not defined here.", file=self.out)
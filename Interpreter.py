@@ -4,29 +4,188 @@ from TokenType import *
 import Token
 from ErrorReporter import LoxRuntimeError, ErrorHandling
 import Stmt
-from typing import List
+from typing import Dict, List, Set
 import Environment
+from LoxCallable import LoxCallable
+from LoxFunction import LoxFunction
+from NativeFunction import NativeFunction
+from Natives import Natives
+from Return import Return
+from LoxArray import LoxArray
+from LoxMap import LoxMap
+from Budget import Budget
+from ParallelLoop import ParallelLoop
+from LoxFile import FileTable
+from Coroutines import Scheduler
+from LoxModule import LoadedModules, ModuleCache
+from LoopTier import Tiering
+from LoopOptimizer import LoopOptimizer, LoopPlan, lazyBlocks
+from LazyBody import LazyBody
+from ScopeAnalyzer import ScopeAnalyzer
+from Instrumentation import Instrumentation
+from concurrent.futures import ProcessPoolExecutor
+import os
 
 class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
 
     def __init__(self):
-        self.environment = Environment.Environment()
+        self.globals = Environment.GlobalEnvironment()
+        self.environment = self.globals
+        self.memoized: List[LoxFunction] = []
+        self.flatBlocks: Set[Stmt.Block] = set()
+        self.blockPools: Dict[Stmt.Block, List[Environment.Environment]] = {}
+        self.loopPlans: Dict[Stmt.While, LoopPlan] = {}
+        self.lazyLoops: Dict[Stmt.While, List[Stmt.Block]] = {}
+        self.optimizeLoops: bool = True
+        self.budget: Budget = None
+        self.tiering: Tiering = Tiering()
+        self.hooks: Instrumentation = None
+        self.parallelWorkers: int = os.cpu_count() or 1
+        self.executor: ProcessPoolExecutor = None
+        Natives.install(self.globals)
+        self.modules = LoadedModules(ModuleCache())
+        self.files = FileTable()
+        for native in self.files.natives():
+            self.globals.registerNative(native)
+        self.scheduler = Scheduler(self)
+        for native in self.scheduler.natives():
+            self.globals.registerNative(native)
 
-    def interpret(self, statements: List[Stmt.Stmt]):
+    # Files the script opened are closed when it ends. A REPL line keeps
+    # them open for the next one unless it fails.
+    def interpret(self, statements: List[Stmt.Stmt], keepFiles: bool = False):
+        if self.budget is not None:
+            self.budget.start()
         try: 
             for statement in statements:
                 self.execute(statement)
         except LoxRuntimeError as error:
+            keepFiles = False
             ErrorHandling.runtimeError(error)
+        finally:
+            if not keepFiles:
+                self.files.closeAll()
+
+    # Shadows execute and evaluate on this instance with versions that
+    # call the hooks and walk every node through its visitor method, so
+    # the iterative interpreter is traced the same way. Only the
+    # callbacks the hooks override are wired in: expression hooks cost
+    # a call per node, and tracers and debuggers only watch statements.
+    # Compiled loops would bypass the hooks, so tiering is off while
+    # instrumented.
+    def instrument(self, hooks: Instrumentation):
+        self.uninstrument()
+        self.hooks = hooks
+        self.untracedTiering, self.tiering = self.tiering, None
+        reported: List[LoxRuntimeError] = [None]
+
+        def execute(stmt: Stmt.Stmt):
+            hooks.onStatement(self, stmt)
+            try:
+                stmt.accept(self)
+            except LoxRuntimeError as error:
+                if reported[0] is not error:
+                    reported[0] = error
+                    hooks.onError(self, stmt, error)
+                raise
+
+        def evaluate(expr: Expr.Expr) -> object:
+            value = expr.accept(self)
+            hooks.onExpression(self, expr, value)
+            return value
+
+        if Interpreter.overrides(hooks, "onStatement") or Interpreter.overrides(hooks, "onError"):
+            self.execute = execute
+        if Interpreter.overrides(hooks, "onExpression"):
+            self.evaluate = evaluate
+
+    @staticmethod
+    def overrides(hooks: Instrumentation, name: str) -> bool:
+        return getattr(type(hooks), name) is not getattr(Instrumentation, name)
+
+    def uninstrument(self):
+        if self.hooks is None:
+            return
+        # A fresh dict without the shadows, since deleting them leaves
+        # this instance's attribute lookups on a slower path.
+        self.__dict__ = {name: value for name, value in self.__dict__.items()
+                         if name not in ("execute", "evaluate")}
+        self.tiering = self.untracedTiering
+        self.hooks = None
 
     def visitWhileStmt(self, stmt: Stmt.While) -> None:
+        if self.budget is not None:
+            return self.budgetedWhile(stmt)
+        if stmt in self.lazyLoops:
+            return self.lazyLoop(stmt)
+        # Plans rewrite the loop while it runs, which hooks would see.
+        plan = self.loopPlans.get(stmt)
+        if plan is not None and self.hooks is None:
+            return plan.run(self)
+        return self.whileLoop(stmt)
+
+    def whileLoop(self, stmt: Stmt.While) -> None:
+        if self.tiering is None:
+            while self.isTruthy(self.evaluate(stmt.condition)):
+                self.execute(stmt.body)
+            return None
+
+        # A hot loop is promoted to the compiled tier, and the walker
+        # resumes here if it deoptimizes.
+        tiering = self.tiering
+        iterations = tiering.enter(self, stmt)
+        if iterations is None:
+            return None
+        try:
+            while self.isTruthy(self.evaluate(stmt.condition)):
+                self.execute(stmt.body)
+                iterations += 1
+                if iterations == Tiering.THRESHOLD:
+                    if tiering.promote(self, stmt):
+                        return None
+                    iterations = 0
+        finally:
+            tiering.counts[stmt] = iterations
+        return None
+
+    # Runs a loop whose body holds blocks that have not been parsed.
+    # They are parsed as they first run; once none is left the loop is
+    # planned and continues from the next iteration.
+    def lazyLoop(self, stmt: Stmt.While) -> None:
         while self.isTruthy(self.evaluate(stmt.condition)):
             self.execute(stmt.body)
-        
+            if self.planParsedLoop(stmt):
+                return self.visitWhileStmt(stmt)
+        return None
+
+    # Returns True once the loop no longer waits on unparsed blocks.
+    def planParsedLoop(self, loop: Stmt.While) -> bool:
+        if any(type(block.statements) is LazyBody for block in self.lazyLoops[loop]):
+            return False
+        # Parsed blocks may hold lazy blocks of their own.
+        del self.lazyLoops[loop]
+        self.planLoop(loop)
+        return loop not in self.lazyLoops
+
+    def budgetedWhile(self, stmt: Stmt.While) -> None:
+        budget: Budget = self.budget
+        iterations = 0
+        try:
+            while self.isTruthy(self.evaluate(stmt.condition)):
+                self.execute(stmt.body)
+                iterations += 1
+                if iterations == Budget.BATCH:
+                    budget.charge(stmt.keyword, iterations)
+                    iterations = 0
+        finally:
+            budget.pending += iterations
+        # Loops shorter than a batch leave their iterations pending, so an
+        # inner loop is charged once enough of its runs have added up.
+        budget.settle(stmt.keyword)
         return None
 
     def visitIfStmt(self, stmt: Stmt.If) -> None:
-        if self.isTruthy(stmt.condition):
+        if self.isTruthy(self.evaluate(stmt.condition)):
             self.execute(stmt.thenBranch)
         elif stmt.elseBranch:
             self.execute(stmt.elseBranch)
@@ -36,27 +195,26 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         left: object = self.evaluate(expr.left)
 
         if expr.operator.type == TokenType.OR:
-            if self.isTruthy(expr.left): return left 
+            if self.isTruthy(left): return left 
         else:
-            if not self.isTruthy(expr.left): return left
+            if not self.isTruthy(left): return left
         
         return self.evaluate(expr.right)
     
     def visitTernaryExpr(self, expr: Expr.Ternary) -> object:
         condition: object = self.evaluate(expr.condition)
-        trueBranch: object = self.evaluate(expr.trueExpr)
-        falseBranch: object = self.evaluate(expr.falseExpr)
-        if condition == True:
-            return trueBranch
+        if self.isTruthy(condition):
+            return self.evaluate(expr.trueExpr)
         else:
-            return falseBranch
+            return self.evaluate(expr.falseExpr)
             
     def visitLiteralExpr(self, expr: Expr.Literal) -> object:
         return expr.value
     
     def visitUnaryExpr(self, expr: Expr.Unary) -> object:
-        right: object = self.evaluate(expr.right)
+        return self.unary(expr, self.evaluate(expr.right))
 
+    def unary(self, expr: Expr.Unary, right: object) -> object:
         match expr.operator.type:
             case TokenType.BANG:
                 return not self.isTruthy(right)
@@ -70,7 +228,77 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         return self.environment.get(expr.name)
     
     def visitGroupingExpr(self, expr: Expr.Grouping) -> object:
-        return self.evaluate(expr)    
+        return self.evaluate(expr.expression)
+
+    def visitCallExpr(self, expr: Expr.Call) -> object:
+        callee: object = self.evaluate(expr.callee)
+
+        arguments: List[object] = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+
+        return self.call(expr, callee, arguments)
+
+    def call(self, expr: Expr.Call, callee: object, arguments: List[object]) -> object:
+        # Natives are called directly, without a Lox frame or call().
+        if type(callee) is NativeFunction:
+            if len(arguments) != callee.arityCount:
+                raise LoxRuntimeError(expr.paren, f"Expected {callee.arityCount} arguments but got {len(arguments)}.")
+            function = callee.function
+        elif isinstance(callee, LoxCallable):
+            if len(arguments) != callee.arity():
+                raise LoxRuntimeError(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+            if self.budget is None:
+                return callee.call(self, arguments)
+            return self.budgetedCall(expr, callee, arguments)
+        else:
+            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+
+        try:
+            return function(*arguments)
+        except LoxRuntimeError as error:
+            if error.token is None:
+                error.token = expr.paren
+            raise
+
+    def visitIndexExpr(self, expr: Expr.Index) -> object:
+        return self.index(expr, self.evaluate(expr.object), self.evaluate(expr.index))
+
+    def budgetedCall(self, expr: Expr.Call, callee: LoxCallable, arguments: List[object]) -> object:
+        self.budget.tick(expr.paren)
+        self.budget.enter(expr.paren)
+        try:
+            return callee.call(self, arguments)
+        finally:
+            self.budget.leave()
+
+    def index(self, expr: Expr.Index, obj: object, index: object) -> object:
+        if isinstance(obj, LoxArray):
+            return obj.get(expr.bracket, index)
+        if isinstance(obj, LoxMap):
+            return obj.get(expr.bracket, index)
+
+        raise LoxRuntimeError(expr.bracket, "Only arrays and maps can be indexed.")
+
+    def visitYieldExpr(self, expr: Expr.Yield) -> object:
+        # Generator bodies are run by LoxGenerator, which handles yields
+        # itself, so reaching one here means it is outside any function.
+        raise LoxRuntimeError(expr.keyword, "Can only yield inside a function.")
+
+    def visitSetIndexExpr(self, expr: Expr.SetIndex) -> object:
+        obj: object = self.evaluate(expr.object)
+        index: object = self.evaluate(expr.index)
+        return self.setIndex(expr, obj, index, self.evaluate(expr.value))
+
+    def setIndex(self, expr: Expr.SetIndex, obj: object, index: object, value: object) -> object:
+        if isinstance(obj, LoxArray):
+            obj.set(expr.bracket, index, value)
+            return value
+        if isinstance(obj, LoxMap):
+            obj.set(expr.bracket, index, value)
+            return value
+
+        raise LoxRuntimeError(expr.bracket, "Only arrays and maps can be indexed.")
     
     def checkNumberOperand(self, operator: Token, operand: object):
         if isinstance(operand, float): return
@@ -87,7 +315,9 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         
     def visitBinaryExpr(self, expr: Expr.Binary) -> object:
         left: object = self.evaluate(expr.left)
-        right: object = self.evaluate(expr.right)
+        return self.binary(expr, left, self.evaluate(expr.right))
+
+    def binary(self, expr: Expr.Binary, left: object, right: object) -> object:
         match expr.operator.type:
             case TokenType.GREATER:
                 self.checkNumberOperands(expr.operator, left, right)
@@ -109,7 +339,7 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
                 if isinstance(left, float) and isinstance(right, float):
                     return float(left) + float(right)
                 if isinstance(left, str) or isinstance(right, str):
-                    return str(left) + str(int(right))
+                    return self.stringify(left) + self.stringify(right)
                 raise LoxRuntimeError(expr.operator, "Operands must two numbers or two strings")              
             case TokenType.MINUS:
                 self.checkNumberOperands(expr.operator, left, right)                
@@ -126,18 +356,27 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         if left == None and right == None: return True
         if left == None: return False
 
-        return left == right
+        return type(left) is type(right) and left == right
     
     def stringify(self, obj: object) -> str:
         if obj == None: 
             return "nil"
 
+        if isinstance(obj, bool):
+            return "true" if obj else "false"
+
         if isinstance(obj, float):
             text = str(obj)
             if text.endswith(".0"):  # For integers stored as floats
                 text = text[0: len(text) - 2]
             return text
 
+        if isinstance(obj, LoxArray):
+            return "[" + ", ".join(self.stringify(value) for value in obj.values) + "]"
+
+        if isinstance(obj, LoxMap):
+            return "{" + ", ".join(f"{self.stringify(key)}: {self.stringify(value)}" for key, value in obj.items()) + "}"
+
         return str(obj)    
     
     def isTruthy(self, obj: object):
@@ -164,14 +403,97 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         finally:
             self.environment = previous
 
+    def flattenBlock(self, block: Stmt.Block):
+        self.flatBlocks.add(block)
+
+    def poolBlock(self, block: Stmt.Block):
+        self.blockPools[block] = []
+
+    def planLoop(self, loop: Stmt.While):
+        if not self.optimizeLoops:
+            return
+        blocks = lazyBlocks(loop)
+        if blocks:
+            self.lazyLoops[loop] = blocks
+            return
+        plan = LoopOptimizer(self).plan(loop)
+        if plan is not None:
+            self.loopPlans[loop] = plan
+
     def visitBlockStmt(self, stmt: Stmt.Block) -> None:
-        self.executeBlock(stmt.statements, Environment.Environment(self.environment))
+        if type(stmt.statements) is LazyBody:
+            self.forceBlock(stmt)
+        if stmt in self.flatBlocks:
+            for statement in stmt.statements:
+                self.execute(statement)
+            return None
+
+        environment: Environment.Environment = self.blockEnvironment(stmt)
+        try:
+            self.executeBlock(stmt.statements, environment)
+        finally:
+            self.releaseBlock(stmt, environment)
         return None
+
+    # Parses a pre-parsed block before its first run and classifies its
+    # blocks, which ScopeAnalyzer had to skip.
+    def forceBlock(self, stmt: Stmt.Block):
+        stmt.statements = stmt.statements.parse()
+        ScopeAnalyzer(self).visitBlockStmt(stmt)
+
+    def blockEnvironment(self, stmt: Stmt.Block) -> Environment.Environment:
+        pool = self.blockPools.get(stmt)
+        if pool is None:
+            return Environment.Environment(self.environment)
+
+        # A block can be re-entered through recursion while its pooled
+        # frame is in use, so the pool may hold more than one frame.
+        environment: Environment.Environment = pool.pop() if pool else Environment.Environment()
+        environment.enclosing = self.environment
+        return environment
+
+    def releaseBlock(self, stmt: Stmt.Block, environment: Environment.Environment):
+        pool = self.blockPools.get(stmt)
+        if pool is not None:
+            environment.values.clear()
+            pool.append(environment)
     
     def visitExpressionStmt(self, stmt: Stmt.Expression) -> None:
         self.evaluate(stmt.expression)
         return None
 
+    def visitFunctionStmt(self, stmt: Stmt.Function) -> None:
+        function: LoxFunction = LoxFunction(stmt, self.environment)
+        if function.cache is not None:
+            self.memoized.append(function)
+        self.environment.define(stmt.name.lexeme, function)
+        return None
+
+    def visitReturnStmt(self, stmt: Stmt.Return) -> None:
+        value: object = None
+        if stmt.value is not None:
+            value = self.evaluate(stmt.value)
+
+        raise Return(value)
+
+    def memoStats(self) -> List[str]:
+        return [f'{function}: {function.cache}' for function in self.memoized]
+
+    def visitParallelStmt(self, stmt: Stmt.Parallel) -> None:
+        ParallelLoop(self).execute(stmt)
+        return None
+
+    def parallelExecutor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.parallelWorkers)
+        return self.executor
+
+    def visitImportStmt(self, stmt: Stmt.Import) -> None:
+        # Every top-level name of the module is exported.
+        module = self.modules.load(self, stmt.keyword, stmt.path.literal)
+        self.environment.values.update(module.environment.values)
+        return None
+
     def visitPrintStmt(self, stmt: Stmt.Print) -> None:
         value: object = self.evaluate(stmt.expression)
 
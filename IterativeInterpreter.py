@@ -0,0 +1,242 @@
+from typing import Callable, Dict, List
+import Expr
+import Stmt
+import Environment
+from TokenType import TokenType
+from Interpreter import Interpreter
+from Return import Return
+from LazyBody import LazyBody
+
+class BlockExit:
+    __slots__ = ("block", "previous", "environment")
+
+    def __init__(self, block: Stmt.Block, previous: Environment, environment: Environment):
+        self.block = block
+        self.previous = previous
+        self.environment = environment
+
+# Walks Expr and Stmt trees with explicit work stacks instead of the
+# visitor's Python recursion, so nesting depth is bounded by memory.
+# Operator semantics and errors come from the shared Interpreter
+# helpers. Calls to Lox functions still start a new walk per call.
+class IterativeInterpreter(Interpreter):
+
+    def evaluate(self, expr: Expr.Expr) -> object:
+        # The work stack holds nodes to expand and (continuation, node)
+        # pairs that combine operands from the value stack.
+        # Leaves are the most common nodes, so they skip the dispatch.
+        kind = type(expr)
+        if kind is Expr.Literal:
+            return expr.value
+        if kind is Expr.Variable:
+            return self.environment.get(expr.name)
+
+        work: list = [expr]
+        values: List[object] = []
+        expand = EXPAND
+        while work:
+            item = work.pop()
+            kind = type(item)
+            if kind is tuple:
+                item[0](self, item[1], values, work)
+            elif kind is Expr.Literal:
+                values.append(item.value)
+            elif kind is Expr.Variable:
+                values.append(self.environment.get(item.name))
+            else:
+                expand[kind](self, item, values, work)
+        return values.pop()
+
+    def execute(self, stmt: Stmt.Stmt):
+        work: list = [stmt]
+        run = RUN
+        try:
+            while work:
+                item = work.pop()
+                run[type(item)](self, item, work)
+        except BaseException:
+            # Unwind like the visitor's finally blocks would.
+            while work:
+                item = work.pop()
+                if type(item) is BlockExit:
+                    self.exitBlock(item, work)
+            raise
+
+    # Expression expansion
+
+    def expandLiteral(self, expr: Expr.Literal, values: list, work: list):
+        values.append(expr.value)
+
+    def expandVariable(self, expr: Expr.Variable, values: list, work: list):
+        values.append(self.environment.get(expr.name))
+
+    def expandGrouping(self, expr: Expr.Grouping, values: list, work: list):
+        work.append(expr.expression)
+
+    def expandUnary(self, expr: Expr.Unary, values: list, work: list):
+        work.append((IterativeInterpreter.finishUnary, expr))
+        work.append(expr.right)
+
+    def expandBinary(self, expr: Expr.Binary, values: list, work: list):
+        left, right = expr.left, expr.right
+        if type(left) in LEAVES and type(right) in LEAVES:
+            values.append(self.binary(expr, self.evaluate(left), self.evaluate(right)))
+            return
+
+        work.append((IterativeInterpreter.finishBinary, expr))
+        work.append(expr.right)
+        work.append(expr.left)
+
+    def expandLogical(self, expr: Expr.Logical, values: list, work: list):
+        work.append((IterativeInterpreter.finishLogical, expr))
+        work.append(expr.left)
+
+    def expandTernary(self, expr: Expr.Ternary, values: list, work: list):
+        work.append((IterativeInterpreter.finishTernary, expr))
+        work.append(expr.condition)
+
+    def expandAssign(self, expr: Expr.Assign, values: list, work: list):
+        work.append((IterativeInterpreter.finishAssign, expr))
+        work.append(expr.value)
+
+    def expandCall(self, expr: Expr.Call, values: list, work: list):
+        work.append((IterativeInterpreter.finishCall, expr))
+        work.extend(reversed(expr.arguments))
+        work.append(expr.callee)
+
+    def expandIndex(self, expr: Expr.Index, values: list, work: list):
+        work.append((IterativeInterpreter.finishIndex, expr))
+        work.append(expr.index)
+        work.append(expr.object)
+
+    def expandSetIndex(self, expr: Expr.SetIndex, values: list, work: list):
+        work.append((IterativeInterpreter.finishSetIndex, expr))
+        work.append(expr.value)
+        work.append(expr.index)
+        work.append(expr.object)
+
+    def expandYield(self, expr: Expr.Yield, values: list, work: list):
+        values.append(self.visitYieldExpr(expr))
+
+    # Expression continuations
+
+    def finishUnary(self, expr: Expr.Unary, values: list, work: list):
+        values.append(self.unary(expr, values.pop()))
+
+    def finishBinary(self, expr: Expr.Binary, values: list, work: list):
+        right = values.pop()
+        values.append(self.binary(expr, values.pop(), right))
+
+    def finishLogical(self, expr: Expr.Logical, values: list, work: list):
+        if expr.operator.type == TokenType.OR:
+            if self.isTruthy(values[-1]): return
+        else:
+            if not self.isTruthy(values[-1]): return
+
+        values.pop()
+        work.append(expr.right)
+
+    def finishTernary(self, expr: Expr.Ternary, values: list, work: list):
+        work.append(expr.trueExpr if self.isTruthy(values.pop()) else expr.falseExpr)
+
+    def finishAssign(self, expr: Expr.Assign, values: list, work: list):
+        self.environment.assign(expr.name, values[-1])
+
+    def finishCall(self, expr: Expr.Call, values: list, work: list):
+        count = len(expr.arguments)
+        arguments = values[len(values) - count:]
+        del values[len(values) - count:]
+        values.append(self.call(expr, values.pop(), arguments))
+
+    def finishIndex(self, expr: Expr.Index, values: list, work: list):
+        index = values.pop()
+        values.append(self.index(expr, values.pop(), index))
+
+    def finishSetIndex(self, expr: Expr.SetIndex, values: list, work: list):
+        value = values.pop()
+        index = values.pop()
+        values.append(self.setIndex(expr, values.pop(), index, value))
+
+    # Statements
+
+    def runBlock(self, stmt: Stmt.Block, work: list):
+        if type(stmt.statements) is LazyBody:
+            self.forceBlock(stmt)
+        if stmt in self.flatBlocks:
+            work.extend(reversed(stmt.statements))
+            return
+
+        environment = self.blockEnvironment(stmt)
+        work.append(BlockExit(stmt, self.environment, environment))
+        self.environment = environment
+        work.extend(reversed(stmt.statements))
+
+    def exitBlock(self, exit: BlockExit, work: list):
+        self.environment = exit.previous
+        self.releaseBlock(exit.block, exit.environment)
+
+    def runExpression(self, stmt: Stmt.Expression, work: list):
+        self.evaluate(stmt.expression)
+
+    def runFunction(self, stmt: Stmt.Function, work: list):
+        self.visitFunctionStmt(stmt)
+
+    def runIf(self, stmt: Stmt.If, work: list):
+        if self.isTruthy(self.evaluate(stmt.condition)):
+            work.append(stmt.thenBranch)
+        elif stmt.elseBranch:
+            work.append(stmt.elseBranch)
+
+    def runImport(self, stmt: Stmt.Import, work: list):
+        self.visitImportStmt(stmt)
+
+    def runParallel(self, stmt: Stmt.Parallel, work: list):
+        self.visitParallelStmt(stmt)
+
+    def runPrint(self, stmt: Stmt.Print, work: list):
+        print(self.stringify(self.evaluate(stmt.expression)))
+
+    def runReturn(self, stmt: Stmt.Return, work: list):
+        raise Return(None if stmt.value is None else self.evaluate(stmt.value))
+
+    def runVar(self, stmt: Stmt.Var, work: list):
+        self.visitVarStmt(stmt)
+
+    def runWhile(self, stmt: Stmt.While, work: list):
+        # Re-pushing the loop makes the next iteration re-test the condition.
+        if self.isTruthy(self.evaluate(stmt.condition)):
+            if self.budget is not None:
+                self.budget.tick(stmt.keyword)
+            work.append(stmt)
+            work.append(stmt.body)
+
+LEAVES = (Expr.Literal, Expr.Variable)
+
+EXPAND: Dict[type, Callable] = {
+    Expr.Literal: IterativeInterpreter.expandLiteral,
+    Expr.Variable: IterativeInterpreter.expandVariable,
+    Expr.Grouping: IterativeInterpreter.expandGrouping,
+    Expr.Unary: IterativeInterpreter.expandUnary,
+    Expr.Binary: IterativeInterpreter.expandBinary,
+    Expr.Logical: IterativeInterpreter.expandLogical,
+    Expr.Ternary: IterativeInterpreter.expandTernary,
+    Expr.Assign: IterativeInterpreter.expandAssign,
+    Expr.Call: IterativeInterpreter.expandCall,
+    Expr.Index: IterativeInterpreter.expandIndex,
+    Expr.SetIndex: IterativeInterpreter.expandSetIndex,
+    Expr.Yield: IterativeInterpreter.expandYield,
+}
+
+RUN: Dict[type, Callable] = {
+    Stmt.Block: IterativeInterpreter.runBlock,
+    Stmt.Expression: IterativeInterpreter.runExpression,
+    Stmt.Function: IterativeInterpreter.runFunction,
+    Stmt.If: IterativeInterpreter.runIf,
+    Stmt.Import: IterativeInterpreter.runImport,
+    Stmt.Parallel: IterativeInterpreter.runParallel,
+    Stmt.Print: IterativeInterpreter.runPrint,
+    Stmt.Return: IterativeInterpreter.runReturn,
+    Stmt.Var: IterativeInterpreter.runVar,
+    Stmt.While: IterativeInterpreter.runWhile,
+    BlockExit: IterativeInterpreter.exitBlock,
+}
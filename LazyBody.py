@@ -0,0 +1,41 @@
+from typing import Dict, List
+import Stmt
+from Token import Token
+from TokenType import TokenType
+from ErrorReporter import ErrorHandling, LoxRuntimeError
+
+class LazyBody(list):
+
+    # A block or function body that was only brace-matched. It stays an
+    # empty list until parse() is called the first time the body runs;
+    # the owner then swaps in the parsed statements, so a body is
+    # recognised by type only while it is still pending.
+    # `functions` is the declaring parser's table of function names, which
+    # the purity check of memo functions in the body consults.
+    def __init__(self, tokens: List[Token], start: int, end: int, parserClass: type,
+                 functions: Dict[str, bool] = None):
+        super().__init__()
+        self.tokens = tokens
+        self.start = start
+        self.end = end
+        self.parserClass = parserClass
+        self.functions = functions if functions is not None else {}
+
+    def parse(self) -> List[Stmt.Stmt]:
+        closing: Token = self.tokens[self.end]
+        tokens = self.tokens[self.start:self.end] + [Token(TokenType.EOF, "", None, closing.line)]
+
+        hadError = ErrorHandling.hadError
+        ErrorHandling.hadError = False
+        parser = self.parserClass(tokens, lazy=True)
+        parser.functions = self.functions
+        statements = parser.parse()
+        failed = ErrorHandling.hadError
+        ErrorHandling.hadError = hadError or failed
+        if failed:
+            ErrorHandling.flush()
+            raise LoxRuntimeError(self.tokens[self.start - 1], "Syntax error in body.")
+        return statements
+
+    def __repr__(self) -> str:
+        return f'<lazy body, lines {self.tokens[self.start - 1].line}-{self.tokens[self.end].line}>'
@@ -0,0 +1,238 @@
+import operator
+from typing import Callable, Dict, List, Set, Tuple
+import Expr
+import Stmt
+from TokenType import TokenType
+from ErrorReporter import LoxRuntimeError
+from LazyBody import LazyBody
+from LoopTier import Placeholder, Tiering
+
+# Expressions whose value depends only on the variables they read.
+PURE = (Expr.Literal, Placeholder, Expr.Variable, Expr.Grouping, Expr.Unary, Expr.Binary, Expr.Logical, Expr.Ternary)
+
+# Conditions a counted loop may test its counter with.
+COUNTED: Dict[TokenType, Callable[[float, float], bool]] = {
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+def children(node: object) -> List[object]:
+    found: List[object] = []
+    for value in vars(node).values():
+        if isinstance(value, list):
+            found.extend(item for item in value if isinstance(item, (Expr.Expr, Stmt.Stmt)))
+        elif isinstance(value, (Expr.Expr, Stmt.Stmt)):
+            found.append(value)
+    return found
+
+# Blocks in a loop that are still waiting to be parsed, not counting
+# function bodies, which do not run as part of the loop.
+def lazyBlocks(stmt: Stmt.While) -> List[Stmt.Block]:
+    blocks: List[Stmt.Block] = []
+    work: List[object] = [stmt.body]
+    while work:
+        node = work.pop()
+        if type(node) is Stmt.Block and type(node.statements) is LazyBody:
+            blocks.append(node)
+        elif not isinstance(node, Stmt.Function):
+            work.extend(children(node))
+    return blocks
+
+class LoopPlan:
+
+    # What LoopOptimizer found in one while loop. Each slot is a
+    # (node, attribute) holding an invariant expression; on entry to the
+    # loop the expression is evaluated once and a literal takes its place
+    # until the loop is left. A counted loop also keeps its counter in a
+    # Python float instead of re-walking the condition and increment.
+    def __init__(self, stmt: Stmt.While):
+        self.stmt = stmt
+        self.slots: List[Tuple[object, str]] = []
+        self.placeholders: List[Placeholder] = []
+        self.counter: str = None
+        self.compare: Callable[[float, float], bool] = None
+        self.limit: Expr.Binary = None
+        self.step: Expr.Binary = None
+        self.statements: Tuple[Stmt.Stmt, ...] = ()
+
+    def run(self, interpreter) -> None:
+        slots = self.slots
+        saved = [getattr(node, name) for node, name in slots]
+        try:
+            values = [interpreter.evaluate(expr) for expr in saved]
+        except LoxRuntimeError:
+            # The loop reports the error itself if it ever gets there.
+            # Compiled loops read this plan's placeholders, which are not
+            # filled in, so the loop stays in the tree walker.
+            tiering, interpreter.tiering = interpreter.tiering, None
+            try:
+                return interpreter.whileLoop(self.stmt)
+            finally:
+                interpreter.tiering = tiering
+
+        for (node, name), placeholder, value in zip(slots, self.placeholders, values):
+            placeholder.value = value
+            setattr(node, name, placeholder)
+        try:
+            if self.counter is None or not self.count(interpreter):
+                interpreter.whileLoop(self.stmt)
+        finally:
+            for (node, name), expr in zip(slots, saved):
+                setattr(node, name, expr)
+        return None
+
+    # Runs a counted loop, or returns False when its counter, bound or
+    # step is not a number and the generic loop has to report it.
+    def count(self, interpreter) -> bool:
+        name = self.counter
+        environment = interpreter.environment
+        while environment is not None and name not in environment.values:
+            environment = environment.enclosing
+        if environment is None:
+            return False
+
+        values = environment.values
+        index = values[name]
+        end = interpreter.evaluate(self.limit.right)
+        step = interpreter.evaluate(self.step.right)
+        if not (type(index) is float and type(end) is float and type(step) is float):
+            return False
+
+        compare, statements, execute = self.compare, self.statements, interpreter.execute
+        tiering = interpreter.tiering
+        if tiering is None:
+            while compare(index, end):
+                for statement in statements:
+                    execute(statement)
+                index += step
+                values[name] = index
+            return True
+
+        iterations = tiering.enter(interpreter, self.stmt)
+        if iterations is None:
+            return True
+        index = values[name]
+        try:
+            while compare(index, end):
+                for statement in statements:
+                    execute(statement)
+                index += step
+                values[name] = index
+                iterations += 1
+                if iterations == Tiering.THRESHOLD:
+                    if tiering.promote(interpreter, self.stmt):
+                        return True
+                    iterations = 0
+                    index = values[name]
+        finally:
+            tiering.counts[self.stmt] = iterations
+        return True
+
+class LoopOptimizer:
+
+    # Plans a while loop once its body has been classified. An
+    # expression is invariant when it is pure and reads no variable the
+    # loop assigns or declares. Loops that call functions, import, yield
+    # or still hold unparsed function bodies are left alone, since any of
+    # those can change a variable this pass cannot see. Loops with
+    # unparsed blocks are planned by the interpreter once they are parsed.
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def plan(self, stmt: Stmt.While) -> LoopPlan:
+        assigned = self.assignments(stmt)
+        if assigned is None:
+            return None
+        invariant = self.invariants(stmt, assigned)
+
+        plan = LoopPlan(stmt)
+        self.hoist(stmt, invariant, plan)
+        self.counted(stmt, assigned, invariant, plan)
+        if not plan.slots and plan.counter is None:
+            return None
+        plan.placeholders = [Placeholder(None) for _ in plan.slots]
+        return plan
+
+    # Counts assignments and declarations per name, or returns None when
+    # the loop cannot be planned.
+    def assignments(self, stmt: Stmt.While) -> Dict[str, int]:
+        assigned: Dict[str, int] = {}
+        work: List[object] = [stmt.condition, stmt.body]
+        while work:
+            node = work.pop()
+            if isinstance(node, (Expr.Call, Expr.Yield, Stmt.Import)):
+                return None
+            if any(type(value) is LazyBody for value in vars(node).values()):
+                return None
+            if isinstance(node, Expr.Assign):
+                name = node.name.lexeme
+            elif isinstance(node, (Stmt.Var, Stmt.Function)):
+                name = node.name.lexeme
+            elif isinstance(node, Stmt.Parallel):
+                name = node.target.lexeme
+            else:
+                name = None
+            if name is not None:
+                assigned[name] = assigned.get(name, 0) + 1
+            work.extend(children(node))
+        return assigned
+
+    # Post-order without recursion, since expressions may nest deeply.
+    def invariants(self, stmt: Stmt.While, assigned: Dict[str, int]) -> Set[Expr.Expr]:
+        invariant: Set[Expr.Expr] = set()
+        work: List[Tuple[object, bool]] = [(stmt.condition, False), (stmt.body, False)]
+        while work:
+            node, visited = work.pop()
+            if not visited:
+                work.append((node, True))
+                work.extend((child, False) for child in children(node))
+            elif type(node) is Expr.Variable:
+                if node.name.lexeme not in assigned:
+                    invariant.add(node)
+            elif type(node) in PURE and all(child in invariant for child in children(node)):
+                invariant.add(node)
+        return invariant
+
+    # Takes the largest invariant expressions that are not already
+    # literals. Function bodies are skipped; they run in their own frame.
+    def hoist(self, stmt: Stmt.While, invariant: Set[Expr.Expr], plan: LoopPlan):
+        work: List[object] = [stmt]
+        while work:
+            node = work.pop()
+            for name, value in vars(node).items():
+                if isinstance(value, Expr.Expr):
+                    if value in invariant:
+                        if type(value) is not Expr.Literal:
+                            plan.slots.append((node, name))
+                    else:
+                        work.append(value)
+                elif isinstance(value, Stmt.Stmt) and not isinstance(value, Stmt.Function):
+                    work.append(value)
+                elif isinstance(value, list):
+                    work.extend(item for item in value
+                                if isinstance(item, (Expr.Expr, Stmt.Stmt)) and not isinstance(item, Stmt.Function))
+
+    # Recognizes the loop Parser.forStatement builds for
+    # for (var i = a; i < b; i = i + c), with b and c invariant and i
+    # assigned only by the increment.
+    def counted(self, stmt: Stmt.While, assigned: Dict[str, int], invariant: Set[Expr.Expr], plan: LoopPlan):
+        condition, body = stmt.condition, stmt.body
+        if not (isinstance(condition, Expr.Binary) and condition.operator.type in COUNTED
+                and isinstance(condition.left, Expr.Variable) and condition.right in invariant):
+            return
+        name = condition.left.name.lexeme
+        if not (isinstance(body, Stmt.Block) and body in self.interpreter.flatBlocks and body.statements
+                and isinstance(body.statements[-1], Stmt.Expression)):
+            return
+        increment = body.statements[-1].expression
+        if not (isinstance(increment, Expr.Assign) and increment.name.lexeme == name and assigned[name] == 1
+                and isinstance(increment.value, Expr.Binary) and increment.value.operator.type == TokenType.PLUS
+                and isinstance(increment.value.left, Expr.Variable) and increment.value.left.name.lexeme == name
+                and increment.value.right in invariant):
+            return
+
+        plan.counter = name
+        plan.compare = COUNTED[condition.operator.type]
+        plan.limit = condition
+        plan.step = increment.value
+        plan.statements = tuple(body.statements[:-1])
@@ -0,0 +1,412 @@
+import operator
+import sys
+import time
+from typing import Callable, Dict, List, Set
+import Expr
+import Stmt
+from TokenType import TokenType
+from Return import Return
+from LazyBody import LazyBody
+
+class NotCompilable(Exception):
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class Placeholder(Expr.Literal):
+
+    # A literal LoopOptimizer refills each time its loop is entered.
+    # Compiled loops outlive a run, so they read its value as they go.
+    pass
+
+class CompiledLoop:
+
+    # A while loop compiled once and bound to the frames of each run.
+    # `names` are the variables it reads from outside the loop; bind()
+    # finds their frames for the run about to start. `valid` is cleared
+    # by a failed guard; the loop then hands back to the tree walker at
+    # the next iteration boundary, where no statement is half done.
+    def __init__(self, stmt: Stmt.While):
+        self.stmt = stmt
+        self.valid = True
+        self.failure: str = None
+        self.running = False
+        self.nodes = 0
+        self.names: List[str] = []
+        self.frames: List[dict] = []
+        self.environment = None
+        self.condition: Callable[[], object] = None
+        self.body: Callable[[], None] = None
+
+    def invalidate(self, token, reason: str):
+        if self.valid:
+            self.valid = False
+            self.failure = f"{reason} at line {token.line}"
+
+    # Returns False when a name the loop was compiled against is no
+    # longer defined, so the tree walker has to run it.
+    def bind(self, environment) -> bool:
+        frames = []
+        for name in self.names:
+            scope = environment
+            while scope is not None and name not in scope.values:
+                scope = scope.enclosing
+            if scope is None:
+                return False
+            frames.append(scope.values)
+        self.frames[:] = frames
+        self.environment = environment
+        self.valid = True
+        self.failure = None
+        return True
+
+    def run(self) -> bool:
+        condition, body = self.condition, self.body
+        while (value := condition()) is not None and value is not False:
+            body()
+            if not self.valid:
+                return False
+        return True
+
+# Operators with a float fast path. The fast path is the assumption the
+# compiled tier makes; anything else is computed by Interpreter.binary
+# and deoptimizes the loop.
+ARITHMETIC: Dict[TokenType, Callable[[float, float], object]] = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+class LoopCompiler:
+
+    # Turns a while loop into nested Python closures. Names declared
+    # inside the loop live in one dict per block. Outer names are found
+    # against the Environment chain live at compilation and read through
+    # CompiledLoop.frames, which bind() points at the frames of each
+    # run. That is only safe when nothing in the loop can capture a
+    # block frame or declare into an outer one, so functions, imports,
+    # parallel loops and yields are not compiled.
+    def __init__(self, interpreter, loop: CompiledLoop):
+        self.interpreter = interpreter
+        self.loop = loop
+        self.environment = interpreter.environment
+        self.scopes: List[Dict[str, object]] = []
+        self.declared: List[Set[str]] = []
+
+    def compile(self) -> CompiledLoop:
+        self.loop.condition = self.expression(self.loop.stmt.condition)
+        self.loop.body = self.statement(self.loop.stmt.body)
+        return self.loop
+
+    # Variables
+
+    def local(self, name: str) -> dict:
+        for scope, declared in zip(reversed(self.scopes), reversed(self.declared)):
+            if name in declared:
+                return scope
+        return None
+
+    # The index of an outer name in CompiledLoop.frames, or None when it
+    # is not defined yet.
+    def slot(self, name: str) -> int:
+        names = self.loop.names
+        if name in names:
+            return names.index(name)
+        environment = self.environment
+        while environment is not None and name not in environment.values:
+            environment = environment.enclosing
+        if environment is None:
+            return None
+        names.append(name)
+        return len(names) - 1
+
+    def read(self, expr: Expr.Variable) -> Callable[[], object]:
+        name = expr.name.lexeme
+        values = self.local(name)
+        if values is not None:
+            return lambda: values[name]
+        slot = self.slot(name)
+        if slot is None:
+            # Undefined now; Environment.get reports it as the walker would.
+            loop, token = self.loop, expr.name
+            return lambda: loop.environment.get(token)
+        frames = self.loop.frames
+        return lambda: frames[slot][name]
+
+    def write(self, expr: Expr.Assign, value: Callable[[], object]) -> Callable[[], object]:
+        name = expr.name.lexeme
+        values = self.local(name)
+        if values is not None:
+            def store():
+                values[name] = result = value()
+                return result
+            return store
+
+        slot = self.slot(name)
+        if slot is None:
+            loop, token = self.loop, expr.name
+            def assign():
+                result = value()
+                loop.environment.assign(token, result)
+                return result
+            return assign
+
+        frames = self.loop.frames
+        def storeOuter():
+            frames[slot][name] = result = value()
+            return result
+        return storeOuter
+
+    # Statements
+
+    def statement(self, stmt: Stmt.Stmt) -> Callable[[], None]:
+        self.loop.nodes += 1
+        interpreter = self.interpreter
+        match stmt:
+            case Stmt.Block():
+                return self.block(stmt)
+            case Stmt.Expression():
+                return self.expression(stmt.expression)
+            case Stmt.If():
+                condition = self.expression(stmt.condition)
+                thenBranch = self.statement(stmt.thenBranch)
+                if stmt.elseBranch is None:
+                    def branch():
+                        if (value := condition()) is not None and value is not False:
+                            thenBranch()
+                    return branch
+                elseBranch = self.statement(stmt.elseBranch)
+                def branches():
+                    if (value := condition()) is not None and value is not False:
+                        thenBranch()
+                    else:
+                        elseBranch()
+                return branches
+            case Stmt.Print():
+                value = self.expression(stmt.expression)
+                stringify = interpreter.stringify
+                return lambda: print(stringify(value()))
+            case Stmt.Return():
+                value = self.expression(stmt.value) if stmt.value is not None else lambda: None
+                def leave():
+                    raise Return(value())
+                return leave
+            case Stmt.Var():
+                value = self.expression(stmt.initializer) if stmt.initializer is not None else lambda: None
+                name = stmt.name.lexeme
+                # The initializer is resolved before the name is in scope.
+                values = self.scopes[-1] if self.scopes else None
+                if values is None:
+                    raise NotCompilable(f"declaration outside a block at line {stmt.name.line}")
+                self.declared[-1].add(name)
+                def define():
+                    values[name] = value()
+                return define
+            case Stmt.While():
+                condition = self.expression(stmt.condition)
+                body = self.statement(stmt.body)
+                def loop():
+                    while (value := condition()) is not None and value is not False:
+                        body()
+                return loop
+            case Stmt.Function():
+                raise NotCompilable(f"function declaration at line {stmt.name.line}")
+            case Stmt.Import():
+                raise NotCompilable(f"import at line {stmt.keyword.line}")
+            case Stmt.Parallel():
+                raise NotCompilable(f"parallel loop at line {stmt.keyword.line}")
+        raise NotCompilable(f"unsupported statement {type(stmt).__name__}")
+
+    def block(self, stmt: Stmt.Block) -> Callable[[], None]:
+        if type(stmt.statements) is LazyBody:
+            self.interpreter.forceBlock(stmt)
+        self.scopes.append({})
+        self.declared.append(set())
+        try:
+            statements = tuple(self.statement(statement) for statement in stmt.statements)
+        finally:
+            self.scopes.pop()
+            self.declared.pop()
+
+        if len(statements) == 1:
+            return statements[0]
+        def run():
+            for statement in statements:
+                statement()
+        return run
+
+    # Expressions
+
+    def expression(self, expr: Expr.Expr) -> Callable[[], object]:
+        self.loop.nodes += 1
+        interpreter = self.interpreter
+        loop = self.loop
+        match expr:
+            case Placeholder():
+                return lambda: expr.value
+            case Expr.Literal():
+                value = expr.value
+                return lambda: value
+            case Expr.Variable():
+                return self.read(expr)
+            case Expr.Grouping():
+                return self.expression(expr.expression)
+            case Expr.Assign():
+                return self.write(expr, self.expression(expr.value))
+            case Expr.Binary():
+                return self.binary(expr)
+            case Expr.Unary():
+                right = self.expression(expr.right)
+                if expr.operator.type == TokenType.BANG:
+                    return lambda: (value := right()) is None or value is False
+                operator = expr.operator
+                def negate():
+                    value = right()
+                    if type(value) is float:
+                        return -value
+                    loop.invalidate(operator, "non-number operand of '-'")
+                    return interpreter.unary(expr, value)
+                return negate
+            case Expr.Logical():
+                left = self.expression(expr.left)
+                right = self.expression(expr.right)
+                if expr.operator.type == TokenType.OR:
+                    def either():
+                        value = left()
+                        return value if value is not None and value is not False else right()
+                    return either
+                def both():
+                    value = left()
+                    return right() if value is not None and value is not False else value
+                return both
+            case Expr.Ternary():
+                condition = self.expression(expr.condition)
+                trueExpr = self.expression(expr.trueExpr)
+                falseExpr = self.expression(expr.falseExpr)
+                return lambda: trueExpr() if (value := condition()) is not None and value is not False else falseExpr()
+            case Expr.Call():
+                callee = self.expression(expr.callee)
+                arguments = tuple(self.expression(argument) for argument in expr.arguments)
+                call = interpreter.call
+                return lambda: call(expr, callee(), [argument() for argument in arguments])
+            case Expr.Index():
+                obj = self.expression(expr.object)
+                index = self.expression(expr.index)
+                return lambda: interpreter.index(expr, obj(), index())
+            case Expr.SetIndex():
+                obj = self.expression(expr.object)
+                index = self.expression(expr.index)
+                value = self.expression(expr.value)
+                def store():
+                    target, key = obj(), index()
+                    return interpreter.setIndex(expr, target, key, value())
+                return store
+            case Expr.Yield():
+                raise NotCompilable(f"yield at line {expr.keyword.line}")
+        raise NotCompilable(f"unsupported expression {type(expr).__name__}")
+
+    def binary(self, expr: Expr.Binary) -> Callable[[], object]:
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        interpreter, loop, operator = self.interpreter, self.loop, expr.operator
+        kind = operator.type
+
+        if kind == TokenType.EQUAL_EQUAL:
+            isEqual = interpreter.isEqual
+            return lambda: isEqual(left(), right())
+        if kind == TokenType.BANG_EQUAL:
+            isEqual = interpreter.isEqual
+            return lambda: not isEqual(left(), right())
+
+        if kind == TokenType.SLASH:
+            def divide():
+                a, b = left(), right()
+                if type(a) is float and type(b) is float and b != 0.0:
+                    return a / b
+                loop.invalidate(operator, "non-number or zero operand of '/'")
+                return interpreter.binary(expr, a, b)
+            return divide
+
+        fast = ARITHMETIC[kind]
+        def arithmetic():
+            a, b = left(), right()
+            if type(a) is float and type(b) is float:
+                return fast(a, b)
+            loop.invalidate(operator, f"non-number operand of '{operator.lexeme}'")
+            return interpreter.binary(expr, a, b)
+        return arithmetic
+
+class Tiering:
+
+    # Loops start in the tree walker. Iterations are counted per loop
+    # across all of its runs; once a loop passes THRESHOLD it is
+    # compiled, finishes the current run in the compiled tier and starts
+    # every later run there. A loop that cannot be compiled, or
+    # deoptimizes MAX_DEOPTS times, stays in the tree walker for good.
+    THRESHOLD = 256
+    MAX_DEOPTS = 3
+
+    def __init__(self, log: bool = False):
+        self.log = log
+        self.counts: Dict[Stmt.While, int] = {}
+        self.compiled: Dict[Stmt.While, CompiledLoop] = {}
+        self.deopts: Dict[Stmt.While, int] = {}
+        self.rejected: Set[Stmt.While] = set()
+
+    def report(self, stmt: Stmt.While, message: str):
+        if self.log:
+            print(f'[tier] while at line {stmt.keyword.line}: {message}', file=sys.stderr)
+
+    # Returns the iteration count the tree walker starts this run from,
+    # or None when a hot loop ran to the end in the compiled tier.
+    def enter(self, interpreter, stmt: Stmt.While) -> int:
+        iterations = self.counts.get(stmt, 0)
+        if iterations < Tiering.THRESHOLD:
+            return iterations
+        if self.promote(interpreter, stmt):
+            return None
+        return 0
+
+    # Runs the rest of the loop compiled. Returns True when the loop
+    # finished there, False when the tree walker has to carry on.
+    def promote(self, interpreter, stmt: Stmt.While) -> bool:
+        if stmt in self.rejected:
+            return False
+
+        loop = self.compiled.get(stmt)
+        if loop is None:
+            start = time.perf_counter()
+            try:
+                loop = LoopCompiler(interpreter, CompiledLoop(stmt)).compile()
+            except NotCompilable as error:
+                self.rejected.add(stmt)
+                self.report(stmt, f"not compiled, {error.reason}")
+                return False
+            self.compiled[stmt] = loop
+            self.report(stmt, f"promoted after {Tiering.THRESHOLD} iterations"
+                              f" ({loop.nodes} nodes in {(time.perf_counter() - start) * 1000:.2f} ms)")
+        # A recursive call re-entering the loop walks it; the compiled
+        # loop's block scopes belong to the outer run.
+        if loop.running or not loop.bind(interpreter.environment):
+            return False
+
+        loop.running = True
+        try:
+            if loop.run():
+                return True
+        finally:
+            loop.running = False
+
+        deopts = self.deopts.get(stmt, 0) + 1
+        self.deopts[stmt] = deopts
+        self.report(stmt, f"deoptimized, {loop.failure}")
+        if deopts >= Tiering.MAX_DEOPTS:
+            self.rejected.add(stmt)
+            del self.compiled[stmt]
+            self.report(stmt, f"kept in the tree walker after {deopts} deoptimizations")
+        return False
@@ -1,46 +1,204 @@
 import os
-from typing import List
+import sys
+from typing import Callable, List
 import Scanner
 from Token import Token
 from TokenType import *
 import Parser
+from PrattParser import PrattParser
 import Stmt
 from AstPrinter import AstPrinter
-from ErrorReporter import ErrorHandling
+from ErrorReporter import ErrorHandling, Diagnostics
 from Interpreter import Interpreter
+from IterativeInterpreter import IterativeInterpreter
+from ScopeAnalyzer import ScopeAnalyzer
+from Budget import Budget
+from Snapshot import Snapshot, SnapshotError
+from LoxModule import LoadedModules, ModuleCache
+from LoopTier import Tiering
+from ParallelScanner import ParallelScanner
+from MemoryProfile import MemoryProfile
+from Instrumentation import Tracer, Debugger
 directory = "/lox_script/"
 
 class Lox:
 
     interpreter: Interpreter = Interpreter()
+    flags = {"--memo-stats": False, "--iterative": False, "--no-tiering": False, "--tier-log": False,
+             "--parallel-scan": False, "--lazy-parse": False, "--mem-profile": False,
+             "--trace": False, "--step": False, "--no-loop-opt": False}
+    # Execution budgets, given as --name=value.
+    limits = {"--max-steps": None, "--time-limit": None, "--max-depth": None}
+    # Options given as --name=value: file paths, breakpoint lines as --break=3,7,
+    # the error cap as --max-errors=n and --diagnostics=text|json.
+    options = {"--save-snapshot": None, "--load-snapshot": None, "--mem-profile-json": None, "--break": None,
+               "--max-errors": None, "--diagnostics": None}
+    # Shared by every interpreter reset() creates, so parsed modules survive resets.
+    modules = ModuleCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lox_script'))
 
     @staticmethod
     def main( args: List[str]):
+        args = Lox.parseFlags(args)
+        if args is None:
+            exit(64)
 
         if len(args) > 1:
-            print('Usage: jlox p[script]')
+            print('Usage: jlox [--memo-stats] [--iterative] [--no-tiering] [--tier-log] [--parallel-scan] [--lazy-parse] [--mem-profile] [--trace] [--step] [--no-loop-opt] [--break=lines] [--max-steps=n] [--time-limit=s] [--max-depth=n]'
+                  ' [--max-errors=n] [--diagnostics=text|json]'
+                  ' [--load-snapshot=file] [--save-snapshot=file] [--mem-profile-json=file] p[script]')
             exit(64)
         elif len(args) == 1:
-            Lox.runFile(args)
+            Lox.runFile(args[0])
         else:
             Lox.runPrompt()
 
+    # Returns the remaining arguments, or None after reporting a bad flag.
+    @staticmethod
+    def parseFlags(args: List[str]) -> List[str]:
+        remaining = []
+        for arg in args:
+            name, _, value = arg.partition("=")
+            if not arg.startswith("--"):
+                remaining.append(arg)
+            elif arg in Lox.flags:
+                Lox.flags[arg] = True
+            elif name in Lox.limits and Lox.isLimit(value):
+                Lox.limits[name] = float(value)
+            elif name in Lox.options and Lox.isOption(name, value):
+                Lox.options[name] = value
+            else:
+                print(f'Unknown option {arg}')
+                return None
+
+        Lox.reset()
+        return remaining
+
+    @staticmethod
+    def isLimit(value: str) -> bool:
+        try:
+            return float(value) > 0
+        except ValueError:
+            return False
+
+    @staticmethod
+    def isLineList(value: str) -> bool:
+        return all(line.isdigit() for line in value.split(","))
+
+    @staticmethod
+    def isOption(name: str, value: str) -> bool:
+        match name:
+            case "--break":
+                return bool(value) and Lox.isLineList(value)
+            case "--max-errors":
+                return value.isdigit() and int(value) > 0
+            case "--diagnostics":
+                return value in Diagnostics.FORMATS
+        return bool(value)
+
+    @staticmethod
+    def reset():
+        Lox.interpreter = IterativeInterpreter() if Lox.flags["--iterative"] else Interpreter()
+        if any(limit is not None for limit in Lox.limits.values()):
+            steps, depth = Lox.limits["--max-steps"], Lox.limits["--max-depth"]
+            Lox.interpreter.budget = Budget(
+                None if steps is None else int(steps),
+                Lox.limits["--time-limit"],
+                None if depth is None else int(depth))
+        Lox.interpreter.modules = LoadedModules(Lox.modules)
+        Lox.interpreter.tiering = None if Lox.flags["--no-tiering"] else Tiering(Lox.flags["--tier-log"])
+        Lox.interpreter.optimizeLoops = not Lox.flags["--no-loop-opt"]
+        if Lox.flags["--trace"]:
+            Lox.interpreter.instrument(Tracer())
+        elif Lox.flags["--step"] or Lox.options["--break"]:
+            breakpoints = Lox.options["--break"]
+            debugger = Debugger({int(line) for line in breakpoints.split(",")} if breakpoints else set())
+            debugger.stepping = Lox.flags["--step"]
+            Lox.interpreter.instrument(debugger)
+        maxErrors = Lox.options["--max-errors"]
+        ErrorHandling.diagnostics = Diagnostics(int(maxErrors) if maxErrors else Diagnostics.DEFAULT_LIMIT,
+                                                Lox.options["--diagnostics"] or "text")
+        ErrorHandling.hadError = False
+        ErrorHandling.hadRuntimeError = False
+        ErrorHandling.hadBudgetError = False
+
+    @staticmethod
+    def scriptPath(filename: str) -> str:
+        script_directory = os.path.dirname(os.path.abspath(__file__))
+        directory = os.path.join(script_directory, 'lox_script')
+        return os.path.join(directory, filename)
+
     @staticmethod     
     def runFile(filename: str):
-        script_directory = os.path.dirname(__file__)
-        directory = os.path.join(script_directory, 'lox_script')        
-        file_path = os.path.join(directory, filename[0])
-
-        with open(file_path, 'r') as file:
+        path = Lox.scriptPath(filename)
+        with open(path, 'r') as file:
             file_contents = file.read()
+        Lox.modules.root = os.path.dirname(path)
+
+        code = Lox.runScript(file_contents)
+        if code:
+            exit(code)
+
+    # Runs one script under the current flags and options and returns its
+    # exit code. LoxDaemon passes `parse` to reuse the trees it caches.
+    @staticmethod
+    def runScript(source: str, parse: Callable[[str], List[Stmt.Stmt]] = None) -> int:
+        if Lox.options["--load-snapshot"]:
+            code = Lox.loadSnapshot(Lox.options["--load-snapshot"])
+            if code:
+                return code
+
+        if Lox.flags["--mem-profile"] or Lox.options["--mem-profile-json"]:
+            Lox.runProfiled(source)
+        else:
+            statements: List[Stmt.Stmt] = (parse or Lox.parse)(source)
+            if not ErrorHandling.hadError:
+                Lox.execute(statements)
+
+        if Lox.options["--save-snapshot"] and not Lox.exitCode():
+            code = Lox.saveSnapshot(Lox.options["--save-snapshot"])
+            if code:
+                return code
 
-        # Print the file contents
-        Lox.run(file_contents)
+        if Lox.flags["--memo-stats"]:
+            Lox.reportMemoStats()
 
+        return Lox.exitCode()
+
+    # Returns 0, or the exit code for a snapshot that cannot be written.
+    @staticmethod
+    def saveSnapshot(path: str) -> int:
+        try:
+            Snapshot.save(Lox.interpreter, path)
+        except OSError as error:
+            print(f'Cannot write snapshot: {error}')
+            return 74
+        except SnapshotError as error:
+            print(f'Cannot save snapshot: {error}')
+            return 70
+        return 0
+
+    # Returns 0, or the exit code for a snapshot that cannot be loaded.
+    @staticmethod
+    def loadSnapshot(path: str) -> int:
+        try:
+            Snapshot.load(Lox.interpreter, path)
+        except OSError as error:
+            print(f'Cannot read snapshot: {error}')
+            return 66
+        except SnapshotError as error:
+            print(f'Invalid snapshot: {error}')
+            return 65
+        return 0
+
+    @staticmethod
+    def exitCode() -> int:
         if ErrorHandling.hadError: 
-            exit(65)
+            return 65
+        if ErrorHandling.hadBudgetError:
+            return 124
         if ErrorHandling.hadRuntimeError:
-            exit(70)
+            return 70
+        return 0
 
     @staticmethod    
     def runPrompt():
@@ -53,7 +211,7 @@ class Lox:
                     print("Exiting REPL...")
                     break
 
-                Lox.run(line)
+                Lox.run(line, keepFiles=True)
                 ErrorHandling.hadError = False
 
             except EOFError:
@@ -65,19 +223,69 @@ class Lox:
                 # Handle Ctrl+C (interrupt)
                 print("\nKeyboard Interrupt detected. Exiting REPL...")
                 break
+        Lox.interpreter.files.closeAll()
 
     @staticmethod
-    def run(source: str):
-        scanner: Scanner = Scanner.Scanner(source)
-        tokens: List[Token] = scanner.scanTokens()
-        parser: Parser = Parser.Parser(tokens)
-        statements: Stmt.Stmt = parser.parse()
+    def reportMemoStats():
+        for line in Lox.interpreter.memoStats():
+            print(line, file=sys.stderr)
 
+    @staticmethod
+    def run(source: str, keepFiles: bool = False):
+        statements: List[Stmt.Stmt] = Lox.parse(source)
 
         if ErrorHandling.hadError: return
 
-        Lox.interpreter.interpret(statements)
-        
+        Lox.execute(statements, keepFiles)
+
+    # Runs source phase by phase under tracemalloc and reports memory use.
+    @staticmethod
+    def runProfiled(source: str):
+        profile = MemoryProfile()
+        profile.start()
+        try:
+            with profile.phase("scan"):
+                tokens: List[Token] = Lox.scan(source)
+            with profile.phase("parse"):
+                statements: List[Stmt.Stmt] = Lox.parseTokens(tokens)
+            if not ErrorHandling.hadError:
+                with profile.phase("interpret"):
+                    Lox.execute(statements)
+        finally:
+            # The census runs while tokens and statements are still alive,
+            # after tracing stops so that its own allocations are not counted.
+            profile.stop()
+        profile.census()
+
+        if Lox.flags["--mem-profile"]:
+            profile.report(sys.stderr)
+        if Lox.options["--mem-profile-json"]:
+            profile.save(Lox.options["--mem-profile-json"])
+
+    @staticmethod
+    def parse(source: str) -> List[Stmt.Stmt]:
+        return Lox.parseTokens(Lox.scan(source))
+
+    @staticmethod
+    def scan(source: str) -> List[Token]:
+        if Lox.flags["--parallel-scan"]:
+            interpreter = Lox.interpreter
+            return ParallelScanner(source, interpreter.parallelExecutor(), interpreter.parallelWorkers).scanTokens()
+        scanner: Scanner = Scanner.Scanner(source)
+        return scanner.scanTokens()
+
+    # Scanner and parser errors are printed together once parsing is done.
+    @staticmethod
+    def parseTokens(tokens: List[Token]) -> List[Stmt.Stmt]:
+        parser: Parser = PrattParser(tokens, Lox.flags["--lazy-parse"])
+        statements = parser.parse()
+        ErrorHandling.flush()
+        return statements
+
+    @staticmethod
+    def execute(statements: List[Stmt.Stmt], keepFiles: bool = False):
+        ScopeAnalyzer(Lox.interpreter).analyze(statements)
+        Lox.interpreter.interpret(statements, keepFiles)
+
 if __name__ == "__main__":
-    import sys
     Lox.main(sys.argv[1:])
\ No newline at end of file
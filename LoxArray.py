@@ -0,0 +1,103 @@
+from array import array
+from typing import List
+import operator
+from ErrorReporter import LoxRuntimeError
+from NativeFunction import NativeFunction
+
+class LoxArray:
+
+    def __init__(self, values: array):
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, bracket, index: object) -> float:
+        return self.values[self.checkIndex(bracket, index)]
+
+    def set(self, bracket, index: object, value: object):
+        position = self.checkIndex(bracket, index)
+        if not isinstance(value, float):
+            raise LoxRuntimeError(bracket, "Array elements must be numbers.")
+        self.values[position] = value
+
+    def checkIndex(self, bracket, index: object) -> int:
+        if not isinstance(index, float) or not index.is_integer():
+            raise LoxRuntimeError(bracket, "Array index must be a whole number.")
+
+        position = int(index)
+        if position < 0 or position >= len(self.values):
+            raise LoxRuntimeError(bracket, f"Array index {position} out of range for length {len(self.values)}.")
+        return position
+
+    # Natives raise with a None token; the call site fills in its paren.
+    @staticmethod
+    def check(value: object, name: str) -> 'LoxArray':
+        if not isinstance(value, LoxArray):
+            raise LoxRuntimeError(None, f"{name}() expects an array.")
+        return value
+
+    @staticmethod
+    def checkLength(value: object, name: str) -> int:
+        if not isinstance(value, float) or not value.is_integer() or value < 0:
+            raise LoxRuntimeError(None, f"{name}() expects a non-negative whole number.")
+        return int(value)
+
+    @staticmethod
+    def create(length: object) -> 'LoxArray':
+        return LoxArray(array('d', bytes(8 * LoxArray.checkLength(length, "array"))))
+
+    @staticmethod
+    def sum(value: object) -> float:
+        return float(sum(LoxArray.check(value, "sum").values))
+
+    @staticmethod
+    def min(value: object) -> float:
+        values = LoxArray.check(value, "min").values
+        if not values:
+            raise LoxRuntimeError(None, "min() of an empty array.")
+        return min(values)
+
+    @staticmethod
+    def max(value: object) -> float:
+        values = LoxArray.check(value, "max").values
+        if not values:
+            raise LoxRuntimeError(None, "max() of an empty array.")
+        return max(values)
+
+    @staticmethod
+    def dot(left: object, right: object) -> float:
+        a = LoxArray.check(left, "dot").values
+        b = LoxArray.check(right, "dot").values
+        if len(a) != len(b):
+            raise LoxRuntimeError(None, "dot() expects arrays of the same length.")
+        return float(sum(map(operator.mul, a, b)))
+
+    @staticmethod
+    def fill(target: object, value: object) -> None:
+        values = LoxArray.check(target, "fill").values
+        if not isinstance(value, float):
+            raise LoxRuntimeError(None, "fill() expects a number.")
+        values[:] = array('d', [value]) * len(values)
+        return None
+
+    @staticmethod
+    def slice(source: object, start: object, end: object) -> 'LoxArray':
+        values = LoxArray.check(source, "slice").values
+        first = LoxArray.checkLength(start, "slice")
+        last = LoxArray.checkLength(end, "slice")
+        if first > last or last > len(values):
+            raise LoxRuntimeError(None, f"slice() range {first}..{last} out of bounds for length {len(values)}.")
+        return LoxArray(values[first:last])
+
+    @staticmethod
+    def natives() -> List[NativeFunction]:
+        return [
+            NativeFunction("array", 1, LoxArray.create),
+            NativeFunction("sum", 1, LoxArray.sum),
+            NativeFunction("min", 1, LoxArray.min),
+            NativeFunction("max", 1, LoxArray.max),
+            NativeFunction("dot", 2, LoxArray.dot),
+            NativeFunction("fill", 2, LoxArray.fill),
+            NativeFunction("slice", 3, LoxArray.slice),
+        ]
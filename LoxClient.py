@@ -0,0 +1,82 @@
+import json
+import os
+import socket
+import struct
+import sys
+from typing import List, Tuple
+
+# Frames are a one-byte kind, a four-byte length and the payload.
+HEADER = struct.Struct("!cI")
+REQUEST = b"r"
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+
+DEFAULT_SOCKET = os.environ.get("LOX_SOCKET") or os.path.join(
+    os.environ.get("TMPDIR", "/tmp"), f"lox-{os.getuid()}.sock")
+
+def writeFrame(conn: socket.socket, kind: bytes, payload: bytes):
+    conn.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+def readExactly(conn: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed mid-frame")
+        data += chunk
+    return bytes(data)
+
+def readFrame(conn: socket.socket) -> Tuple[bytes, bytes]:
+    kind, size = HEADER.unpack(readExactly(conn, HEADER.size))
+    return kind, readExactly(conn, size)
+
+# A drop-in for `python Lox.py` that runs scripts on a warm LoxDaemon.
+# Kept free of interpreter imports so that it starts quickly.
+class LoxClient:
+
+    @staticmethod
+    def main(args: List[str]):
+        socketPath = DEFAULT_SOCKET
+        if args[:1] == ["--socket"] and len(args) > 1:
+            socketPath = args[1]
+            args = args[2:]
+
+        flags = [arg for arg in args if arg.startswith("--")]
+        scripts = [arg for arg in args if not arg.startswith("--")]
+        if len(scripts) != 1:
+            print('Usage: loxc [--socket path] [lox options] script|-')
+            exit(64)
+
+        request = {"flags": flags}
+        if scripts[0] == "-":
+            request["source"] = sys.stdin.read()
+        else:
+            request["path"] = scripts[0]
+
+        exit(LoxClient.run(socketPath, request))
+
+    @staticmethod
+    def run(socketPath: str, request: dict) -> int:
+        try:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.connect(socketPath)
+        except OSError as error:
+            print(f'Cannot reach lox daemon at {socketPath}: {error}', file=sys.stderr)
+            return 69
+
+        with conn:
+            writeFrame(conn, REQUEST, json.dumps(request).encode())
+            while True:
+                kind, payload = readFrame(conn)
+                if kind == STDOUT:
+                    sys.stdout.buffer.write(payload)
+                    sys.stdout.flush()
+                elif kind == STDERR:
+                    sys.stderr.buffer.write(payload)
+                    sys.stderr.flush()
+                elif kind == EXIT:
+                    return int(payload)
+
+if __name__ == "__main__":
+    LoxClient.main(sys.argv[1:])
@@ -0,0 +1,191 @@
+import contextlib
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import List, Set, Tuple
+import Stmt
+from ErrorReporter import ErrorHandling
+from Lox import Lox
+from LoxClient import DEFAULT_SOCKET, EXIT, REQUEST, STDERR, STDOUT, readFrame, writeFrame
+from MemoCache import MemoCache
+
+class FrameWriter:
+
+    # Buffers text written to stdout/stderr and sends it as frames once
+    # the buffer fills or a line ends after a short pause.
+    LIMIT = 8192
+    INTERVAL = 0.05
+
+    def __init__(self, conn: socket.socket, kind: bytes):
+        self.conn = conn
+        self.kind = kind
+        self.buffer: List[str] = []
+        self.size = 0
+        self.sent = time.monotonic()
+
+    def write(self, text: str) -> int:
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= FrameWriter.LIMIT or (text.endswith("\n") and time.monotonic() - self.sent >= FrameWriter.INTERVAL):
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            writeFrame(self.conn, self.kind, "".join(self.buffer).encode())
+            self.buffer.clear()
+            self.size = 0
+        self.sent = time.monotonic()
+
+class LoxDaemon:
+
+    # Keeps `workers` pre-forked processes, with every interpreter module
+    # already imported, accepting LoxClient requests on a Unix socket.
+    # Each worker caches parsed scripts by path, modification time and
+    # the flags that change how a script is parsed.
+    CACHE_SIZE = 256
+    PARSE_FLAGS = ("--lazy-parse", "--parallel-scan")
+
+    def __init__(self, socketPath: str, workers: int):
+        self.socketPath = socketPath
+        self.workers = workers
+        self.children: Set[int] = set()
+        self.running = True
+        self.server: socket.socket = None
+        self.cache = MemoCache(LoxDaemon.CACHE_SIZE)
+        self.defaults = dict(Lox.flags)
+        self.defaultLimits = dict(Lox.limits)
+        self.defaultOptions = dict(Lox.options)
+
+    @staticmethod
+    def main(args: List[str]):
+        socketPath = DEFAULT_SOCKET
+        workers = os.cpu_count() or 1
+        while args[:1] in (["--socket"], ["--workers"]) and len(args) > 1:
+            if args[0] == "--socket":
+                socketPath = args[1]
+            else:
+                workers = int(args[1])
+            args = args[2:]
+
+        if Lox.parseFlags(args) != []:
+            print('Usage: loxd [--socket path] [--workers n] [lox options]')
+            exit(64)
+
+        LoxDaemon(socketPath, workers).serve()
+
+    def serve(self):
+        if os.path.exists(self.socketPath):
+            os.unlink(self.socketPath)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socketPath)
+        self.server.listen(64)
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        try:
+            while self.running:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                self.children.discard(pid)
+                if self.running:
+                    self.spawn()
+        finally:
+            self.server.close()
+            if os.path.exists(self.socketPath):
+                os.unlink(self.socketPath)
+
+    def stop(self, signum, frame):
+        self.running = False
+        for pid in list(self.children):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            try:
+                self.work()
+            finally:
+                os._exit(0)
+        self.children.add(pid)
+
+    def work(self):
+        while True:
+            conn, _ = self.server.accept()
+            with conn:
+                try:
+                    self.handle(conn)
+                except (ConnectionError, BrokenPipeError):
+                    pass
+
+    def handle(self, conn: socket.socket):
+        kind, payload = readFrame(conn)
+        if kind != REQUEST:
+            return
+
+        out = FrameWriter(conn, STDOUT)
+        err = FrameWriter(conn, STDERR)
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = self.run(json.loads(payload))
+        out.flush()
+        err.flush()
+        writeFrame(conn, EXIT, str(code).encode())
+
+    def run(self, request: dict) -> int:
+        Lox.flags.update(self.defaults)
+        Lox.limits.update(self.defaultLimits)
+        Lox.options.update(self.defaultOptions)
+        try:
+            if Lox.parseFlags(request.get("flags", [])) is None:
+                return 64
+
+            key, source = self.load(request)
+            return Lox.runScript(source, lambda source: self.parse(key, source))
+        except OSError as error:
+            print(f'Cannot read script: {error}', file=sys.stderr)
+            return 66
+        except Exception:
+            traceback.print_exc()
+            return 70
+
+    # Returns the parse cache key and the source of a request.
+    def load(self, request: dict) -> Tuple[tuple, str]:
+        if "source" in request:
+            source = request["source"]
+            Lox.modules.root = os.path.dirname(Lox.scriptPath(""))
+            return ("source", source), source
+
+        path = Lox.scriptPath(request["path"])
+        Lox.modules.root = os.path.dirname(path)
+        status = os.stat(path)
+        with open(path, 'r') as file:
+            source = file.read()
+        return (path, status.st_mtime_ns, status.st_size), source
+
+    def parse(self, key: tuple, source: str) -> List[Stmt.Stmt]:
+        key += tuple(Lox.flags[flag] for flag in LoxDaemon.PARSE_FLAGS)
+        found, statements = self.cache.lookup(key)
+        if found:
+            return statements
+
+        statements = Lox.parse(source)
+        if not ErrorHandling.hadError:
+            self.cache.store(key, statements)
+        return statements
+
+if __name__ == "__main__":
+    LoxDaemon.main(sys.argv[1:])
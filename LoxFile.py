@@ -0,0 +1,78 @@
+from typing import Iterator, List, Set
+from ErrorReporter import LoxRuntimeError
+from NativeFunction import NativeFunction
+
+class LoxFile:
+
+    BUFFER = 1 << 16
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.file = open(path, mode, buffering=LoxFile.BUFFER, encoding="utf-8", newline="")
+        self.lines: Iterator[str] = (line.rstrip("\r\n") for line in self.file) if mode == "r" else None
+
+    def __str__(self) -> str:
+        return f'<file {self.path}>'
+
+class FileTable:
+
+    # Owns every file a script opens, so that the interpreter can close
+    # them all when the script ends or fails with a runtime error.
+    MODES = ("r", "w", "a")
+
+    def __init__(self):
+        self.open: Set[LoxFile] = set()
+
+    def check(self, value: object, name: str, reading: bool = None) -> LoxFile:
+        if not isinstance(value, LoxFile):
+            raise LoxRuntimeError(None, f"{name}() expects a file.")
+        if value not in self.open:
+            raise LoxRuntimeError(None, f"{name}() on closed file {value.path}.")
+        if reading is not None and (value.mode == "r") != reading:
+            raise LoxRuntimeError(None, f"{name}() needs a file opened for {'reading' if reading else 'writing'}.")
+        return value
+
+    def openFile(self, path: object, mode: object) -> LoxFile:
+        if not isinstance(path, str) or mode not in FileTable.MODES:
+            raise LoxRuntimeError(None, "open() expects a path and one of \"r\", \"w\", \"a\".")
+        try:
+            handle = LoxFile(path, mode)
+        except OSError as error:
+            raise LoxRuntimeError(None, f"Cannot open {path}: {error.strerror}.")
+        self.open.add(handle)
+        return handle
+
+    def readLine(self, handle: object) -> object:
+        return next(self.check(handle, "readLine", True).lines, None)
+
+    def write(self, handle: object, text: object) -> None:
+        if not isinstance(text, str):
+            raise LoxRuntimeError(None, "write() expects a string.")
+        self.check(handle, "write", False).file.write(text)
+        return None
+
+    def writeLine(self, handle: object, text: object) -> None:
+        self.write(handle, text)
+        handle.file.write("\n")
+        return None
+
+    def close(self, handle: object) -> None:
+        self.check(handle, "close")
+        self.open.discard(handle)
+        handle.file.close()
+        return None
+
+    def closeAll(self):
+        for handle in list(self.open):
+            self.open.discard(handle)
+            handle.file.close()
+
+    def natives(self) -> List[NativeFunction]:
+        return [
+            NativeFunction("open", 2, self.openFile),
+            NativeFunction("readLine", 1, self.readLine),
+            NativeFunction("write", 2, self.write),
+            NativeFunction("writeLine", 2, self.writeLine),
+            NativeFunction("close", 1, self.close),
+        ]
@@ -0,0 +1,70 @@
+from typing import List, Set
+import Stmt
+import Environment
+from LoxCallable import LoxCallable
+from MemoCache import MemoCache
+from Return import Return
+from Coroutines import YieldFinder, LoxGenerator
+from LazyBody import LazyBody
+from ScopeAnalyzer import ScopeAnalyzer
+
+class LoxFunction(LoxCallable):
+
+    def __init__(self, declaration: Stmt.Function, closure: Environment):
+        self.declaration = declaration
+        self.closure = closure
+        self.cache: MemoCache = None
+        if declaration.memo is not None:
+            self.cache = MemoCache(declaration.memo)
+        # Found on the first call, when a lazy body has been parsed.
+        self.suspending: Set[object] = None
+
+    def arity(self) -> int:
+        return len(self.declaration.params)
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        if self.suspending is None:
+            self.prepare(interpreter)
+
+        # A body that yields is not run here; calling it makes a generator.
+        if self.suspending:
+            return LoxGenerator(interpreter, self, arguments, self.suspending)
+        if self.cache is None:
+            return self.invoke(interpreter, arguments)
+
+        key = MemoCache.key(arguments)
+        if key is None:
+            return self.invoke(interpreter, arguments)
+        found, value = self.cache.lookup(key)
+        if found:
+            return value
+
+        value = self.invoke(interpreter, arguments)
+        self.cache.store(key, value)
+        return value
+
+    # A pre-parsed body is parsed on the first call. YieldFinder parses
+    # the blocks nested in it, so the whole body is then classified.
+    def prepare(self, interpreter):
+        declaration = self.declaration
+        lazy = type(declaration.body) is LazyBody
+        if lazy:
+            declaration.body = declaration.body.parse()
+        self.suspending = YieldFinder.suspendingNodes(declaration)
+        if lazy:
+            ScopeAnalyzer(interpreter).analyze(declaration.body)
+
+    def invoke(self, interpreter, arguments: List[object]) -> object:
+        environment = Environment.Environment(self.closure)
+        for param, argument in zip(self.declaration.params, arguments):
+            environment.define(param.lexeme, argument)
+
+        try:
+            interpreter.executeBlock(self.declaration.body, environment)
+        except Return as returnValue:
+            return returnValue.value
+
+        return None
+
+    def __str__(self) -> str:
+        return f'<fn {self.declaration.name.lexeme}>'
@@ -0,0 +1,61 @@
+from typing import List
+from ErrorReporter import LoxRuntimeError
+from NativeFunction import NativeFunction
+
+class LoxMap:
+
+    # Entries are stored as key -> (original key, value). Keys are
+    # tagged with their type so that hashing agrees with Lox equality,
+    # where true and 1 are different values.
+    def __init__(self):
+        self.entries = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def key(token, key: object) -> tuple:
+        if key is None or isinstance(key, (bool, float, str)):
+            return (type(key), key)
+        raise LoxRuntimeError(token, "Map keys must be nil, booleans, numbers or strings.")
+
+    def get(self, token, key: object) -> object:
+        entry = self.entries.get(LoxMap.key(token, key))
+        return None if entry is None else entry[1]
+
+    def set(self, token, key: object, value: object):
+        self.entries[LoxMap.key(token, key)] = (key, value)
+
+    def has(self, token, key: object) -> bool:
+        return LoxMap.key(token, key) in self.entries
+
+    def delete(self, token, key: object) -> bool:
+        return self.entries.pop(LoxMap.key(token, key), None) is not None
+
+    def items(self):
+        return self.entries.values()
+
+    # Natives raise with a None token; the call site fills in its paren.
+    @staticmethod
+    def check(value: object, name: str) -> 'LoxMap':
+        if not isinstance(value, LoxMap):
+            raise LoxRuntimeError(None, f"{name}() expects a map.")
+        return value
+
+    @staticmethod
+    def keys(value: object) -> 'LoxMap':
+        keys = LoxMap()
+        for position, (key, _) in enumerate(LoxMap.check(value, "keys").items()):
+            keys.entries[(float, float(position))] = (float(position), key)
+        return keys
+
+    @staticmethod
+    def natives() -> List[NativeFunction]:
+        return [
+            NativeFunction("map", 0, LoxMap),
+            NativeFunction("get", 2, lambda m, k: LoxMap.check(m, "get").get(None, k)),
+            NativeFunction("set", 3, lambda m, k, v: LoxMap.check(m, "set").set(None, k, v)),
+            NativeFunction("has", 2, lambda m, k: LoxMap.check(m, "has").has(None, k)),
+            NativeFunction("delete", 2, lambda m, k: LoxMap.check(m, "delete").delete(None, k)),
+            NativeFunction("keys", 1, LoxMap.keys),
+        ]
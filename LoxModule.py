@@ -0,0 +1,117 @@
+import os
+import time
+from typing import Dict, List, Tuple
+import Scanner
+import Stmt
+from PrattParser import PrattParser
+from ScopeAnalyzer import ScopeAnalyzer
+from Token import Token
+import Environment
+from ErrorReporter import LoxRuntimeError, ErrorHandling
+
+class CompiledModule:
+
+    # The parsed statements of one version of a module file.
+    def __init__(self, path: str, mtime: float, statements: List[Stmt.Stmt]):
+        self.path = path
+        self.mtime = mtime
+        self.statements = statements
+        # Monotonic time of the last check of mtime against the file.
+        self.checked = time.monotonic()
+
+class LoxModule:
+
+    # A compiled module run by one interpreter, in an environment that
+    # encloses that interpreter's globals.
+    def __init__(self, code: CompiledModule, environment: Environment):
+        self.code = code
+        self.environment = environment
+
+    def __str__(self) -> str:
+        return f'<module {self.code.path}>'
+
+class ModuleCache:
+
+    # Parsed modules, kept per process and keyed by absolute path, so
+    # they survive interpreter resets and daemon requests. A cached
+    # module is re-checked against its file's mtime at most every
+    # REVALIDATE seconds, so a repeated import between checks is a
+    # dictionary lookup. Running a module is left to each interpreter's
+    # LoadedModules, so no interpreter sees another's globals.
+    REVALIDATE = 2.0
+
+    def __init__(self, root: str = None):
+        self.root = root or os.getcwd()
+        self.compiled: Dict[str, CompiledModule] = {}
+        self.paths: Dict[Tuple[str, str], str] = {}
+
+    def resolve(self, base: str, name: str) -> str:
+        base = base or self.root
+        path = self.paths.get((base, name))
+        if path is None:
+            path = os.path.abspath(os.path.join(base, name))
+            self.paths[(base, name)] = path
+        return path
+
+    def compile(self, keyword: Token, name: str, path: str) -> CompiledModule:
+        code = self.compiled.get(path)
+        if code is not None and time.monotonic() - code.checked < ModuleCache.REVALIDATE:
+            return code
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            raise LoxRuntimeError(keyword, f"Cannot find module '{name}'.")
+
+        if code is not None and code.mtime == mtime:
+            code.checked = time.monotonic()
+            return code
+
+        with open(path, "r") as file:
+            source = file.read()
+
+        # A module that does not parse is a runtime error of the import,
+        # not a syntax error of the importing script.
+        hadError = ErrorHandling.hadError
+        ErrorHandling.hadError = False
+        statements = PrattParser(Scanner.Scanner(source).scanTokens()).parse()
+        failed = ErrorHandling.hadError
+        ErrorHandling.hadError = hadError
+        if failed:
+            ErrorHandling.flush()
+            raise LoxRuntimeError(keyword, f"Cannot compile module '{name}'.")
+
+        code = CompiledModule(path, mtime, statements)
+        self.compiled[path] = code
+        return code
+
+class LoadedModules:
+
+    # The modules one interpreter has run. Each runs once per version of
+    # its file; paths resolve relative to the importing module.
+    def __init__(self, cache: ModuleCache):
+        self.cache = cache
+        self.modules: Dict[str, LoxModule] = {}
+        # Paths of the modules being run, innermost last.
+        self.loading: List[str] = []
+
+    def load(self, interpreter, keyword: Token, name: str) -> LoxModule:
+        path = self.cache.resolve(os.path.dirname(self.loading[-1]) if self.loading else None, name)
+        if path in self.loading:
+            cycle = self.loading[self.loading.index(path):] + [path]
+            raise LoxRuntimeError(keyword, "Import cycle: " + " -> ".join(os.path.basename(p) for p in cycle) + ".")
+
+        code = self.cache.compile(keyword, name, path)
+        module = self.modules.get(path)
+        if module is not None and module.code is code:
+            return module
+
+        ScopeAnalyzer(interpreter).analyze(code.statements)
+        module = LoxModule(code, Environment.Environment(interpreter.globals))
+        self.loading.append(path)
+        try:
+            interpreter.executeBlock(code.statements, module.environment)
+        finally:
+            self.loading.pop()
+        self.modules[path] = module
+        return module
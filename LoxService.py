@@ -0,0 +1,228 @@
+import asyncio
+import collections
+import contextlib
+import io
+import json
+import multiprocessing
+import sys
+import time
+import traceback
+from multiprocessing.connection import Connection
+from typing import Deque, List, Tuple
+from ErrorReporter import ErrorHandling
+from Lox import Lox
+
+class Worker:
+
+    # One interpreter process. It serves a single request at a time, so
+    # the class-level ErrorHandling state never leaks between requests.
+    def __init__(self):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=Worker.loop, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    @staticmethod
+    def loop(conn: Connection):
+        while True:
+            try:
+                source = conn.recv()
+            except EOFError:
+                return
+            conn.send(Worker.evaluate(source))
+
+    @staticmethod
+    def evaluate(source: str) -> dict:
+        output = io.StringIO()
+        diagnostics = io.StringIO()
+        Lox.reset()
+        ErrorHandling.output = diagnostics
+        try:
+            with contextlib.redirect_stdout(output):
+                Lox.run(source)
+            code = Lox.exitCode()
+        except Exception:
+            diagnostics.write(traceback.format_exc())
+            code = 70
+        finally:
+            ErrorHandling.output = None
+        return {"output": output.getvalue(), "diagnostics": diagnostics.getvalue(), "exitCode": code}
+
+    async def run(self, source: str) -> dict:
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        loop.add_reader(self.conn.fileno(), lambda: readable.done() or readable.set_result(None))
+        try:
+            self.conn.send(source)
+            await readable
+        finally:
+            loop.remove_reader(self.conn.fileno())
+        return self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    # Kills this worker, which may be busy or already dead, and starts
+    # a fresh one in its place.
+    def replace(self) -> "Worker":
+        self.kill()
+        return Worker()
+
+class Metrics:
+
+    WINDOW = 1000
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latencies: Deque[float] = collections.deque(maxlen=Metrics.WINDOW)
+        self.finished: Deque[float] = collections.deque(maxlen=Metrics.WINDOW)
+        self.counts = collections.Counter()
+
+    def record(self, outcome: str, latency: float = None):
+        self.counts[outcome] += 1
+        if latency is not None:
+            self.latencies.append(latency)
+            self.finished.append(time.monotonic())
+
+    def percentile(self, ordered: List[float], fraction: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def snapshot(self, queueDepth: int, running: int) -> dict:
+        ordered = sorted(self.latencies)
+        now = time.monotonic()
+        recent = [stamp for stamp in self.finished if now - stamp <= 60.0]
+        span = min(60.0, now - self.started) or 1.0
+        return {
+            "queueDepth": queueDepth,
+            "running": running,
+            "counts": dict(self.counts),
+            "latencyMs": {name: round(self.percentile(ordered, fraction) * 1000, 3)
+                          for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))},
+            "throughputPerSecond": round(len(recent) / span, 3),
+        }
+
+class LoxService:
+
+    # Evaluates Lox source posted to /eval on a bounded pool of worker
+    # processes. Requests beyond `maxQueue` waiting ones are rejected
+    # with 503, and a worker that exceeds `timeout` is killed and replaced.
+    MAX_BODY = 1 << 20
+
+    def __init__(self, workers: int, maxQueue: int, timeout: float):
+        self.workers = workers
+        self.maxQueue = maxQueue
+        self.timeout = timeout
+        self.idle: asyncio.Queue = None
+        self.waiting = 0
+        self.running = 0
+        self.metrics = Metrics()
+
+    @staticmethod
+    def main(args: List[str]):
+        options = {"--port": "8765", "--workers": "4", "--queue": "64", "--timeout": "5"}
+        while args[:1] and args[0] in options and len(args) > 1:
+            options[args[0]] = args[1]
+            args = args[2:]
+        if args:
+            print('Usage: loxservice [--port n] [--workers n] [--queue n] [--timeout seconds]')
+            exit(64)
+
+        service = LoxService(int(options["--workers"]), int(options["--queue"]), float(options["--timeout"]))
+        asyncio.run(service.serve(int(options["--port"])))
+
+    async def serve(self, port: int):
+        self.idle = asyncio.Queue()
+        for _ in range(self.workers):
+            self.idle.put_nowait(Worker())
+
+        server = await asyncio.start_server(self.handle, "127.0.0.1", port)
+        async with server:
+            await server.serve_forever()
+
+    async def evaluate(self, source: str) -> Tuple[int, dict]:
+        if self.waiting >= self.maxQueue:
+            self.metrics.record("rejected")
+            return 503, {"error": "Too many queued requests."}
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            worker: Worker = await self.idle.get()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            result = await asyncio.wait_for(worker.run(source), self.timeout)
+            status, outcome = 200, "completed"
+        except asyncio.TimeoutError:
+            worker = worker.replace()
+            result = {"error": f"Evaluation exceeded {self.timeout} seconds."}
+            status, outcome = 504, "timedOut"
+        except (EOFError, ConnectionError):
+            worker = worker.replace()
+            result = {"error": "The worker evaluating this request exited."}
+            status, outcome = 500, "failed"
+        except asyncio.CancelledError:
+            # The worker may still be evaluating the source, and its reply
+            # would reach whichever request used it next.
+            worker = worker.replace()
+            raise
+        finally:
+            self.running -= 1
+            self.idle.put_nowait(worker)
+
+        latency = time.monotonic() - start
+        self.metrics.record(outcome, latency)
+        result["elapsedMs"] = round(latency * 1000, 3)
+        return status, result
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, body = await self.route(reader)
+        except (asyncio.IncompleteReadError, ValueError, UnicodeDecodeError):
+            status, body = 400, {"error": "Malformed request."}
+
+        payload = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status} {LoxService.reason(status)}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + payload)
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+        writer.close()
+
+    async def route(self, reader: asyncio.StreamReader) -> Tuple[int, dict]:
+        method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+
+        if path == "/metrics" and method == "GET":
+            return 200, self.metrics.snapshot(self.waiting, self.running)
+        if path != "/eval":
+            return 404, {"error": f"No route for {path}."}
+        if method != "POST":
+            return 405, {"error": "Use POST to evaluate source."}
+        if length > LoxService.MAX_BODY:
+            return 413, {"error": "Source too large."}
+
+        source = (await reader.readexactly(length)).decode("utf-8")
+        return await self.evaluate(source)
+
+    @staticmethod
+    def reason(status: int) -> str:
+        return {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}[status]
+
+if __name__ == "__main__":
+    LoxService.main(sys.argv[1:])
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from typing import Set
+from LoxArray import LoxArray
+from LoxMap import LoxMap
+
+class MemoCache:
+
+    # capacity == 0 means the cache is unbounded and never evicts
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Returns None when an argument cannot be keyed; the call then
+    # bypasses the cache.
+    @staticmethod
+    def key(arguments: list) -> tuple:
+        try:
+            return tuple(MemoCache.freeze(argument, set()) for argument in arguments)
+        except ValueError:
+            return None
+
+    # Lox keeps 1 and true distinct, Python hashing does not. Arrays and
+    # maps hash by identity and can change between calls, so they are
+    # keyed by a snapshot of their contents; a map that contains itself
+    # raises ValueError.
+    @staticmethod
+    def freeze(value: object, seen: Set[int]) -> tuple:
+        if isinstance(value, LoxArray):
+            return (LoxArray, value.values.tobytes())
+        if isinstance(value, LoxMap):
+            if id(value) in seen:
+                raise ValueError("cyclic map")
+            seen.add(id(value))
+            contents = frozenset((key, MemoCache.freeze(entry, seen)) for key, (_, entry) in value.entries.items())
+            seen.discard(id(value))
+            return (LoxMap, contents)
+        return (type(value), value)
+
+    def lookup(self, key: tuple):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return True, self.entries[key]
+
+        self.misses += 1
+        return False, None
+
+    def store(self, key: tuple, value: object):
+        self.entries[key] = value
+        if self.capacity and len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __str__(self) -> str:
+        return (f'hits={self.hits} misses={self.misses} '
+                f'evictions={self.evictions} size={len(self.entries)}')
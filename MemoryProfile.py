@@ -0,0 +1,144 @@
+import contextlib
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Set
+import Expr
+import Stmt
+from Token import Token
+from Environment import Environment, GlobalEnvironment
+
+class MemoryProfile:
+
+    # Measures each phase with tracemalloc and, at the end, takes a
+    # census of the interpreter's own objects still alive. Sizes are
+    # shallow: an object, its __dict__ and, for environments, their
+    # value dicts; strings are counted once under STRINGS. Environments
+    # are also counted as they are built and freed, since most frames
+    # are gone before the census runs.
+    STRINGS = 10
+    SITES = 10
+
+    def __init__(self):
+        self.phases: List[dict] = []
+        self.objects: Dict[str, dict] = {}
+        self.strings: List[dict] = []
+        self.sites: List[dict] = []
+        self.environments = {"built": 0, "peak": 0}
+        self.alive: Set[int] = set()
+        self.untracedInit = None
+
+    def start(self):
+        self.countEnvironments()
+        tracemalloc.start()
+
+    # Wraps Environment construction and adds a finalizer for as long as
+    # the profile runs. Frames built before it started are not counted.
+    def countEnvironments(self):
+        init = self.untracedInit = Environment.__init__
+        alive, environments = self.alive, self.environments
+
+        def counting(environment: Environment, enclosing: Environment = None):
+            init(environment, enclosing)
+            alive.add(id(environment))
+            environments["built"] += 1
+            if len(alive) > environments["peak"]:
+                environments["peak"] = len(alive)
+
+        def freed(environment: Environment):
+            alive.discard(id(environment))
+
+        Environment.__init__ = counting
+        Environment.__del__ = freed
+
+    def stop(self):
+        Environment.__init__ = self.untracedInit
+        del Environment.__del__
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        for stat in snapshot.statistics("lineno")[:MemoryProfile.SITES]:
+            frame = stat.traceback[0]
+            self.sites.append({"site": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                               "bytes": stat.size, "count": stat.count})
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            self.phases.append({"name": name, "seconds": seconds,
+                                "retained": current - before, "peak": peak - before})
+
+    def census(self):
+        # Exact types; isinstance on the ABCs would fill their caches
+        # with every type in the heap.
+        nodes = {node: f"Expr.{node.__name__}" for node in Expr.Expr.__subclasses__()}
+        nodes.update({node: f"Stmt.{node.__name__}" for node in Stmt.Stmt.__subclasses__()})
+        nodes[Token] = "Token"
+
+        gc.collect()
+        strings: Dict[int, dict] = {}
+        for obj in gc.get_objects():
+            kind = type(obj)
+            if kind in nodes:
+                self.count(nodes[kind], obj, sys.getsizeof(obj.__dict__))
+            elif kind is Environment or kind is GlobalEnvironment:
+                extra = sys.getsizeof(obj.__dict__) + sys.getsizeof(obj.values)
+                if kind is GlobalEnvironment:
+                    self.count("Environment (globals)", obj, extra + sys.getsizeof(obj.natives))
+                else:
+                    self.count("Environment", obj, extra)
+                for name, value in obj.values.items():
+                    if isinstance(value, str) and id(value) not in strings:
+                        strings[id(value)] = {"name": name, "bytes": sys.getsizeof(value),
+                                              "length": len(value), "preview": value[:40]}
+
+        self.strings = sorted(strings.values(), key=lambda entry: entry["bytes"], reverse=True)[:MemoryProfile.STRINGS]
+
+    def count(self, kind: str, obj: object, extra: int):
+        entry = self.objects.setdefault(kind, {"count": 0, "bytes": 0})
+        entry["count"] += 1
+        entry["bytes"] += sys.getsizeof(obj) + extra
+
+    def toJson(self) -> dict:
+        environments = dict(self.environments, alive=len(self.alive))
+        return {"phases": self.phases, "objects": self.objects, "environments": environments,
+                "strings": self.strings, "sites": self.sites}
+
+    def save(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.toJson(), file, indent=2)
+
+    def report(self, file=None):
+        print(f"{'phase':<12} {'time ms':>10} {'retained KiB':>14} {'peak KiB':>12}", file=file)
+        for phase in self.phases:
+            print(f"{phase['name']:<12} {phase['seconds'] * 1000:>10.2f} {phase['retained'] / 1024:>14.1f}"
+                  f" {phase['peak'] / 1024:>12.1f}", file=file)
+
+        print(f"\n{'objects':<28} {'count':>10} {'KiB':>12}", file=file)
+        for kind, entry in sorted(self.objects.items(), key=lambda item: item[1]["bytes"], reverse=True):
+            print(f"{kind:<28} {entry['count']:>10} {entry['bytes'] / 1024:>12.1f}", file=file)
+
+        print(f"\n{'environments':<28} {'built':>10} {'peak':>12} {'at end':>10}", file=file)
+        print(f"{'during the run':<28} {self.environments['built']:>10} {self.environments['peak']:>12}"
+              f" {len(self.alive):>10}", file=file)
+
+        if self.strings:
+            print(f"\n{'largest strings':<28} {'length':>10} {'KiB':>12}", file=file)
+            for entry in self.strings:
+                print(f"{entry['name']:<28} {entry['length']:>10} {entry['bytes'] / 1024:>12.1f}", file=file)
+
+        print(f"\n{'allocation site':<28} {'blocks':>10} {'KiB':>12}", file=file)
+        for site in self.sites:
+            print(f"{site['site']:<28} {site['count']:>10} {site['bytes'] / 1024:>12.1f}", file=file)
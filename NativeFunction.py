@@ -0,0 +1,18 @@
+from typing import Callable, List
+from LoxCallable import LoxCallable
+
+class NativeFunction(LoxCallable):
+
+    def __init__(self, name: str, arity: int, function: Callable[..., object]):
+        self.name = name
+        self.arityCount = arity
+        self.function = function
+
+    def arity(self) -> int:
+        return self.arityCount
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        return self.function(*arguments)
+
+    def __str__(self) -> str:
+        return '<native fn>'
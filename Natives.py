@@ -0,0 +1,71 @@
+import time
+from ErrorReporter import LoxRuntimeError
+from LoxArray import LoxArray
+from LoxMap import LoxMap
+import Environment
+
+# The standard natives every interpreter starts with. Embedders add
+# their own through GlobalEnvironment.register on interpreter.globals.
+class Natives:
+
+    @staticmethod
+    def install(globals: Environment.GlobalEnvironment):
+        globals.register("clock", 0, time.time)
+        globals.register("len", 1, Natives.length)
+        globals.register("substring", 3, Natives.substring)
+        globals.register("find", 2, Natives.find)
+        globals.register("format", 2, Natives.format)
+        globals.register("parseNumber", 1, Natives.parseNumber)
+
+        for native in LoxArray.natives() + LoxMap.natives():
+            globals.registerNative(native)
+
+    @staticmethod
+    def checkString(value: object, name: str) -> str:
+        if not isinstance(value, str):
+            raise LoxRuntimeError(None, f"{name}() expects a string.")
+        return value
+
+    @staticmethod
+    def checkWhole(value: object, name: str) -> int:
+        if not isinstance(value, float) or not value.is_integer():
+            raise LoxRuntimeError(None, f"{name}() expects a whole number.")
+        return int(value)
+
+    @staticmethod
+    def length(value: object) -> float:
+        if isinstance(value, str):
+            return float(len(value))
+        if isinstance(value, (LoxArray, LoxMap)):
+            return float(len(value))
+        raise LoxRuntimeError(None, "len() expects a string, an array or a map.")
+
+    @staticmethod
+    def substring(value: object, start: object, end: object) -> str:
+        text = Natives.checkString(value, "substring")
+        first = Natives.checkWhole(start, "substring")
+        last = Natives.checkWhole(end, "substring")
+        if first < 0 or first > last or last > len(text):
+            raise LoxRuntimeError(None, f"substring() range {first}..{last} out of bounds for length {len(text)}.")
+        return text[first:last]
+
+    @staticmethod
+    def find(value: object, needle: object) -> float:
+        text = Natives.checkString(value, "find")
+        return float(text.find(Natives.checkString(needle, "find")))
+
+    @staticmethod
+    def format(value: object, digits: object) -> str:
+        if not isinstance(value, float):
+            raise LoxRuntimeError(None, "format() expects a number.")
+        places = Natives.checkWhole(digits, "format")
+        if places < 0:
+            raise LoxRuntimeError(None, "format() expects a non-negative number of digits.")
+        return f"{value:.{places}f}"
+
+    @staticmethod
+    def parseNumber(value: object) -> object:
+        try:
+            return float(Natives.checkString(value, "parseNumber"))
+        except ValueError:
+            return None
@@ -0,0 +1,206 @@
+import contextlib
+import io
+import math
+import sys
+import time
+from typing import Dict, List, Tuple
+import Expr
+import Stmt
+import Environment
+from TokenType import TokenType
+from Token import Token
+from ErrorReporter import LoxRuntimeError, BudgetExceeded
+from Budget import Budget
+from LoxMap import LoxMap
+from ScopeAnalyzer import ScopeAnalyzer
+from Snapshot import SnapshotPickler, SnapshotUnpickler
+
+class ParallelLoop:
+
+    # Runs a counted for loop's iterations in chunks on a process pool.
+    # Every chunk gets a copy of the visible variables; only the
+    # reduction variable is merged back, and each chunk's printed output
+    # is replayed in iteration order. Under a budget, every chunk runs
+    # with what is left of it, and the steps the chunks took are charged
+    # back once they are merged.
+    REDUCTIONS = ["sum", "min", "max", "collect"]
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    # Picks apart the Block([Var, While(Block([body, increment]))]) that
+    # Parser.forStatement desugars a counted loop into.
+    @staticmethod
+    def parts(loop: Stmt.Stmt) -> Tuple[Token, Expr.Expr, Token, Expr.Expr, Expr.Expr, Stmt.Stmt]:
+        if not isinstance(loop, Stmt.Block) or len(loop.statements) != 2:
+            return None
+        initializer, whileStmt = loop.statements
+        if not isinstance(initializer, Stmt.Var) or initializer.initializer is None or not isinstance(whileStmt, Stmt.While):
+            return None
+
+        name: str = initializer.name.lexeme
+        condition = whileStmt.condition
+        if not (isinstance(condition, Expr.Binary) and ParallelLoop.isVariable(condition.left, name)
+                and condition.operator.type in (TokenType.LESS, TokenType.LESS_EQUAL)):
+            return None
+
+        body = whileStmt.body
+        if not (isinstance(body, Stmt.Block) and len(body.statements) == 2 and isinstance(body.statements[1], Stmt.Expression)):
+            return None
+        increment = body.statements[1].expression
+        if not (isinstance(increment, Expr.Assign) and increment.name.lexeme == name
+                and isinstance(increment.value, Expr.Binary) and increment.value.operator.type == TokenType.PLUS
+                and ParallelLoop.isVariable(increment.value.left, name)):
+            return None
+
+        return initializer.name, initializer.initializer, condition.operator, condition.right, increment.value.right, body.statements[0]
+
+    @staticmethod
+    def isVariable(expr: Expr.Expr, name: str) -> bool:
+        return isinstance(expr, Expr.Variable) and expr.name.lexeme == name
+
+    def execute(self, stmt: Stmt.Parallel):
+        interpreter = self.interpreter
+        variable, startExpr, operator, endExpr, stepExpr, body = ParallelLoop.parts(stmt.loop)
+        original: object = interpreter.environment.get(stmt.target)
+
+        # The initializer is evaluated first, as in the sequential loop.
+        start, end, step = (interpreter.evaluate(startExpr), interpreter.evaluate(endExpr),
+                            interpreter.evaluate(stepExpr))
+        if not all(isinstance(value, float) for value in (start, end, step)):
+            raise LoxRuntimeError(stmt.keyword, "parallel loop bounds and step must be numbers.")
+        if step <= 0:
+            raise LoxRuntimeError(stmt.keyword, "parallel loop step must be positive.")
+
+        if operator.type == TokenType.LESS:
+            count = max(0, math.ceil((end - start) / step))
+        else:
+            count = max(0, math.floor((end - start) / step) + 1)
+
+        payload = self.pickle(self.visibleValues() + (body,))
+        workers = interpreter.parallelWorkers
+        size = max(1, math.ceil(count / (workers * ParallelLoop.CHUNKS_PER_WORKER)))
+        limits = self.remainingBudget()
+        jobs = [(type(interpreter), payload, variable.lexeme, start, step, first, min(count, first + size),
+                 stmt.target.lexeme, stmt.reduction.lexeme, limits) for first in range(0, count, size)]
+
+        try:
+            if workers <= 1 or len(jobs) <= 1:
+                results = [ParallelLoop.runChunk(*job) for job in jobs]
+            else:
+                results = list(interpreter.parallelExecutor().map(ParallelLoop.runChunk, *zip(*jobs)))
+        except LoxRuntimeError:
+            raise
+        except Exception as failure:
+            raise LoxRuntimeError(stmt.keyword, f"parallel worker failed: {failure}")
+
+        partials: List[object] = []
+        steps = 0
+        for result in results:
+            output, partial, chunkSteps, error = SnapshotUnpickler(io.BytesIO(result), interpreter).load()
+            sys.stdout.write(output)
+            steps += chunkSteps
+            if error is not None:
+                token, message, exceeded = error
+                raise (BudgetExceeded if exceeded else LoxRuntimeError)(token or stmt.keyword, message)
+            partials.append(partial)
+        if interpreter.budget is not None:
+            interpreter.budget.charge(stmt.keyword, steps)
+
+        interpreter.environment.assign(stmt.target, self.merge(stmt, original, partials))
+
+    # The budget's limits with the steps and call depth used so far and
+    # the seconds left, or None when the interpreter has no budget.
+    def remainingBudget(self) -> Tuple[int, float, int, int, int, float]:
+        budget: Budget = self.interpreter.budget
+        if budget is None:
+            return None
+        remaining = None if budget.deadline is None else budget.deadline - time.monotonic()
+        return budget.maxSteps, budget.seconds, budget.maxDepth, budget.steps + budget.pending, budget.depth, remaining
+
+    # A chunk's budget, picking up where the parent's left off.
+    @staticmethod
+    def chunkBudget(limits: Tuple[int, float, int, int, int, float]) -> Budget:
+        maxSteps, seconds, maxDepth, steps, depth, remaining = limits
+        budget = Budget(maxSteps, seconds, maxDepth)
+        budget.steps, budget.depth = steps, depth
+        if remaining is not None:
+            budget.deadline = time.monotonic() + remaining
+        return budget
+
+    def visibleValues(self) -> Tuple[Dict[str, object], Dict[str, object]]:
+        globals = self.interpreter.globals
+        locals: Dict[str, object] = {}
+        environment = self.interpreter.environment
+        while environment is not globals:
+            for name, value in environment.values.items():
+                locals.setdefault(name, value)
+            environment = environment.enclosing
+
+        natives = globals.natives
+        return {name: value for name, value in globals.values.items() if natives.get(name) is not value}, locals
+
+    def pickle(self, value: object) -> bytes:
+        buffer = io.BytesIO()
+        SnapshotPickler(buffer, self.interpreter).dump(value)
+        return buffer.getvalue()
+
+    def merge(self, stmt: Stmt.Parallel, original: object, partials: List[object]) -> object:
+        reduction = stmt.reduction.lexeme
+        if reduction == "collect":
+            collected = LoxMap()
+            for value in (value for partial in partials for value in partial):
+                collected.set(stmt.target, float(len(collected)), value)
+            return collected
+
+        values = [value for value in [original] + partials if value is not None]
+        if not all(isinstance(value, float) for value in values):
+            raise LoxRuntimeError(stmt.target, f"{reduction} reduction needs numbers.")
+        if reduction == "sum":
+            return float(sum(values))
+        if not values:
+            return None
+        return min(values) if reduction == "min" else max(values)
+
+    @staticmethod
+    def runChunk(interpreterClass: type, payload: bytes, variable: str, start: float, step: float,
+                 first: int, last: int, target: str, reduction: str, limits: Tuple[int, float, int, int, int, float]) -> bytes:
+        interpreter = interpreterClass()
+        if limits is not None:
+            interpreter.budget = ParallelLoop.chunkBudget(limits)
+        globalsValues, localsValues, body = SnapshotUnpickler(io.BytesIO(payload), interpreter).load()
+        for name, value in globalsValues.items():
+            interpreter.globals.define(name, value)
+        environment = Environment.Environment(interpreter.globals)
+        for name, value in localsValues.items():
+            environment.define(name, value)
+        ScopeAnalyzer(interpreter).analyze([body])
+
+        # The reduction variable is shadowed by a chunk-local accumulator.
+        loop = Environment.Environment(environment)
+        loop.define(target, 0.0 if reduction == "sum" else None)
+        interpreter.environment = loop
+
+        output = io.StringIO()
+        collected: List[object] = []
+        error = None
+        try:
+            with contextlib.redirect_stdout(output):
+                for index in range(first, last):
+                    loop.define(variable, start + index * step)
+                    interpreter.execute(body)
+                    if reduction == "collect":
+                        collected.append(loop.values[target])
+                        loop.values[target] = None
+        except LoxRuntimeError as failure:
+            error = (failure.token, failure.message, isinstance(failure, BudgetExceeded))
+        except Exception as failure:
+            error = (None, f"parallel worker failed: {failure}", False)
+
+        partial = collected if reduction == "collect" else loop.values[target]
+        budget = interpreter.budget
+        steps = 0 if budget is None else budget.steps + budget.pending - limits[3]
+        buffer = io.BytesIO()
+        SnapshotPickler(buffer, interpreter).dump((output.getvalue(), partial, steps, error))
+        return buffer.getvalue()
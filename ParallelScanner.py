@@ -0,0 +1,110 @@
+import bisect
+import re
+from concurrent.futures import Executor
+from typing import List, Tuple
+import Scanner
+from Token import Token
+from TokenType import TokenType
+from ErrorReporter import ErrorHandling, Diagnostics, TooManyErrors
+
+class ParallelScanner:
+
+    # Splits a source at newlines the serial scanner would reach between
+    # tokens, scans the chunks in a process pool and joins the results.
+    # The pre-pass only has to find strings and comments, which a regex
+    # does far faster than Scanner, so it stays serial.
+    OPAQUE = re.compile(r'"[^"]*"?|//[^\n]*|/\*[^/]*/?')
+    # Sources shorter than this are not worth a round trip to the pool.
+    MIN_CHUNK = 1 << 16
+    TYPES: List[TokenType] = list(TokenType)
+
+    def __init__(self, source: str, executor: Executor, workers: int):
+        self.source = source
+        self.executor = executor
+        self.workers = workers
+
+    def scanTokens(self) -> List[Token]:
+        chunks = self.chunks()
+        if len(chunks) == 1:
+            return Scanner.Scanner(self.source).scanTokens()
+
+        sources = [self.source[start:end] for start, end, _ in chunks]
+        lines = [line for _, _, line in chunks]
+        types = ParallelScanner.TYPES
+        tokens: List[Token] = []
+        line = 1
+        for kinds, lexemes, literals, tokenLines, errors, line in self.executor.map(
+                ParallelScanner.scanChunk, sources, lines):
+            # Errors are replayed in chunk order, which is line order. At
+            # the error cap the serial scanner would have stopped right
+            # there, so the tokens are cut at the same place.
+            count, stopped = len(kinds), False
+            try:
+                for errorLine, message, index in errors:
+                    ErrorHandling.error(errorLine, message)
+            except TooManyErrors:
+                count, line, stopped = index, errorLine, True
+            tokens.extend(map(Token, [types[kind] for kind in kinds[:count]], lexemes[:count],
+                              literals[:count], tokenLines[:count]))
+            if stopped:
+                break
+
+        tokens.append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+    # Returns (start, end, first line) for each chunk.
+    def chunks(self) -> List[Tuple[int, int, int]]:
+        source = self.source
+        size = max(ParallelScanner.MIN_CHUNK, len(source) // max(1, self.workers))
+        if len(source) <= size:
+            return [(0, len(source), 1)]
+
+        # Strings and block comments that span lines. The scanner does not
+        # count newlines inside block comments, so neither do chunk lines.
+        starts: List[int] = []
+        ends: List[int] = []
+        uncounted: List[int] = []
+        for match in ParallelScanner.OPAQUE.finditer(source):
+            start, end = match.span()
+            if source.find("\n", start, end) != -1:
+                starts.append(start)
+                ends.append(end)
+                uncounted.append(source.count("\n", start, end) if source[start] == "/" else 0)
+
+        chunks: List[Tuple[int, int, int]] = []
+        start, line, span = 0, 1, 0
+        while start < len(source):
+            end = source.find("\n", start + size)
+            while end != -1:
+                # Step past spans that open before the newline.
+                index = bisect.bisect_right(starts, end) - 1
+                if index < 0 or ends[index] <= end:
+                    break
+                end = source.find("\n", ends[index])
+            end = len(source) if end == -1 else end + 1
+
+            chunks.append((start, end, line))
+            line += source.count("\n", start, end)
+            while span < len(starts) and ends[span] <= end:
+                line -= uncounted[span]
+                span += 1
+            start = end
+        return chunks
+
+    @staticmethod
+    def scanChunk(source: str, line: int) -> tuple:
+        # The cap is applied when the errors are replayed.
+        diagnostics = ErrorHandling.diagnostics
+        ErrorHandling.diagnostics = Diagnostics(None)
+        try:
+            scanner = Scanner.Scanner(source)
+            scanner.line = line
+            scanner.scanSource()
+        finally:
+            ErrorHandling.diagnostics = diagnostics
+
+        # Columns of plain values pickle much faster than Token objects.
+        tokens = scanner.tokens
+        return ([token.type.value - 1 for token in tokens], [token.lexeme for token in tokens],
+                [token.literal for token in tokens], [token.line for token in tokens],
+                scanner.errors, scanner.line)
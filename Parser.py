@@ -1,24 +1,38 @@
 from TokenType import *
-from typing import List
+from typing import Dict, List
 from Token import Token
 import Expr
 import Stmt
-from ErrorReporter import ErrorHandling
+from ErrorReporter import ErrorHandling, TooManyErrors
+from PurityChecker import PurityChecker
+from ParallelLoop import ParallelLoop
+from LazyBody import LazyBody
 
 class ParseError(RuntimeError):
     pass
 
 class Parser:
 
-    def __init__(self, tokens: List[Token]):
+    DEFAULT_MEMO_SIZE = 128
+
+    # With lazy set, block bodies are only brace-matched; see LazyBody.
+    def __init__(self, tokens: List[Token], lazy: bool = False):
         self.current = 0
         self.tokens = tokens
+        self.lazy = lazy
+        # Declared function names, and whether each is memoized, for the
+        # purity check of later memo functions.
+        self.functions: Dict[str, bool] = {}
 
     def parse(self) -> Expr.Expr:
         statements: Stmt = []
 
-        while not self.isAtEnd():
-            statements.append(self.declaration())
+        # Past the error cap the rest of the tokens are not parsed.
+        try:
+            while not self.isAtEnd():
+                statements.append(self.declaration())
+        except TooManyErrors:
+            pass
         
         return statements
     
@@ -27,6 +41,9 @@ class Parser:
     
     def declaration(self) -> Stmt.Stmt:
         try:
+            if self.match(TokenType.FUN): return self.function("function")
+            if self.match(TokenType.IMPORT): return self.importDeclaration()
+            if self.match(TokenType.MEMO): return self.memoDeclaration()
             if self.match(TokenType.VAR): return self.varDeclaration()
             return self.statement()
         except ParseError as error:
@@ -36,12 +53,15 @@ class Parser:
     def statement(self):
         if self.match(TokenType.FOR): return self.forStatement()
         if self.match(TokenType.IF): return self.ifStatement()
+        if self.match(TokenType.PARALLEL): return self.parallelStatement()
         if self.match(TokenType.PRINT): return self.printStatement()
+        if self.match(TokenType.RETURN): return self.returnStatement()
         if self.match(TokenType.WHILE): return self.whileStatement()
         if self.match(TokenType.LEFT_BRACE): return Stmt.Block(self.block())
         return self.expressionStatement()
     
     def forStatement(self):
+        keyword: Token = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'")
         initializer: Stmt.Stmt
 
@@ -51,16 +71,15 @@ class Parser:
             initializer = self.varDeclaration()
         else:
             initializer = self.expressionStatement()
-        
-        print(f"initializer: {initializer}")
-        condition: Expr.Expr
+
+        condition: Expr.Expr = None
 
         if not self.check(TokenType.SEMICOLON):
             condition = self.expression()
 
         self.consume(TokenType.SEMICOLON, "Expected ';' after loop condition.")
 
-        increment: Expr.Expr
+        increment: Expr.Expr = None
         if not self.check(TokenType.RIGHT_PAREN):
             increment = self.expression()
         
@@ -72,40 +91,85 @@ class Parser:
 
         if condition == None: 
             condition = Expr.Literal(True)
-        body = Stmt.While(condition, body)
+        body = Stmt.While(keyword, condition, body)
 
         if initializer != None:
             body = Stmt.Block([initializer, body])
 
         return body
 
+    # parallelStmt -> "parallel" "(" REDUCTION IDENTIFIER ")" forStmt
+    # where the for loop must count: for (var i = a; i < b; i = i + step)
+    def parallelStatement(self) -> Stmt.Stmt:
+        keyword: Token = self.previous()
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'parallel'.")
+        reduction: Token = self.consume(TokenType.IDENTIFIER, "Expect reduction after 'parallel ('.")
+        if reduction.lexeme not in ParallelLoop.REDUCTIONS:
+            self.error(reduction, f"Reduction must be one of {', '.join(ParallelLoop.REDUCTIONS)}.")
+        target: Token = self.consume(TokenType.IDENTIFIER, "Expect reduction variable.")
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after reduction variable.")
+
+        self.consume(TokenType.FOR, "Expect 'for' after parallel reduction.")
+        loop: Stmt.Stmt = self.forStatement()
+        if ParallelLoop.parts(loop) is None:
+            self.error(keyword, "parallel needs a counted loop: for (var i = a; i < b; i = i + step).")
+
+        return Stmt.Parallel(keyword, reduction, target, loop)
+
     def whileStatement(self):
+        keyword: Token = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'")
         condition: Expr.Expr = self.expression()
-        self.consume(TokenType.LEFT_PAREN, "Expect ')' after condition.")
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
         body: Stmt.Stmt = self.statement()
 
-        return Stmt.While(condition, body)        
+        return Stmt.While(keyword, condition, body)
     
+    # An else-if chain is parsed in a loop and linked up afterwards, so a
+    # long chain does not recurse once per branch.
     def ifStatement(self) -> Stmt.Stmt:
-        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'")
-        condition: Expr.Expr = self.expression()
-        self.consume(TokenType.LEFT_PAREN, "Expect ')' after if condition.")
-
-        thenBranch: Stmt.Stmt = self.statement()
+        branches: List[tuple] = []
         elseBranch: Stmt.Stmt = None
+        while True:
+            keyword: Token = self.previous()
+            self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'")
+            condition: Expr.Expr = self.expression()
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
+            branches.append((keyword, condition, self.statement()))
 
-        if self.match(TokenType.ELSE):
-            elseBranch = self.statement
+            if not self.match(TokenType.ELSE):
+                break
+            if not self.match(TokenType.IF):
+                elseBranch = self.statement()
+                break
 
-        return Stmt.If(condition, thenBranch, elseBranch)
+        for keyword, condition, thenBranch in reversed(branches):
+            elseBranch = Stmt.If(keyword, condition, thenBranch, elseBranch)
+        return elseBranch
     
     def printStatement(self) -> Stmt.Stmt:
+        keyword: Token = self.previous()
         value: Expr.Expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
 
-        return Stmt.Print(value)
+        return Stmt.Print(keyword, value)
+
+    def returnStatement(self) -> Stmt.Stmt:
+        keyword: Token = self.previous()
+        value: Expr.Expr = None
+        if not self.check(TokenType.SEMICOLON):
+            value = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
+        return Stmt.Return(keyword, value)
     
+    # importDecl -> "import" STRING ";"
+    def importDeclaration(self) -> Stmt.Stmt:
+        keyword: Token = self.previous()
+        path: Token = self.consume(TokenType.STRING, "Expect module path string after 'import'.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after module path.")
+        return Stmt.Import(keyword, path)
+
     def varDeclaration(self) -> Stmt.Stmt:
         name: Token = self.consume(TokenType.IDENTIFIER, "Expected variable name.")
 
@@ -116,6 +180,49 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expected ';' after variable declaration.")
         return Stmt.Var(name, initializer) 
     
+    # memoDecl -> "memo" ( "(" NUMBER ")" )? "fun" function
+    # The optional NUMBER bounds the LRU cache; memo(0) never evicts.
+    def memoDeclaration(self) -> Stmt.Stmt:
+        size: int = Parser.DEFAULT_MEMO_SIZE
+        if self.match(TokenType.LEFT_PAREN):
+            literal: Token = self.consume(TokenType.NUMBER, "Expect cache size after 'memo('.")
+            if literal.literal != int(literal.literal):
+                self.error(literal, "Cache size must be a whole number.")
+            size = int(literal.literal)
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after cache size.")
+
+        self.consume(TokenType.FUN, "Expect 'fun' after 'memo'.")
+        # The purity check needs the whole body, so it is never lazy.
+        lazy, self.lazy = self.lazy, False
+        try:
+            function: Stmt.Function = self.function("function", size)
+        finally:
+            self.lazy = lazy
+
+        for token, reason in PurityChecker(self.functions).check(function):
+            self.error(token or function.name, f"Cannot memoize '{function.name.lexeme}': it {reason}.")
+
+        return function
+
+    def function(self, kind: str, memo: int = None) -> Stmt.Function:
+        name: Token = self.consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
+        self.consume(TokenType.LEFT_PAREN, f"Expect '(' after {kind} name.")
+        parameters: List[Token] = []
+        if not self.check(TokenType.RIGHT_PAREN):
+            while True:
+                if len(parameters) >= 255:
+                    self.error(self.peek(), "Can't have more than 255 parameters.")
+                parameters.append(self.consume(TokenType.IDENTIFIER, "Expect parameter name."))
+
+                if not self.match(TokenType.COMMA):
+                    break
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
+
+        self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
+        body: List[Stmt.Stmt] = self.block()
+        self.functions[name.lexeme] = memo is not None
+        return Stmt.Function(name, parameters, body, memo)
+
     def expressionStatement(self) -> Stmt.Stmt:
         expr: Expr.Expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
@@ -123,6 +230,9 @@ class Parser:
         return Stmt.Expression(expr)
     
     def block(self) -> List[Stmt.Stmt]:
+        if self.lazy:
+            return self.skipBlock()
+
         statements: List[Stmt.Stmt] = []
 
         while not self.check(TokenType.RIGHT_BRACE) and not self.isAtEnd():
@@ -131,6 +241,25 @@ class Parser:
         self.consume(TokenType.RIGHT_BRACE, "Expected '}' after block.")
         return statements
     
+    # Pre-parse: match braces up to the closing one and report nothing
+    # else; the body is parsed by LazyBody when it first runs.
+    def skipBlock(self) -> List[Stmt.Stmt]:
+        start = self.current
+        depth = 0
+        while not self.isAtEnd():
+            match self.peek().type:
+                case TokenType.LEFT_BRACE:
+                    depth += 1
+                case TokenType.RIGHT_BRACE:
+                    if depth == 0:
+                        break
+                    depth -= 1
+            self.advance()
+
+        end = self.current
+        self.consume(TokenType.RIGHT_BRACE, "Expected '}' after block.")
+        return LazyBody(self.tokens, start, end, type(self), self.functions)
+
     def assignment(self) -> Expr.Expr:
         expr: Expr.Expr = self.Or() # was ternary
 
@@ -141,6 +270,8 @@ class Parser:
             if isinstance(expr, Expr.Variable):
                 name: Token = expr.name
                 return Expr.Assign(name, value)
+            elif isinstance(expr, Expr.Index):
+                return Expr.SetIndex(expr.object, expr.bracket, expr.index, value)
 
             self.error(equals, "Invalid assignment target.")
 
@@ -219,7 +350,7 @@ class Parser:
     def unary(self) -> Expr.Expr:
         if self.match(TokenType.BANG, TokenType.MINUS):
             operator: Token = self.previous()
-            right: Expr.Expr = self.primary()
+            right: Expr.Expr = self.unary()
             return Expr.Unary(operator, right)
         
         return self.call()
@@ -230,22 +361,28 @@ class Parser:
         while True:
             if self.match(TokenType.LEFT_PAREN):
                 expr = self.finishCall(expr)
+            elif self.match(TokenType.LEFT_BRACKET):
+                index: Expr.Expr = self.expression()
+                bracket: Token = self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
+                expr = Expr.Index(expr, bracket, index)
             else:
                 break
         
         return expr
     
-    def finishCall(self, calle: Expr) -> Expr.Expr:
+    def finishCall(self, callee: Expr) -> Expr.Expr:
         arguments: List[Expr.Expr] = []
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
+                if len(arguments) >= 255:
+                    self.error(self.peek(), "Can't have more than 255 arguments.")
                 arguments.append(self.expression())
                 
                 if not self.match(TokenType.COMMA):
                     break
         paren: Token = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
 
-        return Expr.Call(callee,token,arguments)
+        return Expr.Call(callee, paren, arguments)
 
     def primary(self) -> Expr:
         if self.match(TokenType.FALSE): return Expr.Literal(False)
@@ -258,6 +395,13 @@ class Parser:
         if self.match(TokenType.IDENTIFIER):
             return Expr.Variable(self.previous())
 
+        if self.match(TokenType.YIELD):
+            keyword: Token = self.previous()
+            value: Expr.Expr = None
+            if not self.check(TokenType.SEMICOLON) and not self.check(TokenType.RIGHT_PAREN):
+                value = self.assignment()
+            return Expr.Yield(keyword, value)
+
         if self.match(TokenType.LEFT_PAREN):
             expr: Expr.Expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
@@ -274,7 +418,7 @@ class Parser:
         return False
     
     def error(self, token: Token, message: str) -> ParseError:
-        ErrorHandling.error(token, message)
+        ErrorHandling.error_with_token(token, message)
         return ParseError()
     
     def synchronize(self):
@@ -0,0 +1,151 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from TokenType import TokenType
+from Token import Token
+import Expr
+from Parser import Parser
+
+class Precedence:
+    NONE = 0
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    TERNARY = 4
+    EQUALITY = 5
+    COMPARISON = 6
+    TERM = 7
+    FACTOR = 8
+    UNARY = 9
+    CALL = 10
+
+# Parses expressions by precedence climbing over the PREFIX and INFIX
+# tables below instead of descending through one method per level.
+# Statements are still parsed by Parser, and the trees are identical.
+class PrattParser(Parser):
+
+    def expression(self) -> Expr.Expr:
+        return self.parsePrecedence(Precedence.ASSIGNMENT)
+
+    # Parentheses, prefix operators and the right operands of binary and
+    # logical operators push a frame (token, left operand or None, outer
+    # precedence) instead of recursing, so nesting depth is bounded by
+    # memory rather than the Python stack.
+    def parsePrecedence(self, precedence: int) -> Expr.Expr:
+        tokens = self.tokens
+        frames: List[Tuple[Token, Expr.Expr, int]] = []
+        while True:
+            token: Token = tokens[self.current]
+            if token.type in NESTING:
+                self.current += 1
+                frames.append((token, None, precedence))
+                precedence = Precedence.ASSIGNMENT if token.type == TokenType.LEFT_PAREN else Precedence.UNARY
+                continue
+
+            prefix = PREFIX.get(token.type)
+            if prefix is None:
+                raise self.error(token, "Expect expression.")
+            # EOF has no rule, so the cursor never runs past the end.
+            self.current += 1
+            left: Expr.Expr = prefix(self, token)
+
+            while True:
+                token = tokens[self.current]
+                rule = INFIX.get(token.type)
+                if rule is not None and rule[1] >= precedence:
+                    self.current += 1
+                    if rule[0] is OPERATOR:
+                        frames.append((token, left, precedence))
+                        precedence = rule[1] + 1
+                        break
+                    left = rule[0](self, left, token)
+                elif frames:
+                    opener, operand, precedence = frames.pop()
+                    left = self.close(opener, operand, left)
+                else:
+                    return left
+
+    def close(self, token: Token, left: Expr.Expr, right: Expr.Expr) -> Expr.Expr:
+        if left is not None:
+            if token.type in (TokenType.AND, TokenType.OR):
+                return Expr.Logical(left, token, right)
+            return Expr.Binary(left, token, right)
+        if token.type == TokenType.LEFT_PAREN:
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            return Expr.Grouping(right)
+        return Expr.Unary(token, right)
+
+    def literal(self, token: Token) -> Expr.Expr:
+        match token.type:
+            case TokenType.FALSE: return Expr.Literal(False)
+            case TokenType.TRUE: return Expr.Literal(True)
+            case TokenType.NIL: return Expr.Literal(None)
+        return Expr.Literal(token.literal)
+
+    def variable(self, token: Token) -> Expr.Expr:
+        return Expr.Variable(token)
+
+    def yieldPrefix(self, token: Token) -> Expr.Expr:
+        value: Expr.Expr = None
+        if not self.check(TokenType.SEMICOLON) and not self.check(TokenType.RIGHT_PAREN):
+            value = self.parsePrecedence(Precedence.ASSIGNMENT)
+        return Expr.Yield(token, value)
+
+    def ternaryInfix(self, left: Expr.Expr, token: Token) -> Expr.Expr:
+        trueBranch: Expr.Expr = self.expression()
+        self.consume(TokenType.COLON, "Expect ':' after ternary.")
+        falseBranch: Expr.Expr = self.expression()
+        return Expr.Ternary(left, trueBranch, falseBranch)
+
+    def assign(self, left: Expr.Expr, token: Token) -> Expr.Expr:
+        value: Expr.Expr = self.parsePrecedence(Precedence.ASSIGNMENT)
+
+        if isinstance(left, Expr.Variable):
+            return Expr.Assign(left.name, value)
+        elif isinstance(left, Expr.Index):
+            return Expr.SetIndex(left.object, left.bracket, left.index, value)
+
+        self.error(token, "Invalid assignment target.")
+        return left
+
+    def callInfix(self, left: Expr.Expr, token: Token) -> Expr.Expr:
+        return self.finishCall(left)
+
+    def index(self, left: Expr.Expr, token: Token) -> Expr.Expr:
+        index: Expr.Expr = self.expression()
+        bracket: Token = self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
+        return Expr.Index(left, bracket, index)
+
+# Prefix tokens parsePrecedence handles with a frame rather than a rule call.
+NESTING = (TokenType.LEFT_PAREN, TokenType.BANG, TokenType.MINUS)
+
+PREFIX: Dict[TokenType, Callable[[PrattParser, Token], Expr.Expr]] = {
+    TokenType.FALSE: PrattParser.literal,
+    TokenType.TRUE: PrattParser.literal,
+    TokenType.NIL: PrattParser.literal,
+    TokenType.NUMBER: PrattParser.literal,
+    TokenType.STRING: PrattParser.literal,
+    TokenType.IDENTIFIER: PrattParser.variable,
+    TokenType.YIELD: PrattParser.yieldPrefix,
+}
+
+# A None rule marks a binary or logical operator: parsePrecedence parses
+# its right operand in a frame and close() builds the node.
+OPERATOR = None
+
+INFIX: Dict[TokenType, Tuple[Optional[Callable[[PrattParser, Expr.Expr, Token], Expr.Expr]], int]] = {
+    TokenType.EQUAL: (PrattParser.assign, Precedence.ASSIGNMENT),
+    TokenType.OR: (OPERATOR, Precedence.OR),
+    TokenType.AND: (OPERATOR, Precedence.AND),
+    TokenType.QUESTION: (PrattParser.ternaryInfix, Precedence.TERNARY),
+    TokenType.BANG_EQUAL: (OPERATOR, Precedence.EQUALITY),
+    TokenType.EQUAL_EQUAL: (OPERATOR, Precedence.EQUALITY),
+    TokenType.GREATER: (OPERATOR, Precedence.COMPARISON),
+    TokenType.GREATER_EQUAL: (OPERATOR, Precedence.COMPARISON),
+    TokenType.LESS: (OPERATOR, Precedence.COMPARISON),
+    TokenType.LESS_EQUAL: (OPERATOR, Precedence.COMPARISON),
+    TokenType.PLUS: (OPERATOR, Precedence.TERM),
+    TokenType.MINUS: (OPERATOR, Precedence.TERM),
+    TokenType.SLASH: (OPERATOR, Precedence.FACTOR),
+    TokenType.STAR: (OPERATOR, Precedence.FACTOR),
+    TokenType.LEFT_PAREN: (PrattParser.callInfix, Precedence.CALL),
+    TokenType.LEFT_BRACKET: (PrattParser.index, Precedence.CALL),
+}
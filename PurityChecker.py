@@ -0,0 +1,152 @@
+from typing import Dict, List, Set
+import Expr
+import Stmt
+from Token import Token
+
+# Natives that neither change their arguments nor touch the outside
+# world, and always return the same value for the same arguments.
+PURE_NATIVES = {"len", "substring", "find", "format", "parseNumber",
+                "array", "sum", "min", "max", "dot", "slice",
+                "map", "get", "has", "keys"}
+
+class PurityChecker(Expr.Visitor[None], Stmt.Visitor[None]):
+
+    # A function is pure enough to memoize when it neither prints nor
+    # assigns to a variable it did not declare itself, and only calls
+    # functions it declares, memo functions and pure natives. `functions`
+    # maps the names the parser has seen declared so far to whether they
+    # were memoized; a declared name shadows a native of the same name.
+    def __init__(self, functions: Dict[str, bool] = None):
+        self.functions = functions or {}
+        self.scopes: List[Set[str]] = []
+        self.declared: List[Set[str]] = []
+        self.violations: List[tuple] = []
+
+    def check(self, function: Stmt.Function) -> List[tuple]:
+        self.checkFunction(function)
+        return self.violations
+
+    def checkFunction(self, function: Stmt.Function):
+        self.scopes.append({param.lexeme for param in function.params})
+        self.declared.append({function.name.lexeme})
+        self.resolveStatements(function.body)
+        self.declared.pop()
+        self.scopes.pop()
+
+    def resolveStatements(self, statements: List[Stmt.Stmt]):
+        for statement in statements:
+            if statement is not None:
+                statement.accept(self)
+
+    def resolve(self, expr: Expr.Expr):
+        if expr is not None:
+            expr.accept(self)
+
+    def isLocal(self, name: Token) -> bool:
+        return any(name.lexeme in scope for scope in self.scopes)
+
+    def visitBlockStmt(self, stmt: Stmt.Block) -> None:
+        self.scopes.append(set())
+        self.resolveStatements(stmt.statements)
+        self.scopes.pop()
+
+    def visitExpressionStmt(self, stmt: Stmt.Expression) -> None:
+        self.resolve(stmt.expression)
+
+    def visitFunctionStmt(self, stmt: Stmt.Function) -> None:
+        self.scopes[-1].add(stmt.name.lexeme)
+        self.declared[-1].add(stmt.name.lexeme)
+        self.checkFunction(stmt)
+
+    def visitIfStmt(self, stmt: Stmt.If) -> None:
+        self.resolve(stmt.condition)
+        self.resolveStatements([stmt.thenBranch, stmt.elseBranch])
+
+    def visitImportStmt(self, stmt: Stmt.Import) -> None:
+        # A first import runs the module, which may have side effects.
+        self.violations.append((stmt.keyword, "imports a module"))
+
+    def visitParallelStmt(self, stmt: Stmt.Parallel) -> None:
+        if not self.isLocal(stmt.target):
+            self.violations.append((stmt.target, f"assigns to enclosing variable '{stmt.target.lexeme}'"))
+        self.resolveStatements([stmt.loop])
+
+    def visitPrintStmt(self, stmt: Stmt.Print) -> None:
+        self.violations.append((None, "prints"))
+        self.resolve(stmt.expression)
+
+    def visitReturnStmt(self, stmt: Stmt.Return) -> None:
+        self.resolve(stmt.value)
+
+    def visitWhileStmt(self, stmt: Stmt.While) -> None:
+        self.resolve(stmt.condition)
+        self.resolveStatements([stmt.body])
+
+    def visitVarStmt(self, stmt: Stmt.Var) -> None:
+        self.resolve(stmt.initializer)
+        self.scopes[-1].add(stmt.name.lexeme)
+
+    def visitAssignExpr(self, expr: Expr.Assign) -> None:
+        self.resolve(expr.value)
+        if not self.isLocal(expr.name):
+            self.violations.append((expr.name, f"assigns to enclosing variable '{expr.name.lexeme}'"))
+
+    def visitTernaryExpr(self, expr: Expr.Ternary) -> None:
+        self.resolve(expr.condition)
+        self.resolve(expr.trueExpr)
+        self.resolve(expr.falseExpr)
+
+    def visitBinaryExpr(self, expr: Expr.Binary) -> None:
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+
+    def visitCallExpr(self, expr: Expr.Call) -> None:
+        self.checkCallee(expr)
+        self.resolve(expr.callee)
+        for argument in expr.arguments:
+            self.resolve(argument)
+
+    def checkCallee(self, expr: Expr.Call):
+        if not isinstance(expr.callee, Expr.Variable):
+            self.violations.append((expr.paren, "calls a function that cannot be checked"))
+            return
+        name = expr.callee.name
+        if any(name.lexeme in declared for declared in self.declared):
+            return
+        if self.isLocal(name):
+            self.violations.append((name, f"calls '{name.lexeme}', which cannot be checked"))
+        elif name.lexeme in self.functions:
+            if not self.functions[name.lexeme]:
+                self.violations.append((name, f"calls '{name.lexeme}', which is not a memo function"))
+        elif name.lexeme not in PURE_NATIVES:
+            self.violations.append((name, f"calls '{name.lexeme}', which is not known to be pure"))
+
+    def visitGroupingExpr(self, expr: Expr.Grouping) -> None:
+        self.resolve(expr.expression)
+
+    def visitIndexExpr(self, expr: Expr.Index) -> None:
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+
+    def visitSetIndexExpr(self, expr: Expr.SetIndex) -> None:
+        self.violations.append((expr.bracket, "stores into an array or map"))
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+        self.resolve(expr.value)
+
+    def visitLiteralExpr(self, expr: Expr.Literal) -> None:
+        return None
+
+    def visitLogicalExpr(self, expr: Expr.Logical) -> None:
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+
+    def visitUnaryExpr(self, expr: Expr.Unary) -> None:
+        self.resolve(expr.right)
+
+    def visitVariableExpr(self, expr: Expr.Variable) -> None:
+        return None
+
+    def visitYieldExpr(self, expr: Expr.Yield) -> None:
+        self.violations.append((expr.keyword, "yields"))
+        self.resolve(expr.value)
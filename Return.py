@@ -0,0 +1,4 @@
+class Return(RuntimeError):
+    def __init__(self, value: object):
+        super().__init__(None)
+        self.value = value
@@ -1,10 +1,34 @@
 from TokenType import *
 from Token import Token
-from typing import List, Dict, Optional
-from ErrorReporter import ErrorHandling
+from typing import List, Dict, Optional, Tuple
+from ErrorReporter import ErrorHandling, TooManyErrors
 
 class Scanner: 
 
+    # Shared by every instance rather than rebuilt per scan.
+    keywords = {
+        "and": TokenType.AND,
+        "class": TokenType.CLASS,
+        "else": TokenType.ELSE,
+        "false": TokenType.FALSE,
+        "for": TokenType.FOR,
+        "fun": TokenType.FUN,
+        "if": TokenType.IF,
+        "import": TokenType.IMPORT,
+        "memo": TokenType.MEMO,
+        "nil": TokenType.NIL,
+        "or": TokenType.OR,
+        "parallel": TokenType.PARALLEL,
+        "print": TokenType.PRINT,
+        "return": TokenType.RETURN,
+        "super": TokenType.SUPER,
+        "this": TokenType.THIS,
+        "true": TokenType.TRUE,
+        "var": TokenType.VAR,
+        "while": TokenType.WHILE,
+        "yield": TokenType.YIELD
+    }
+
     def __init__(self, source: str, tokens: Optional[List[Token]] = None):
         self.source = source
         self.tokens = tokens if tokens is not None else []
@@ -16,33 +40,24 @@ class Scanner:
         self.current: int = 0
         # source code line
         self.line: int = 1
-        self.keywords = {
-            "and": TokenType.AND,
-            "class": TokenType.CLASS,
-            "else": TokenType.ELSE,
-            "false": TokenType.FALSE,
-            "for": TokenType.FOR,
-            "fun": TokenType.FUN,
-            "if": TokenType.IF,
-            "nil": TokenType.NIL,
-            "or": TokenType.OR,
-            "print": TokenType.PRINT,
-            "return": TokenType.RETURN,
-            "super": TokenType.SUPER,
-            "this": TokenType.THIS,
-            "true": TokenType.TRUE,
-            "var": TokenType.VAR,
-            "while": TokenType.WHILE
-        }          
+        # (line, message, token count) for every error, in order.
+        self.errors: List[Tuple[int, str, int]] = []
 
+    # Stops early once ErrorHandling has seen too many errors.
     def scanTokens(self) -> List[Token]:
+        try:
+            self.scanSource()
+        except TooManyErrors:
+            pass
+        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        return self.tokens
+    
+    # Scans everything without the closing EOF token.
+    def scanSource(self):
         while not self.isAtEnd():
             self.start = self.current
             self.scanToken()
 
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
-        return self.tokens
-    
     def scanToken(self):
         c: str = self.advance()
         
@@ -51,6 +66,8 @@ class Scanner:
             case ')': self.addToken(TokenType.RIGHT_PAREN)
             case '{': self.addToken(TokenType.LEFT_BRACE)
             case '}': self.addToken(TokenType.RIGHT_BRACE)
+            case '[': self.addToken(TokenType.LEFT_BRACKET)
+            case ']': self.addToken(TokenType.RIGHT_BRACKET)
             case ',': self.addToken(TokenType.COMMA)
             case '.': self.addToken(TokenType.DOT)
             case '-': self.addToken(TokenType.MINUS)
@@ -89,8 +106,12 @@ class Scanner:
                 elif self.isAlpha(c):
                     self.identifier()
                 else:
-                    ErrorHandling.error(self.line, 'Unexpected character.')
+                    self.error('Unexpected character.')
     
+    def error(self, message: str):
+        self.errors.append((self.line, message, len(self.tokens)))
+        ErrorHandling.error(self.line, message)
+
     def isAlpha(self, c: str) -> bool:
         return c.isalpha() or c == '_'
     
@@ -129,7 +150,7 @@ class Scanner:
             self.advance()
         
         if self.isAtEnd():
-            ErrorHandling.error(self.line, "Unterminated string.")
+            self.error("Unterminated string.")
             return
         
         self.advance()
@@ -0,0 +1,78 @@
+from typing import List
+import Stmt
+from LazyBody import LazyBody
+
+class ScopeAnalyzer(Stmt.Visitor[bool]):
+
+    # Classifies every block for the interpreter:
+    #   flat   - declares nothing, so it runs in the enclosing scope
+    #   pooled - declares variables but contains no function that could
+    #            capture them, so its frame can be reused between runs
+    # Blocks that contain a function declaration keep a fresh frame.
+    # While loops are handed to the interpreter's loop optimizer once
+    # their bodies are classified.
+    # Each visit returns True when the subtree declares a function.
+    # Bodies still waiting to be parsed are assumed to declare one; the
+    # interpreter classifies them once they are parsed.
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def analyze(self, statements: List[Stmt.Stmt]):
+        self.analyzeAll(statements)
+
+    def analyzeAll(self, statements: List[Stmt.Stmt]) -> bool:
+        captures = False
+        for statement in statements:
+            if statement is not None and statement.accept(self):
+                captures = True
+        return captures
+
+    def visitBlockStmt(self, stmt: Stmt.Block) -> bool:
+        if type(stmt.statements) is LazyBody:
+            return True
+        captures = self.analyzeAll(stmt.statements)
+        declares = any(isinstance(statement, (Stmt.Var, Stmt.Function, Stmt.Import)) for statement in stmt.statements)
+
+        if not declares:
+            self.interpreter.flattenBlock(stmt)
+        elif not captures:
+            self.interpreter.poolBlock(stmt)
+        return captures
+
+    def visitExpressionStmt(self, stmt: Stmt.Expression) -> bool:
+        return False
+
+    def visitFunctionStmt(self, stmt: Stmt.Function) -> bool:
+        if type(stmt.body) is not LazyBody:
+            self.analyzeAll(stmt.body)
+        return True
+
+    # Follows an else-if chain in a loop rather than one call per branch.
+    def visitIfStmt(self, stmt: Stmt.If) -> bool:
+        captures = False
+        while True:
+            if self.analyzeAll([stmt.thenBranch]):
+                captures = True
+            if type(stmt.elseBranch) is not Stmt.If:
+                return self.analyzeAll([stmt.elseBranch]) or captures
+            stmt = stmt.elseBranch
+
+    def visitImportStmt(self, stmt: Stmt.Import) -> bool:
+        return False
+
+    def visitParallelStmt(self, stmt: Stmt.Parallel) -> bool:
+        return self.analyzeAll([stmt.loop])
+
+    def visitPrintStmt(self, stmt: Stmt.Print) -> bool:
+        return False
+
+    def visitReturnStmt(self, stmt: Stmt.Return) -> bool:
+        return False
+
+    def visitWhileStmt(self, stmt: Stmt.While) -> bool:
+        captures = self.analyzeAll([stmt.body])
+        self.interpreter.planLoop(stmt)
+        return captures
+
+    def visitVarStmt(self, stmt: Stmt.Var) -> bool:
+        return False
@@ -0,0 +1,122 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import struct
+import zlib
+from typing import Dict
+from LoxFunction import LoxFunction
+from LoxFile import LoxFile
+from Coroutines import LoxGenerator, LoxAwaitable, LoxPipe
+from NativeFunction import NativeFunction
+from ScopeAnalyzer import ScopeAnalyzer
+
+class SnapshotError(Exception):
+    pass
+
+class SnapshotPickler(pickle.Pickler):
+
+    # The globals frame and natives are not stored; they are bound to
+    # the restoring interpreter's own globals and registry on load.
+    # Open files and running generators or tasks cannot be restored.
+    UNSAVEABLE = (LoxFile, LoxGenerator, LoxAwaitable, LoxPipe)
+
+    def __init__(self, file, interpreter):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.interpreter = interpreter
+
+    def persistent_id(self, obj: object):
+        if obj is self.interpreter.globals:
+            return "globals"
+        if isinstance(obj, NativeFunction):
+            return ("native", obj.name)
+        if isinstance(obj, SnapshotPickler.UNSAVEABLE):
+            raise SnapshotError(f"Cannot snapshot {obj}; open files and generators cannot be saved.")
+        return None
+
+class SnapshotUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, interpreter):
+        super().__init__(file)
+        self.interpreter = interpreter
+
+    def persistent_load(self, pid: object) -> object:
+        if pid == "globals":
+            return self.interpreter.globals
+        if pid[0] == "native" and pid[1] in self.interpreter.globals.natives:
+            return self.interpreter.globals.natives[pid[1]]
+        raise SnapshotError(f"Snapshot needs native '{pid[1]}', which is not registered.")
+
+class Snapshot:
+
+    # A snapshot file is MAGIC, a length-prefixed JSON header and the
+    # zlib-compressed pickle of the user-defined globals. Snapshots hold
+    # pickled objects, so only load files you wrote yourself.
+    MAGIC = b"LOXSNAP1"
+    HEADER = struct.Struct("!I")
+    # Modules whose classes end up inside a snapshot.
+    MODULES = ["Expr", "Stmt", "Token", "TokenType", "Environment", "LoxFunction",
+               "LoxArray", "LoxMap", "MemoCache", "NativeFunction", "Snapshot", "LazyBody",
+               "Coroutines", "LoxFile"]
+
+    @staticmethod
+    def version() -> str:
+        digest = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for module in Snapshot.MODULES:
+            with open(os.path.join(directory, f"{module}.py"), "rb") as file:
+                digest.update(file.read())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def save(interpreter, path: str):
+        natives = interpreter.globals.natives
+        values: Dict[str, object] = {name: value for name, value in interpreter.globals.values.items()
+                                     if natives.get(name) is not value}
+        buffer = io.BytesIO()
+        try:
+            SnapshotPickler(buffer, interpreter).dump(values)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            raise SnapshotError(f"Cannot snapshot the globals: {error}")
+
+        header = json.dumps({"version": Snapshot.version(), "globals": len(values)}).encode()
+        with open(path, "wb") as file:
+            file.write(Snapshot.MAGIC + Snapshot.HEADER.pack(len(header)) + header)
+            file.write(zlib.compress(buffer.getvalue()))
+
+    @staticmethod
+    def load(interpreter, path: str):
+        with open(path, "rb") as file:
+            data = file.read()
+
+        if not data.startswith(Snapshot.MAGIC):
+            raise SnapshotError(f"{path} is not a Lox snapshot.")
+        start = len(Snapshot.MAGIC) + Snapshot.HEADER.size
+        try:
+            (size,) = Snapshot.HEADER.unpack(data[len(Snapshot.MAGIC):start])
+            header = json.loads(data[start:start + size])
+        except (struct.error, ValueError) as error:
+            raise SnapshotError(f"{path} has a corrupt header: {error}")
+        if not isinstance(header, dict) or header.get("version") != Snapshot.version():
+            raise SnapshotError(f"{path} was written by a different interpreter version.")
+
+        try:
+            payload = zlib.decompress(data[start + size:])
+            values = SnapshotUnpickler(io.BytesIO(payload), interpreter).load()
+        except SnapshotError:
+            raise
+        except Exception as error:
+            # A damaged pickle can fail in many ways: UnpicklingError,
+            # EOFError, or lookups of classes and attributes that fail.
+            raise SnapshotError(f"{path} is corrupt: {error}")
+        if not isinstance(values, dict):
+            raise SnapshotError(f"{path} is corrupt: expected a table of globals.")
+
+        analyzer = ScopeAnalyzer(interpreter)
+        for name, value in values.items():
+            interpreter.globals.define(name, value)
+            if isinstance(value, LoxFunction):
+                analyzer.analyze([value.declaration])
+                if value.cache is not None:
+                    interpreter.memoized.append(value)
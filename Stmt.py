@@ -13,10 +13,18 @@ class Visitor(Generic[R]):
         pass
     def visitExpressionStmt(self, Stmt: 'Expression') -> R:
         pass
+    def visitFunctionStmt(self, Stmt: 'Function') -> R:
+        pass
     def visitIfStmt(self, Stmt: 'If') -> R:
         pass
+    def visitImportStmt(self, Stmt: 'Import') -> R:
+        pass
+    def visitParallelStmt(self, Stmt: 'Parallel') -> R:
+        pass
     def visitPrintStmt(self, Stmt: 'Print') -> R:
         pass
+    def visitReturnStmt(self, Stmt: 'Return') -> R:
+        pass
     def visitWhileStmt(self, Stmt: 'While') -> R:
         pass
     def visitVarStmt(self, Stmt: 'Var') -> R:
@@ -36,8 +44,19 @@ class Expression(Stmt):
     def accept(self, visitor: 'Visitor[R]') -> R:
         return visitor.visitExpressionStmt(self)
 
+class Function(Stmt):
+    def __init__(self, name: Token, params: List[Token], body: List[Stmt], memo: int):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.memo = memo
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitFunctionStmt(self)
+
 class If(Stmt):
-    def __init__(self, condition: Expr, thenBranch: Stmt, elseBranch: Stmt):
+    def __init__(self, keyword: Token, condition: Expr, thenBranch: Stmt, elseBranch: Stmt):
+        self.keyword = keyword
         self.condition = condition
         self.thenBranch = thenBranch
         self.elseBranch = elseBranch
@@ -45,15 +64,43 @@ class If(Stmt):
     def accept(self, visitor: 'Visitor[R]') -> R:
         return visitor.visitIfStmt(self)
 
+class Import(Stmt):
+    def __init__(self, keyword: Token, path: Token):
+        self.keyword = keyword
+        self.path = path
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitImportStmt(self)
+
+class Parallel(Stmt):
+    def __init__(self, keyword: Token, reduction: Token, target: Token, loop: Stmt):
+        self.keyword = keyword
+        self.reduction = reduction
+        self.target = target
+        self.loop = loop
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitParallelStmt(self)
+
 class Print(Stmt):
-    def __init__(self, expression: Expr):
+    def __init__(self, keyword: Token, expression: Expr):
+        self.keyword = keyword
         self.expression = expression
 
     def accept(self, visitor: 'Visitor[R]') -> R:
         return visitor.visitPrintStmt(self)
 
+class Return(Stmt):
+    def __init__(self, keyword: Token, value: Expr):
+        self.keyword = keyword
+        self.value = value
+
+    def accept(self, visitor: 'Visitor[R]') -> R:
+        return visitor.visitReturnStmt(self)
+
 class While(Stmt):
-    def __init__(self, condition: Expr, body: Stmt):
+    def __init__(self, keyword: Token, condition: Expr, body: Stmt):
+        self.keyword = keyword
         self.condition = condition
         self.body = body
 
@@ -6,6 +6,8 @@ class TokenType(Enum):
     RIGHT_PAREN = auto()
     LEFT_BRACE = auto()
     RIGHT_BRACE = auto()
+    LEFT_BRACKET = auto()
+    RIGHT_BRACKET = auto()
     COMMA = auto()
     DOT = auto()
     MINUS = auto()
@@ -39,8 +41,11 @@ class TokenType(Enum):
     FUN = auto()
     FOR = auto()
     IF = auto()
+    IMPORT = auto()
+    MEMO = auto()
     NIL = auto()
     OR = auto()
+    PARALLEL = auto()
     PRINT = auto()
     RETURN = auto()
     SUPER = auto()
@@ -48,5 +53,6 @@ class TokenType(Enum):
     TRUE = auto()
     VAR = auto()
     WHILE = auto()
+    YIELD = auto()
 
     EOF = auto()
@@ -0,0 +1,62 @@
+from Harness import Harness
+import Environment
+from Interpreter import Interpreter
+
+# Runs for loops with and without block-scope analysis and reports how
+# many Environment frames each run allocates. Tiering and the loop
+# optimizer are off, so hot loops stay in the tree walker and the
+# numbers measure only the scope change.
+class ForBenchmark:
+
+    SOURCES = {
+        "empty body": "var n = 0; for (var i = 0; i < 20000; i = i + 1) { n = n + i; } print n;",
+        "body declares": "var n = 0; for (var i = 0; i < 20000; i = i + 1) { var sq = i * i; n = n + sq; } print n;",
+        "nested loops": ("var n = 0; for (var i = 0; i < 150; i = i + 1) {"
+                         " for (var j = 0; j < 150; j = j + 1) { var p = i * j; n = n + p; } } print n;"),
+    }
+
+    allocations = 0
+
+    @staticmethod
+    def interpreter() -> Interpreter:
+        interpreter = Interpreter()
+        interpreter.tiering = None
+        interpreter.optimizeLoops = False
+        return interpreter
+
+    @staticmethod
+    def countAllocations():
+        original = Environment.Environment.__init__
+
+        def counting(self, enclosing=None):
+            ForBenchmark.allocations += 1
+            original(self, enclosing)
+
+        Environment.Environment.__init__ = counting
+
+    @staticmethod
+    def allocationsFor(source: str, analyze: bool) -> int:
+        ForBenchmark.allocations = 0
+        Harness.run(source, ForBenchmark.interpreter(), analyze)
+        return ForBenchmark.allocations
+
+    @staticmethod
+    def main():
+        for name, source in ForBenchmark.SOURCES.items():
+            plain = lambda: Harness.run(source, ForBenchmark.interpreter(), False)
+            analyzed = lambda: Harness.run(source, ForBenchmark.interpreter())
+            assert plain() == analyzed()
+            before = Harness.best(plain, 5)
+            after = Harness.best(analyzed, 5)
+            Harness.report(f"{name}, fresh scopes", before)
+            Harness.report(f"{name}, elided/pooled scopes", after, before)
+
+        # Counting wraps Environment.__init__, so it runs after timing.
+        ForBenchmark.countAllocations()
+        for name, source in ForBenchmark.SOURCES.items():
+            before = ForBenchmark.allocationsFor(source, False)
+            after = ForBenchmark.allocationsFor(source, True)
+            print(f"{name}: environments allocated {before} -> {after}")
+
+if __name__ == "__main__":
+    ForBenchmark.main()
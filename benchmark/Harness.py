@@ -0,0 +1,54 @@
+import contextlib
+import io
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Scanner
+from PrattParser import PrattParser
+from ErrorReporter import ErrorHandling
+from Interpreter import Interpreter
+from ScopeAnalyzer import ScopeAnalyzer
+
+class Harness:
+
+    @staticmethod
+    def parse(source: str) -> List:
+        tokens = Scanner.Scanner(source).scanTokens()
+        statements = PrattParser(tokens).parse()
+        if ErrorHandling.hadError:
+            ErrorHandling.flush()
+            raise SystemExit("benchmark source failed to parse")
+        return statements
+
+    @staticmethod
+    def run(source: str, interpreter: Interpreter = None, analyze: bool = True) -> str:
+        statements = Harness.parse(source)
+        interpreter = interpreter or Interpreter()
+        if analyze:
+            ScopeAnalyzer(interpreter).analyze(statements)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            interpreter.interpret(statements)
+        if ErrorHandling.hadRuntimeError:
+            raise SystemExit("benchmark source raised a runtime error:\n" + output.getvalue())
+        return output.getvalue()
+
+    @staticmethod
+    def best(action: Callable[[], object], repeat: int = 3) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            action()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    @staticmethod
+    def report(name: str, seconds: float, baseline: float = None):
+        line = f"{name:<40} {seconds * 1000:10.2f} ms"
+        if baseline:
+            line += f"   x{baseline / seconds:.2f}"
+        print(line)
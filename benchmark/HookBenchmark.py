@@ -0,0 +1,118 @@
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from Harness import Harness
+
+# Compares the interpreter from before hooks existed with this tree's:
+# never instrumented, instrumented and detached again, and with no-op
+# statement hooks (what Tracer and Debugger attach) or no-op hooks on
+# every node attached. Each workload runs in a fresh child process per
+# setup, and only the walk is timed. Tiering and the loop optimizer are off
+# throughout, since the older tree has no loop optimizer and hooks
+# suspend tiering.
+#
+# An interpreter that is never instrumented runs as fast as one from
+# before hooks. Attaching wires in only the callbacks the hooks
+# override, so statement hooks (Tracer, Debugger) cost about a tenth
+# at most and expression hooks up to a sixth. An interpreter that has
+# been instrumented and detached stays about a tenth slower, since its
+# attribute dict is no longer the shared fast layout.
+class HookBenchmark:
+
+    SOURCES = {
+        "arithmetic loop": "var n = 0; var i = 0; while (i < 30000) { n = n + i * 2; i = i + 1; } print n;",
+        "function calls": ("fun add(a, b) { return a + b; } var n = 0;"
+                           " for (var i = 0; i < 10000; i = i + 1) n = add(n, i); print n;"),
+    }
+
+    REPEAT = 5
+    ROUNDS = 5
+
+    # Run in a child process with a tree's directory, the source and a
+    # mode as arguments. Only the walk is timed.
+    TIMER = """
+import contextlib, io, sys, time
+sys.path.insert(0, sys.argv[1])
+import Scanner
+from PrattParser import PrattParser
+from ScopeAnalyzer import ScopeAnalyzer
+from Interpreter import Interpreter
+source, mode, repeat, best = sys.argv[2], sys.argv[3], int(sys.argv[4]), None
+if mode != "plain":
+    from Instrumentation import Instrumentation
+    class StatementHooks(Instrumentation):
+        def onStatement(self, interpreter, stmt):
+            pass
+    class NodeHooks(StatementHooks):
+        def onExpression(self, interpreter, expr, value):
+            pass
+for _ in range(repeat):
+    statements = PrattParser(Scanner.Scanner(source).scanTokens()).parse()
+    interpreter = Interpreter()
+    interpreter.tiering = None
+    interpreter.optimizeLoops = False
+    if mode == "detached":
+        interpreter.instrument(NodeHooks())
+        interpreter.uninstrument()
+    elif mode == "statements":
+        interpreter.instrument(StatementHooks())
+    elif mode == "nodes":
+        interpreter.instrument(NodeHooks())
+    ScopeAnalyzer(interpreter).analyze(statements)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+    seconds = time.perf_counter() - start
+    best = seconds if best is None else min(best, seconds)
+print(best)
+"""
+
+    MODES = {
+        "never instrumented": "plain",
+        "hooks detached": "detached",
+        "statement hooks attached": "statements",
+        "node hooks attached": "nodes",
+    }
+
+    # Extracts the parent of the commit that added Instrumentation.py.
+    @staticmethod
+    def baseline(directory: str) -> str:
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", "Instrumentation.py"],
+                               cwd=root, capture_output=True, text=True, check=True).stdout.split()[-1]
+        archive = subprocess.run(["git", "archive", f"{added}^"], cwd=root, capture_output=True, check=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(directory)
+        return directory
+
+    @staticmethod
+    def timed(tree: str, source: str, mode: str) -> float:
+        result = subprocess.run([sys.executable, "-c", HookBenchmark.TIMER, tree, source, mode, str(HookBenchmark.REPEAT)],
+                                capture_output=True, text=True, check=True)
+        return float(result.stdout)
+
+    @staticmethod
+    def main():
+        current = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        with tempfile.TemporaryDirectory() as directory:
+            before = HookBenchmark.baseline(directory)
+            setups = {"before hooks": (before, "plain")}
+            setups.update({label: (current, mode) for label, mode in HookBenchmark.MODES.items()})
+            for name, source in HookBenchmark.SOURCES.items():
+                # Setups take turns each round, so drift on a busy machine
+                # hits them all alike; each keeps its best round.
+                best = dict.fromkeys(setups)
+                for _ in range(HookBenchmark.ROUNDS):
+                    for label, (tree, mode) in setups.items():
+                        seconds = HookBenchmark.timed(tree, source, mode)
+                        best[label] = seconds if best[label] is None else min(best[label], seconds)
+                baseline = best.pop("before hooks")
+                Harness.report(f"{name}, before hooks", baseline)
+                for label, seconds in best.items():
+                    Harness.report(f"{name}, {label}", seconds, baseline)
+
+if __name__ == "__main__":
+    HookBenchmark.main()
@@ -0,0 +1,52 @@
+import contextlib
+import io
+from typing import List
+from Harness import Harness
+import Scanner
+from PrattParser import PrattParser
+from Interpreter import Interpreter
+from ScopeAnalyzer import ScopeAnalyzer
+from Token import Token
+
+# Parses and runs a generated library of helpers of which only a few
+# are called, with full parsing and with pre-parsed (lazy) bodies.
+# Scanning is done once up front; only parsing and running are timed.
+class LazyParseBenchmark:
+
+    @staticmethod
+    def source(helpers: int, called: int) -> str:
+        lines = []
+        for i in range(helpers):
+            lines.append(f"fun helper{i}(a, b) {{")
+            lines.append("  var total = 0;")
+            lines.append("  for (var k = 0; k < a; k = k + 1) {")
+            lines.append(f"    if (k * b > {i}) total = total + k * b - 1; else total = total - (k + {i}) / 2;")
+            lines.append("  }")
+            lines.append("  return total;")
+            lines.append("}")
+        for i in range(called):
+            lines.append(f"print helper{i * (helpers // called)}(10, 3);")
+        return "\n".join(lines)
+
+    @staticmethod
+    def run(tokens: List[Token], lazy: bool) -> str:
+        interpreter = Interpreter()
+        statements = PrattParser(tokens, lazy).parse()
+        ScopeAnalyzer(interpreter).analyze(statements)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            interpreter.interpret(statements)
+        return output.getvalue()
+
+    @staticmethod
+    def main():
+        for helpers in [500, 2000, 8000]:
+            tokens = Scanner.Scanner(LazyParseBenchmark.source(helpers, 10)).scanTokens()
+            assert LazyParseBenchmark.run(tokens, False) == LazyParseBenchmark.run(tokens, True)
+            full = Harness.best(lambda: LazyParseBenchmark.run(tokens, False))
+            lazy = Harness.best(lambda: LazyParseBenchmark.run(tokens, True))
+            Harness.report(f"{helpers} helpers, full parse", full)
+            Harness.report(f"{helpers} helpers, lazy parse", lazy, full)
+
+if __name__ == "__main__":
+    LazyParseBenchmark.main()
@@ -0,0 +1,40 @@
+from Harness import Harness
+from Interpreter import Interpreter
+
+# Runs loop-heavy scripts with and without the loop optimizer, in the
+# tree walker alone and with hot loops promoted to the compiled tier.
+class LoopOptBenchmark:
+
+    SOURCES = {
+        "invariant bound": ("var n = 300; var s = 0;"
+                            " for (var i = 0; i < n * n; i = i + 1) { s = s + i; } print s;"),
+        "invariant body": ("var n = 7; var s = 0; var i = 0;"
+                           " while (i < 50000) { s = s + (n * n - 1) / (n + 1); i = i + 1; } print s;"),
+        "short inner loops": ("var n = 0; for (var i = 0; i < 2000; i = i + 1) {"
+                              " for (var j = 0; j < 40; j = j + 1) { n = n + j; } } print n;"),
+        "nested loops": ("var n = 0; var w = 3; for (var i = 0; i < 300; i = i + 1) {"
+                         " for (var j = 0; j < 300; j = j + 1) { n = n + i * w + j; } } print n;"),
+    }
+
+    @staticmethod
+    def interpreter(optimize: bool, tiered: bool) -> Interpreter:
+        interpreter = Interpreter()
+        interpreter.optimizeLoops = optimize
+        if not tiered:
+            interpreter.tiering = None
+        return interpreter
+
+    @staticmethod
+    def main():
+        for name, source in LoopOptBenchmark.SOURCES.items():
+            for tiered in (False, True):
+                mode = "tiered" if tiered else "tree walker"
+                before = lambda: Harness.run(source, LoopOptBenchmark.interpreter(False, tiered))
+                after = lambda: Harness.run(source, LoopOptBenchmark.interpreter(True, tiered))
+                assert before() == after()
+                plain = Harness.best(before)
+                Harness.report(f"{name}, {mode}", plain)
+                Harness.report(f"{name}, {mode}, optimized", Harness.best(after), plain)
+
+if __name__ == "__main__":
+    LoopOptBenchmark.main()
@@ -0,0 +1,50 @@
+from Harness import Harness
+
+# Compares a native map lookup table against the if-chain pattern it
+# replaces, for a table of `size` entries probed `lookups` times.
+class MapBenchmark:
+
+    @staticmethod
+    def ifChainSource(size: int, lookups: int) -> str:
+        lines = ["fun lookup(k) {"]
+        for i in range(size):
+            lines.append(f'  if (k == {i}) return "v{i}";')
+        lines.append("  return nil;")
+        lines.append("}")
+        lines.append(MapBenchmark.probeLoop(lookups, size, "lookup(k)"))
+        return "\n".join(lines)
+
+    @staticmethod
+    def mapSource(size: int, lookups: int) -> str:
+        lines = ["var table = map();"]
+        for i in range(size):
+            lines.append(f'table[{i}] = "v{i}";')
+        lines.append(MapBenchmark.probeLoop(lookups, size, "table[k]"))
+        return "\n".join(lines)
+
+    @staticmethod
+    def probeLoop(lookups: int, size: int, probe: str) -> str:
+        # Every round probes each key once, in order.
+        rounds = max(1, lookups // size)
+        return (f"var round = 0; var hits = 0;\n"
+                f"while (round < {rounds}) {{\n"
+                f"  var k = 0;\n"
+                f"  while (k < {size}) {{ if ({probe} != nil) hits = hits + 1; k = k + 1; }}\n"
+                f"  round = round + 1;\n"
+                f"}}\n"
+                f"print hits;")
+
+    @staticmethod
+    def main():
+        lookups = 2000
+        for size in [8, 64, 256]:
+            chain = MapBenchmark.ifChainSource(size, lookups)
+            table = MapBenchmark.mapSource(size, lookups)
+            assert Harness.run(chain) == Harness.run(table)
+            chainTime = Harness.best(lambda: Harness.run(chain))
+            tableTime = Harness.best(lambda: Harness.run(table))
+            Harness.report(f"if-chain lookup, {size} keys", chainTime)
+            Harness.report(f"map lookup, {size} keys", tableTime, chainTime)
+
+if __name__ == "__main__":
+    MapBenchmark.main()
@@ -0,0 +1,61 @@
+import random
+from Harness import Harness
+import Scanner
+from Parser import Parser
+from PrattParser import PrattParser
+from Token import Token
+
+# Parse throughput of the recursive-descent and Pratt expression parsers
+# on generated, expression-dense code. Both must build identical trees.
+class ParseBenchmark:
+
+    BINARY = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">=", "and", "or"]
+
+    @staticmethod
+    def expression(rng: random.Random, depth: int) -> str:
+        if depth == 0:
+            return rng.choice(["x", "y", "1", "2.5", '"s"', "true", "nil", "a[0]", "f(x, 2)"])
+        choice = rng.random()
+        if choice < 0.1:
+            return "-" + ParseBenchmark.expression(rng, depth - 1)
+        if choice < 0.2:
+            return "(" + ParseBenchmark.expression(rng, depth - 1) + ")"
+        if choice < 0.25:
+            return (ParseBenchmark.expression(rng, depth - 1) + " ? " + ParseBenchmark.expression(rng, depth - 1)
+                    + " : " + ParseBenchmark.expression(rng, depth - 1))
+        return (ParseBenchmark.expression(rng, depth - 1) + " " + rng.choice(ParseBenchmark.BINARY) + " "
+                + ParseBenchmark.expression(rng, depth - 1))
+
+    @staticmethod
+    def source(statements: int) -> str:
+        rng = random.Random(31)
+        lines = []
+        for i in range(statements):
+            lines.append(f"v{i % 10} = {ParseBenchmark.expression(rng, 4)};")
+        return "\n".join(lines)
+
+    @staticmethod
+    def same(left: object, right: object) -> bool:
+        if type(left) is not type(right):
+            return False
+        if isinstance(left, list):
+            return len(left) == len(right) and all(ParseBenchmark.same(a, b) for a, b in zip(left, right))
+        if isinstance(left, Token) or not hasattr(left, "__dict__"):
+            return left is right or left == right
+        return all(ParseBenchmark.same(value, getattr(right, name)) for name, value in vars(left).items())
+
+    @staticmethod
+    def main():
+        source = ParseBenchmark.source(2000)
+        tokens = Scanner.Scanner(source).scanTokens()
+        assert ParseBenchmark.same(Parser(tokens).parse(), PrattParser(tokens).parse())
+
+        descent = Harness.best(lambda: Parser(tokens).parse(), 5)
+        pratt = Harness.best(lambda: PrattParser(tokens).parse(), 5)
+        print(f"{len(tokens)} tokens")
+        Harness.report("recursive descent", descent)
+        Harness.report("pratt", pratt, descent)
+        print(f"pratt throughput: {len(tokens) / pratt / 1e6:.2f} M tokens/s")
+
+if __name__ == "__main__":
+    ParseBenchmark.main()
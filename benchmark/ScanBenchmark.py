@@ -0,0 +1,44 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from Harness import Harness
+import Scanner
+from ParallelScanner import ParallelScanner
+
+# Scans one large generated source serially and with ParallelScanner
+# at increasing worker counts. Scaling stops at the machine's cores.
+class ScanBenchmark:
+
+    LINES = [
+        'var total{0} = {0} * 2.5 + counter;',
+        'print "line {0} of a generated\nmulti-line string";',
+        '/* block comment {0}\n   spanning lines */',
+        'if (total{0} >= 10) {{ total{0} = total{0} - 1; }} // trailing',
+        'fun helper{0}(a, b) {{ return a[0] + b; }}',
+    ]
+
+    @staticmethod
+    def source(lines: int) -> str:
+        templates = ScanBenchmark.LINES
+        return "\n".join(templates[i % len(templates)].format(i) for i in range(lines))
+
+    @staticmethod
+    def same(left, right) -> bool:
+        return [(t.type, t.lexeme, t.literal, t.line) for t in left] == \
+               [(t.type, t.lexeme, t.literal, t.line) for t in right]
+
+    @staticmethod
+    def main():
+        source = ScanBenchmark.source(60000)
+        print(f"{len(source) / 1e6:.1f} MB source, {os.cpu_count()} cores")
+        serial = Harness.best(lambda: Scanner.Scanner(source).scanTokens())
+        Harness.report("serial", serial)
+
+        for workers in [1, 2, 4, 8]:
+            with ProcessPoolExecutor(workers) as executor:
+                scanner = ParallelScanner(source, executor, workers)
+                assert ScanBenchmark.same(scanner.scanTokens(), Scanner.Scanner(source).scanTokens())
+                elapsed = Harness.best(scanner.scanTokens)
+            Harness.report(f"parallel, {workers} workers", elapsed, serial)
+
+if __name__ == "__main__":
+    ScanBenchmark.main()
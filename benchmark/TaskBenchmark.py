@@ -0,0 +1,48 @@
+from Harness import Harness
+
+# Spawns many Lox tasks that each sleep a few times and checks that the
+# scheduler overlaps the sleeps instead of running them back to back.
+class TaskBenchmark:
+
+    @staticmethod
+    def sleepersSource(tasks: int, sleeps: int, seconds: float) -> str:
+        return (f"var finished = 0;\n"
+                f"fun sleeper() {{\n"
+                f"  for (var i = 0; i < {sleeps}; i = i + 1) yield sleep({seconds});\n"
+                f"  finished = finished + 1;\n"
+                f"}}\n"
+                f"for (var t = 0; t < {tasks}; t = t + 1) spawn(sleeper());\n"
+                f"runTasks();\n"
+                f"print finished;")
+
+    @staticmethod
+    def iterationSource(count: int, generator: bool) -> str:
+        if generator:
+            return (f"fun numbers(n) {{ var i = 0; while (i < n) {{ yield i; i = i + 1; }} }}\n"
+                    f"var g = numbers({count}); var total = 0; var v = next(g);\n"
+                    f"while (!done(g)) {{ total = total + v; v = next(g); }}\n"
+                    f"print total;")
+        return (f"var i = 0; var total = 0;\n"
+                f"while (i < {count}) {{ total = total + i; i = i + 1; }}\n"
+                f"print total;")
+
+    @staticmethod
+    def main():
+        seconds, sleeps = 0.05, 3
+        for tasks in [100, 1000, 10000]:
+            source = TaskBenchmark.sleepersSource(tasks, sleeps, seconds)
+            assert Harness.run(source) == f"{tasks}\n"
+            elapsed = Harness.best(lambda: Harness.run(source), 1)
+            Harness.report(f"{tasks} tasks x {sleeps} sleeps of {seconds}s", elapsed)
+            print(f"  sequential sleeping would take {tasks * sleeps * seconds:.0f} s")
+
+        count = 20000
+        loop = TaskBenchmark.iterationSource(count, False)
+        generator = TaskBenchmark.iterationSource(count, True)
+        loopTime = Harness.best(lambda: Harness.run(loop))
+        generatorTime = Harness.best(lambda: Harness.run(generator))
+        Harness.report(f"while loop, {count} values", loopTime)
+        Harness.report(f"generator, {count} values", generatorTime, loopTime)
+
+if __name__ == "__main__":
+    TaskBenchmark.main()
@@ -0,0 +1,33 @@
+from Harness import Harness
+from Interpreter import Interpreter
+
+# Runs loop-heavy scripts in the tree walker only and with hot loops
+# promoted to the compiled tier.
+class TierBenchmark:
+
+    SOURCES = {
+        "counting loop": "var n = 0; var i = 0; while (i < 200000) { n = n + i; i = i + 1; } print n;",
+        "nested loops": ("var n = 0; for (var i = 0; i < 300; i = i + 1) {"
+                         " for (var j = 0; j < 300; j = j + 1) { var p = i * j; if (p > 100) n = n + p; } } print n;"),
+        "short loops": ("fun sum(k) { var s = 0; var i = 0; while (i < k) { s = s + i; i = i + 1; } return s; }"
+                        " var n = 0; var r = 0; while (r < 5000) { n = n + sum(20); r = r + 1; } print n;"),
+        "string building": "var s = \"\"; var i = 0; while (i < 3000) { s = s + \"x\"; i = i + 1; } print len(s);",
+    }
+
+    @staticmethod
+    def walker() -> Interpreter:
+        interpreter = Interpreter()
+        interpreter.tiering = None
+        return interpreter
+
+    @staticmethod
+    def main():
+        for name, source in TierBenchmark.SOURCES.items():
+            assert Harness.run(source, TierBenchmark.walker()) == Harness.run(source)
+            walked = Harness.best(lambda: Harness.run(source, TierBenchmark.walker()))
+            tiered = Harness.best(lambda: Harness.run(source))
+            Harness.report(f"{name}, tree walker", walked)
+            Harness.report(f"{name}, tiered", tiered, walked)
+
+if __name__ == "__main__":
+    TierBenchmark.main()
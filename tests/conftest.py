@@ -0,0 +1,53 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ErrorReporter import ErrorHandling
+from Lox import Lox
+
+
+@pytest.fixture
+def lox():
+    flags, limits, options = dict(Lox.flags), dict(Lox.limits), dict(Lox.options)
+    yield
+    Lox.flags.update(flags)
+    Lox.limits.update(limits)
+    Lox.options.update(options)
+    Lox.reset()
+
+
+# Runs a source through Lox.run with the given flags and returns what
+# it printed and the exit code; the class-level flag, limit, option and
+# error state is restored after.
+@pytest.fixture
+def outcome(lox):
+    flags, limits, options = dict(Lox.flags), dict(Lox.limits), dict(Lox.options)
+
+    def outcome(source: str, *args: str):
+        Lox.flags.update(flags)
+        Lox.limits.update(limits)
+        Lox.options.update(options)
+        assert Lox.parseFlags(list(args)) == []
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            Lox.run(source)
+        return output.getvalue(), Lox.exitCode()
+
+    return outcome
+
+
+# Like outcome, but asserts the run reported no errors and returns only
+# what it printed.
+@pytest.fixture
+def run(outcome):
+    def run(source: str, *args: str) -> str:
+        output, _ = outcome(source, *args)
+        assert not ErrorHandling.hadError and not ErrorHandling.hadRuntimeError, output
+        return output
+
+    return run
@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+
+import Expr
+import Scanner
+from AstPrinter import AstPrinter
+from PrattParser import PrattParser
+
+SOURCE = 'var a = -1 * (2 + 3); if (a < 0 and true) print "neg"; else print nil; fun f(x) { return x; }'
+
+
+def dumped(source: str, format: str) -> str:
+    out = io.StringIO()
+    AstPrinter(out, format).write(PrattParser(Scanner.Scanner(source).scanTokens()).parse())
+    return out.getvalue()
+
+
+def test_sexpr_lines():
+    assert dumped(SOURCE, "sexpr").splitlines() == [
+        "(var a (* (- 1.0) (group (+ 2.0 3.0))))",
+        '(if (and (< a 0.0) true) (print "neg") (print nil))',
+        "(fun f [x] [(return x)])",
+    ]
+
+
+def test_json_lines():
+    lines = [json.loads(line) for line in dumped(SOURCE, "json").splitlines()]
+    assert [line["node"] for line in lines] == ["Stmt.Var", "Stmt.If", "Stmt.Function"]
+    assert lines[0]["initializer"]["right"] == {
+        "node": "Expr.Grouping",
+        "expression": {"node": "Expr.Binary", "operator": "+",
+                       "left": {"node": "Expr.Literal", "value": 2.0},
+                       "right": {"node": "Expr.Literal", "value": 3.0}},
+    }
+    assert lines[1]["elseBranch"]["expression"] == {"node": "Expr.Literal", "value": None}
+    assert lines[2]["params"] == ["x"] and lines[2]["memo"] is None
+
+
+# Strings are quoted, so a line break in one stays inside its line.
+def test_strings_are_quoted():
+    source = 'print "two\nlines";'
+    assert dumped(source, "sexpr") == '(print "two\\nlines")\n'
+    assert json.loads(dumped(source, "json"))["expression"]["value"] == "two\nlines"
+
+
+@pytest.mark.parametrize("format", AstPrinter.FORMATS)
+def test_deep_trees_do_not_recurse(format):
+    depth = 100000
+    expr = Expr.Literal(1.0)
+    for _ in range(depth):
+        expr = Expr.Grouping(expr)
+    text = AstPrinter(format=format).print(expr)
+    opening = "(group " if format == "sexpr" else '{"node": "Expr.Grouping", "expression": '
+    assert text.startswith(opening * 3)
+    assert text.count(opening) == depth
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        AstPrinter(io.StringIO(), "xml")
@@ -0,0 +1,27 @@
+import pytest
+
+NESTED = ("var n = 0; for (var i = 0; i < 200; i = i + 1) {"
+          " for (var j = 0; j < 1000; j = j + 1) { n = n + 1; } } print n;")
+
+
+@pytest.mark.parametrize("mode", [(), ("--iterative",)])
+def test_short_inner_loops_are_charged(outcome, mode):
+    output, code = outcome(NESTED, "--no-tiering", "--max-steps=50000", *mode)
+    assert code == 124
+    assert "Execution budget of 50000 steps exhausted." in output
+
+
+def test_runs_within_budget_complete(outcome):
+    assert outcome(NESTED, "--max-steps=1000000") == ("200000\n", 0)
+
+
+def test_runaway_loop_hits_time_limit(outcome):
+    output, code = outcome("while (true) {}", "--time-limit=0.2")
+    assert code == 124
+    assert "Execution time limit of 0.2 seconds exceeded." in output
+
+
+def test_call_depth_is_capped(outcome):
+    output, code = outcome("fun f(n) { return f(n + 1); } f(0);", "--max-depth=50")
+    assert code == 124
+    assert "Call depth limit of 50 exceeded." in output
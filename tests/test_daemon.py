@@ -0,0 +1,45 @@
+import contextlib
+import io
+
+from Lox import Lox
+from LoxDaemon import LoxDaemon
+
+
+def serve(daemon: LoxDaemon, request: dict):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        code = daemon.run(request)
+    return output.getvalue(), code
+
+
+def test_requests_run_and_cache_parses(lox, monkeypatch):
+    parses = []
+    parse = Lox.parse
+    monkeypatch.setattr(Lox, "parse", staticmethod(lambda source: parses.append(source) or parse(source)))
+    daemon = LoxDaemon("unused.sock", 1)
+    request = {"source": "var a = 1; { var b = 2; print a + b; }"}
+    assert serve(daemon, request) == ("3\n", 0)
+    assert serve(daemon, request) == ("3\n", 0)
+    assert len(parses) == 1
+
+
+def test_parse_flags_are_part_of_the_cache_key(lox, monkeypatch):
+    parses = []
+    parse = Lox.parse
+    monkeypatch.setattr(Lox, "parse", staticmethod(lambda source: parses.append(Lox.flags["--lazy-parse"]) or parse(source)))
+    daemon = LoxDaemon("unused.sock", 1)
+    source = "fun f() { return 2; } print f();"
+    assert serve(daemon, {"source": source, "flags": ["--lazy-parse"]}) == ("2\n", 0)
+    assert serve(daemon, {"source": source}) == ("2\n", 0)
+    assert parses == [True, False]
+
+
+def test_flags_and_options_do_not_leak_between_requests(lox):
+    daemon = LoxDaemon("unused.sock", 1)
+    assert serve(daemon, {"source": "while (true) {}", "flags": ["--max-steps=5000"]})[1] == 124
+    assert serve(daemon, {"source": "var i = 0; while (i < 20000) i = i + 1; print i;"}) == ("20000\n", 0)
+    assert Lox.limits["--max-steps"] is None
+
+
+def test_syntax_errors_are_reported(lox):
+    assert serve(LoxDaemon("unused.sock", 1), {"source": "print ;"})[1] == 65
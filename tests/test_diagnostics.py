@@ -0,0 +1,52 @@
+import json
+
+
+def test_distinct_errors_on_one_line_are_all_reported(outcome):
+    output, code = outcome('print 1; @ @ $ "abc')
+    assert code == 65
+    assert output.splitlines() == [
+        "[line 1] Error : Unexpected character. (+2 more like this on this line)",
+        "[line 1] Error : Unterminated string.",
+    ]
+
+
+def test_errors_are_printed_in_line_order(outcome):
+    output, code = outcome("var = 1;\nprint 2 +;\n")
+    assert code == 65
+    assert output.splitlines() == [
+        "[line 1] Error  at '=': Expected variable name.",
+        "[line 2] Error  at ';': Expect expression.",
+    ]
+
+
+def test_json_output(outcome):
+    output, _ = outcome('print 1; @ @ $ "abc', "--diagnostics=json")
+    assert json.loads(output) == {
+        "errors": [
+            {"line": 1, "where": "", "message": "Unexpected character.", "repeats": 2},
+            {"line": 1, "where": "", "message": "Unterminated string.", "repeats": 0},
+        ],
+        "truncated": False,
+    }
+
+
+def test_max_errors_caps_distinct_errors(outcome):
+    source = "@\n#\n$\n"
+    output, code = outcome(source, "--max-errors=2")
+    assert code == 65
+    assert output.splitlines() == [
+        "[line 1] Error : Unexpected character.",
+        "[line 2] Error : Unexpected character.",
+        "Too many errors; stopped after 2.",
+    ]
+
+    output, _ = outcome(source, "--max-errors=2", "--diagnostics=json")
+    report = json.loads(output)
+    assert [error["line"] for error in report["errors"]] == [1, 2]
+    assert report["truncated"] is True
+
+
+def test_repeats_do_not_count_against_the_cap(outcome):
+    output, _ = outcome('@ @ @ "abc', "--max-errors=2")
+    assert "Unterminated string." in output
+    assert "Too many errors" not in output
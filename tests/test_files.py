@@ -0,0 +1,62 @@
+from Lox import Lox
+
+
+def test_write_then_read_lines(run, tmp_path):
+    path = tmp_path / "lines.txt"
+    source = f"""
+var out = open("{path}", "w");
+write(out, "one");
+writeLine(out, "");
+writeLine(out, "two");
+close(out);
+var f = open("{path}", "r");
+var line = readLine(f);
+while (line != nil) {{ print line; line = readLine(f); }}
+print readLine(f);
+close(f);
+"""
+    assert run(source) == "one\ntwo\nnil\n"
+
+
+def test_append_and_crlf_lines(run, tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"a\r\nb\n")
+    source = f"""
+var f = open("{path}", "a");
+writeLine(f, "c");
+close(f);
+f = open("{path}", "r");
+print readLine(f) + readLine(f) + readLine(f);
+"""
+    assert run(source) == "abc\n"
+
+
+def test_files_are_closed_when_the_script_ends(run, tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("x\n")
+    run(f'var f = open("{path}", "r");')
+    assert not Lox.interpreter.files.open
+
+
+def test_files_are_closed_after_a_runtime_error(outcome, tmp_path):
+    path = tmp_path / "out.txt"
+    output, code = outcome(f'var f = open("{path}", "w"); writeLine(f, "kept"); print nil + 1;')
+    assert code == 70
+    assert not Lox.interpreter.files.open
+    assert path.read_text() == "kept\n"
+
+
+def test_misuse_is_a_runtime_error(outcome, tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("x\n")
+    cases = {
+        f'open("{tmp_path / "missing" / "file"}", "r");': "Cannot open",
+        f'open("{path}", "x");': "open() expects a path and one of",
+        f'var f = open("{path}", "r"); close(f); readLine(f);': "readLine() on closed file",
+        f'var f = open("{path}", "r"); write(f, "y");': "write() needs a file opened for writing.",
+        'readLine("not a file");': "readLine() expects a file.",
+    }
+    for source, message in cases.items():
+        output, code = outcome(source)
+        assert code == 70, source
+        assert output.startswith(message), output
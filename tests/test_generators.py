@@ -0,0 +1,24 @@
+def test_yield_next_and_send(run):
+    source = ("fun counter(n) { var i = 0; while (i < n) { var got = yield i; if (got != nil) i = got; i = i + 1; } }"
+              " var g = counter(10); print next(g); print next(g); print send(g, 7); print next(g); print next(g);"
+              " print done(g);")
+    assert run(source) == "0\n1\n8\n9\nnil\ntrue\n"
+
+
+def test_tasks_interleave(run):
+    source = ("fun task(name) { for (var i = 0; i < 2; i = i + 1) { print name; yield nil; } }"
+              " spawn(task(\"a\")); spawn(task(\"b\")); print runTasks();")
+    assert run(source) == "a\nb\na\nb\n2\n"
+
+
+# Collecting a suspended generator used to restore the environment it
+# was suspended in over whatever environment was running at the time.
+def test_collecting_an_abandoned_generator_keeps_the_running_environment(run):
+    source = ("fun gen() { var i = 0; while (true) { var k = i; yield k; i = i + 1; } }"
+              " var g = gen(); next(g); g = nil;"
+              " fun churn(n) { var total = 0;"
+              " for (var i = 0; i < n; i = i + 1) { var m = map(); set(m, \"self\", m); total = total + 1; }"
+              " return total; }"
+              " print churn(20000);")
+    assert run(source) == "20000\n"
+    assert run(source, "--iterative") == "20000\n"
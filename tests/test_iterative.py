@@ -0,0 +1,50 @@
+# Deep programs that the recursive passes could not get through.
+
+def test_long_else_if_chain(run):
+    branches = 10000
+    source = f"var x = {branches - 1};\nif (x == 0) print 0;\n"
+    source += "".join(f"else if (x == {i}) print {i};\n" for i in range(1, branches))
+    source += "else print -1;\n"
+    assert run(source, "--iterative") == f"{branches - 1}\n"
+
+
+def test_deep_parentheses_and_unary_chains(run):
+    depth = 5000
+    source = f"print {'(' * depth}1{')' * depth};\nprint {'-' * depth}1;\nprint {'!' * depth}true;\n"
+    assert run(source, "--iterative") == "1\n1\ntrue\n"
+
+
+def test_deep_right_operands(run):
+    depth = 5000
+    source = f"print {'1 + (' * depth}1{')' * depth};\n"
+    assert run(source, "--iterative") == f"{depth + 1}\n"
+
+
+PROGRAMS = [
+    "print 1 + 2 * 3 - 4 / 5; print \"a\" + \"b\"; print -(3 - 10); print !nil;",
+    "print nil or \"x\"; print false and 1; print 1 < 2 ? \"yes\" : \"no\"; print 1 == 1.0 != false;",
+    "var a = 1; var b; a = b = a + 1; print a; print b;",
+    "fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); } print fib(15);",
+    ("fun counter() { var n = 0; fun inc() { n = n + 1; return n; } return inc; }"
+     " var c = counter(); c(); c(); print c();"),
+    "var m = map(); m[\"k\"] = 2; var xs = array(3); xs[1] = m[\"k\"] * 5; print xs[1] + len(xs);",
+    "var s = 0; for (var i = 0; i < 50; i = i + 1) { if (i == 3) print i; else if (i > 47) s = s + i; } print s;",
+    "fun gen() { var x = yield 1; print x; yield 2; } var g = gen(); print next(g); print send(g, \"sent\");",
+]
+
+ERRORS = [
+    "print 1 + nil;",
+    "fun f(a) { return a; } f(1, 2);",
+    "print undefined;",
+    "var m = map(); m[map()] = 1;",
+]
+
+
+def test_matches_the_recursive_evaluator(run):
+    for source in PROGRAMS:
+        assert run(source, "--iterative") == run(source), source
+
+
+def test_reports_the_same_runtime_errors(outcome):
+    for source in ERRORS:
+        assert outcome(source, "--iterative") == outcome(source), source
@@ -0,0 +1,42 @@
+import pytest
+
+import Stmt
+from Lox import Lox
+from LoopTier import Placeholder
+
+SOURCES = {
+    "invariant bound": "var n = 30; var s = 0; for (var i = 0; i < n * n; i = i + 1) { s = s + i; } print s;",
+    "invariant body": ("var n = 7; var s = 0; var i = 0;"
+                       " while (i < 500) { s = s + (n * n - 1) / (n + 1); i = i + 1; } print s;"),
+    "nested loops": ("var n = 0; var w = 3; for (var i = 0; i < 30; i = i + 1) {"
+                     " for (var j = 0; j < 30; j = j + 1) { n = n + i * w + j; } } print n;"),
+    "bound assigned in the body": ("var n = 10; var s = 0; for (var i = 0; i < n; i = i + 1) {"
+                                   " if (i == 3) n = 5; s = s + i; } print s;"),
+    "failing invariant in an untaken branch": ("var s = 0; var x = nil; for (var i = 0; i < 300; i = i + 1) {"
+                                               " if (i < 0) s = s + x * 2; s = s + 1; } print s;"),
+    "for loop with a block body": ("var n = 0; var w = 3; for (var i = 0; i < 300; i = i + 1) {"
+                                   " if (i > 5) { n = n + w * 2; } } print n;"),
+}
+
+
+@pytest.mark.parametrize("name", SOURCES)
+@pytest.mark.parametrize("mode", [(), ("--no-tiering",), ("--lazy-parse",)])
+def test_optimized_matches_unoptimized(run, name, mode):
+    source = SOURCES[name]
+    assert run(source, *mode) == run(source, "--no-loop-opt", *mode)
+
+
+def test_invariants_are_restored_after_the_loop(run):
+    run(SOURCES["invariant bound"], "--no-tiering")
+    (loop,) = Lox.interpreter.loopPlans
+    assert not isinstance(loop.condition.right, Placeholder)
+    assert isinstance(loop.condition.right, type(loop.condition))
+
+
+@pytest.mark.parametrize("source", [SOURCES["for loop with a block body"], SOURCES["nested loops"]])
+def test_lazily_parsed_loops_are_planned(run, source):
+    run(source, "--lazy-parse")
+    interpreter = Lox.interpreter
+    assert interpreter.loopPlans
+    assert not interpreter.lazyLoops
+    assert all(isinstance(loop, Stmt.While) for loop in interpreter.loopPlans)
@@ -0,0 +1,67 @@
+def test_get_set_has_delete(run):
+    source = """
+var m = map();
+set(m, "a", 1);
+print get(m, "a");
+print get(m, "missing");
+print has(m, "a");
+print delete(m, "a");
+print has(m, "a");
+print delete(m, "a");
+"""
+    assert run(source).splitlines() == ["1", "nil", "true", "true", "false", "false"]
+
+
+def test_keys_follow_lox_equality(run):
+    # true and 1, and 1 and "1", are different Lox values.
+    source = """
+var m = map();
+set(m, 1, "number");
+set(m, true, "boolean");
+set(m, "1", "string");
+set(m, nil, "nil");
+print get(m, 1);
+print get(m, true);
+print get(m, "1");
+print get(m, nil);
+print len(m);
+"""
+    assert run(source).splitlines() == ["number", "boolean", "string", "nil", "4"]
+
+
+def test_index_syntax_and_printing(run):
+    source = """
+var m = map();
+m["x"] = 1;
+m[2] = "two";
+m["x"] = m["x"] + 1;
+print m["x"];
+print m;
+"""
+    assert run(source).splitlines() == ["2", "{x: 2, 2: two}"]
+
+
+def test_keys_in_insertion_order(run):
+    source = """
+var m = map();
+set(m, "b", 1);
+set(m, "a", 2);
+var k = keys(m);
+print len(k);
+print get(k, 0);
+print get(k, 1);
+"""
+    assert run(source).splitlines() == ["2", "b", "a"]
+
+
+def test_unhashable_key_is_a_runtime_error(outcome):
+    output, code = outcome("var m = map();\nset(m, map(), 1);")
+    assert code == 70
+    assert output.startswith("Map keys must be nil, booleans, numbers or strings.")
+    assert "[line 2]" in output
+
+
+def test_natives_check_for_a_map(outcome):
+    output, code = outcome('get("text", 1);')
+    assert code == 70
+    assert output.startswith("get() expects a map.")
@@ -0,0 +1,37 @@
+# Memoized functions must not return results computed for an argument
+# that has changed since.
+
+def test_mutated_array_argument_misses_cache(run):
+    source = """
+memo fun total(a) { return sum(a); }
+var a = array(3);
+print total(a);
+a[0] = 5;
+print total(a);
+print total(a);
+"""
+    assert run(source) == "0\n5\n5\n"
+
+
+def test_mutated_map_argument_misses_cache(run):
+    source = """
+memo fun size(m) { return len(keys(m)); }
+var m = map();
+print size(m);
+set(m, "k", 1);
+print size(m);
+"""
+    assert run(source) == "0\n1\n"
+
+
+def test_map_containing_itself_is_not_cached(run):
+    source = """
+memo fun first(m) { return get(m, "n"); }
+var m = map();
+set(m, "self", m);
+set(m, "n", 1);
+print first(m);
+set(m, "n", 2);
+print first(m);
+"""
+    assert run(source) == "1\n2\n"
@@ -0,0 +1,25 @@
+import contextlib
+import io
+
+from Environment import Environment
+from Lox import Lox
+from MemoryProfile import MemoryProfile
+
+
+def test_counts_environments_freed_before_the_end():
+    source = ("fun f(n) { return n; } var s = 0; var i = 0;"
+              " while (i < 100) { s = s + f(i); i = i + 1; }"
+              " fun keep() { var a = 1; fun g() { return a; } return g; } var g = keep();")
+    profile = MemoryProfile()
+    profile.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            Lox.run(source)
+    finally:
+        profile.stop()
+
+    environments = profile.toJson()["environments"]
+    assert environments["built"] == 101
+    assert environments["peak"] == 1
+    assert environments["alive"] == 1
+    assert "__del__" not in vars(Environment)
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from Lox import Lox
+from LoxModule import ModuleCache
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    monkeypatch.setattr(Lox.modules, "root", str(tmp_path))
+
+    def write(name: str, source: str):
+        (tmp_path / name).write_text(source)
+
+    return write
+
+
+def test_module_names_are_imported_and_run_once(run, modules):
+    modules("lib.lox", 'print "loading"; var base = 40; fun add(n) { return base + n; }')
+    assert run('import "lib.lox"; import "lib.lox"; print add(2);') == "loading\n42\n"
+
+
+def test_module_globals_belong_to_the_importing_interpreter(run, modules):
+    modules("scaled.lox", "fun scaled(n) { return n * factor; }")
+    assert run('var factor = 2; import "scaled.lox"; print scaled(5);') == "10\n"
+    # A fresh interpreter reuses the parsed module but not the old globals.
+    assert run('var factor = 3; import "scaled.lox"; print scaled(5);') == "15\n"
+
+
+def test_module_syntax_error_is_a_runtime_error_at_the_import(outcome, modules):
+    modules("broken.lox", "var = ;")
+    output, code = outcome('print "before"; import "broken.lox";')
+    assert code == 70
+    assert "Cannot compile module 'broken.lox'." in output
+
+
+def test_import_cycles_are_reported(outcome, modules):
+    modules("a.lox", 'import "b.lox";')
+    modules("b.lox", 'import "a.lox";')
+    output, code = outcome('import "a.lox";')
+    assert code == 70
+    assert "Import cycle: a.lox -> b.lox -> a.lox." in output
+
+
+def test_changed_module_is_run_again(run, modules, tmp_path, monkeypatch):
+    monkeypatch.setattr(ModuleCache, "REVALIDATE", 0.0)
+    modules("value.lox", "var value = 1;")
+    assert run('import "value.lox"; print value;') == "1\n"
+    modules("value.lox", "var value = 2;")
+    os.utime(tmp_path / "value.lox", (1, 1))
+    assert run('import "value.lox"; print value;') == "2\n"
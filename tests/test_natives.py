@@ -0,0 +1,28 @@
+from Environment import Environment
+from Lox import Lox
+from NativeFunction import NativeFunction
+
+
+def test_registered_native_is_callable(lox, capsys):
+    Lox.reset()
+    native = Lox.interpreter.globals.register("double", 1, lambda n: n * 2)
+    assert Lox.interpreter.globals.natives["double"] is native
+    assert isinstance(native, NativeFunction)
+    Lox.run("print double(21);")
+    assert capsys.readouterr().out == "42\n"
+
+
+def test_standard_natives_are_registered(lox):
+    natives = Lox.interpreter.globals.natives
+    for name in ("clock", "len", "substring", "array", "map", "next", "spawn"):
+        assert Lox.interpreter.globals.values[name] is natives[name]
+
+
+def test_frames_carry_no_registry():
+    assert not hasattr(Environment(), "natives")
+
+
+def test_native_arity_is_checked(outcome):
+    output, code = outcome('print len("a", "b");')
+    assert code == 70
+    assert "Expected 1 arguments but got 2." in output
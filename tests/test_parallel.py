@@ -0,0 +1,62 @@
+SPIN = """
+var total = 0;
+parallel (sum total) for (var i = 0; i < 8; i = i + 1) {
+  var j = 0;
+  while (j < 20000) j = j + 1;
+  total = total + j;
+}
+print total;
+"""
+
+RECURSE = """
+fun f(n) { if (n == 0) return 0; return 1 + f(n - 1); }
+var total = 0;
+parallel (sum total) for (var i = 0; i < 4; i = i + 1) total = total + f(30);
+print total;
+"""
+
+
+def test_sum_reduction(run):
+    assert run(SPIN) == "160000\n"
+
+
+def test_chunks_share_the_step_budget(outcome):
+    output, code = outcome(SPIN, "--max-steps=5000")
+    assert code == 124
+    assert "Execution budget of 5000 steps exhausted." in output
+    assert "160000" not in output
+
+
+def test_chunk_steps_are_charged_back(outcome):
+    # No single chunk runs out, but all of them together do.
+    output, code = outcome(SPIN, "--max-steps=100000")
+    assert code == 124
+    assert "Execution budget of 100000 steps exhausted." in output
+
+
+def test_chunks_keep_to_the_time_limit(outcome):
+    source = SPIN.replace("20000", "10000000")
+    output, code = outcome(source, "--time-limit=0.2")
+    assert code == 124
+    assert "Execution time limit of 0.2 seconds exceeded." in output
+
+
+def test_chunks_keep_to_the_depth_limit(outcome, run):
+    assert run(RECURSE, "--max-depth=40") == "120\n"
+    output, code = outcome(RECURSE, "--max-depth=20")
+    assert code == 124
+    assert "Call depth limit of 20 exceeded." in output
+
+
+def test_worker_failures_are_runtime_errors(outcome, tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("a\n")
+    source = f"""
+var files = nil;
+parallel (collect files) for (var i = 0; i < 2; i = i + 1) files = open("{path}", "r");
+print files;
+"""
+    output, code = outcome(source)
+    assert code == 70
+    assert output.startswith("parallel worker failed: Cannot snapshot")
+    assert "[line 3]" in output
@@ -0,0 +1,74 @@
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import Scanner
+from ErrorReporter import Diagnostics, ErrorHandling
+from ParallelScanner import ParallelScanner
+
+LINES = [
+    'var total{0} = {0} * 2.5 + counter;',
+    'print "line {0} of a\nmulti-line string";',
+    '/* block comment {0}\n   spanning\n   lines */',
+    'if (total{0} >= 10) {{ total{0} = total{0} - 1; }} // trailing "quote',
+    'fun helper{0}(a, b) {{ return a[0] + b; }} // /* not a comment',
+]
+
+
+def generated(lines: int) -> str:
+    return "\n".join(LINES[i % len(LINES)].format(i) for i in range(lines))
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(2) as executor:
+        yield executor
+
+
+# Scans with the given scanner under a fresh error log and returns the
+# tokens as plain tuples along with the printed errors.
+def scanned(scan, limit: int = Diagnostics.DEFAULT_LIMIT):
+    ErrorHandling.hadError = False
+    ErrorHandling.diagnostics = Diagnostics(limit)
+    tokens = [(token.type, token.lexeme, token.literal, token.line) for token in scan()]
+    errors = io.StringIO()
+    ErrorHandling.diagnostics.flush(errors)
+    return tokens, errors.getvalue()
+
+
+def both(executor, monkeypatch, source: str, limit: int = Diagnostics.DEFAULT_LIMIT):
+    # Small chunks, so that even short sources are split.
+    monkeypatch.setattr(ParallelScanner, "MIN_CHUNK", 64)
+    scanner = ParallelScanner(source, executor, 4)
+    assert len(scanner.chunks()) > 1
+    return (scanned(lambda: Scanner.Scanner(source).scanTokens(), limit),
+            scanned(scanner.scanTokens, limit))
+
+
+def test_tokens_match_the_serial_scan(lox, executor, monkeypatch):
+    serial, parallel = both(executor, monkeypatch, generated(200))
+    assert parallel == serial
+    assert serial[1] == ""
+
+
+def test_errors_match_the_serial_scan(lox, executor, monkeypatch):
+    source = generated(60) + "\nvar a = @;\n" + generated(60) + "\nprint # $;\n" + generated(5) + '\nprint "open'
+    serial, parallel = both(executor, monkeypatch, source)
+    assert parallel == serial
+    assert "Unexpected character." in serial[1] and "Unterminated string." in serial[1]
+
+
+def test_error_cap_cuts_tokens_where_the_serial_scan_stops(lox, executor, monkeypatch):
+    source = "\n".join(f"var a{i} = @;\n" + generated(10) for i in range(20))
+    serial, parallel = both(executor, monkeypatch, source, limit=3)
+    assert parallel == serial
+    assert "Too many errors; stopped after 3." in serial[1]
+
+
+def test_chunks_cover_the_source_in_order(monkeypatch):
+    monkeypatch.setattr(ParallelScanner, "MIN_CHUNK", 64)
+    source = generated(100)
+    chunks = ParallelScanner(source, None, 4).chunks()
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(source)
+    assert all(left[1] == right[0] for left, right in zip(chunks, chunks[1:]))
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+import Scanner
+from AstPrinter import AstPrinter
+from ErrorReporter import Diagnostics, ErrorHandling
+from Parser import Parser
+from PrattParser import PrattParser
+
+SOURCES = [
+    "print 1 + 2 * 3 - 4 / 5;",
+    "print (1 + 2) * -(3 - 4);",
+    "print !!true == !false != nil;",
+    "print 1 < 2 and 3 >= 4 or 5 <= 6 and !(7 > 8);",
+    "var a; var b; a = b = 3; print a ? b : a ? 1 : 2;",
+    "var m = map(); m[\"k\"] = array(2)[0]; print m[\"k\"];",
+    "fun f(x) { return x; } print f(1)(2)(3) + f(-f(2))[0];",
+    "fun g() { var x = yield 1 + 2; yield; yield (x); }",
+    "for (var i = 0; i < 10; i = i + 1) { if (i == 2) print i; else if (i == 3) print -i; }",
+    "print ---1 - -2;",
+]
+
+ERRORS = [
+    "print 1 +;",
+    "print (1 + 2;",
+    "1 + 2 = 3;",
+    "print ;",
+    "print a ? b;",
+]
+
+
+def parse(parserClass: type, source: str):
+    ErrorHandling.diagnostics = Diagnostics()
+    ErrorHandling.hadError = False
+    output = io.StringIO()
+    ErrorHandling.output = output
+    try:
+        statements = parserClass(Scanner.Scanner(source).scanTokens()).parse()
+        ErrorHandling.flush()
+    finally:
+        ErrorHandling.output = None
+    tree = io.StringIO()
+    AstPrinter(tree, "json").write([statement for statement in statements if statement is not None])
+    return tree.getvalue(), output.getvalue(), ErrorHandling.hadError
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_trees_match_recursive_descent(source):
+    pratt = parse(PrattParser, source)
+    assert not pratt[2], pratt[1]
+    assert pratt == parse(Parser, source)
+
+
+@pytest.mark.parametrize("source", ERRORS)
+def test_errors_match_recursive_descent(source):
+    pratt = parse(PrattParser, source)
+    assert pratt[2]
+    assert pratt == parse(Parser, source)
@@ -0,0 +1,34 @@
+import Scanner
+from ErrorReporter import Diagnostics, ErrorHandling
+from PrattParser import PrattParser
+from PurityChecker import PurityChecker
+
+
+# Reasons the last function in source cannot be memoized.
+def violations(source: str) -> list:
+    parser = PrattParser(Scanner.Scanner(source).scanTokens())
+    statements = parser.parse()
+    ErrorHandling.diagnostics = Diagnostics()
+    ErrorHandling.hadError = False
+    return [reason for _, reason in PurityChecker(parser.functions).check(statements[-1])]
+
+
+def test_call_to_printing_function_is_impure():
+    source = "fun shout(x) { print x; return x; } memo fun f(x) { return shout(x); }"
+    assert violations(source) == ["calls 'shout', which is not a memo function"]
+
+
+def test_mutating_natives_are_impure():
+    assert violations("memo fun f(a) { fill(a, 1); return 1; }") == ["calls 'fill', which is not known to be pure"]
+    assert violations('memo fun f(m) { set(m, "k", 1); return 1; }') == ["calls 'set', which is not known to be pure"]
+
+
+def test_calls_through_parameters_are_impure():
+    assert violations("memo fun f(g) { return g(1); }") == ["calls 'g', which cannot be checked"]
+
+
+def test_memo_functions_local_functions_and_pure_natives_are_allowed():
+    source = ("memo fun half(n) { return n / 2; }"
+              " memo fun f(n) { fun twice(k) { return k * 2; }"
+              " if (n < 2) return n; return f(n - 1) + half(n) + twice(n) + len(\"ab\") + sum(array(2)); }")
+    assert violations(source) == []
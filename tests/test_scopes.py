@@ -0,0 +1,67 @@
+import Scanner
+from Interpreter import Interpreter
+from Parser import Parser
+from ScopeAnalyzer import ScopeAnalyzer
+
+
+def analyzed(source: str):
+    interpreter = Interpreter()
+    statements = Parser(Scanner.Scanner(source).scanTokens()).parse()
+    ScopeAnalyzer(interpreter).analyze(statements)
+    return interpreter, statements
+
+
+def test_blocks_are_classified():
+    interpreter, (empty, pooled, capturing) = analyzed(
+        "{ print 1; } { var a = 1; print a; } { var b = 2; fun f() { return b; } }")
+    assert empty in interpreter.flatBlocks
+    assert pooled in interpreter.blockPools and pooled not in interpreter.flatBlocks
+    assert capturing not in interpreter.blockPools and capturing not in interpreter.flatBlocks
+
+
+def test_flat_block_shares_the_enclosing_scope(run):
+    assert run("var a = 1; { a = a + 1; { print a; } } print a;") == "2\n2\n"
+
+
+def test_pooled_frame_is_cleared_between_runs(run):
+    source = """
+for (var i = 0; i < 3; i = i + 1) {
+  var seen;
+  print seen;
+  seen = i;
+}
+"""
+    assert run(source) == "nil\nnil\nnil\n"
+
+
+def test_pooled_block_shadows_and_restores(run):
+    source = "var a = \"outer\"; for (var i = 0; i < 2; i = i + 1) { var a = i; print a; } print a;"
+    assert run(source) == "0\n1\nouter\n"
+
+
+def test_closures_keep_their_own_frames(run):
+    source = """
+var fns = map();
+for (var i = 0; i < 3; i = i + 1) {
+  var x = i * 10;
+  fun f() { return x; }
+  fns[i] = f;
+}
+print fns[0]() + fns[1]() + fns[2]();
+"""
+    assert run(source) == "30\n"
+
+
+def test_recursion_through_a_pooled_block(run):
+    source = """
+fun depth(n) {
+  if (n > 0) {
+    var inner = depth(n - 1);
+    var mine = n;
+    return inner + mine;
+  }
+  return 0;
+}
+print depth(5);
+"""
+    assert run(source) == "15\n"
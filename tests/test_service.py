@@ -0,0 +1,97 @@
+import asyncio
+
+from LoxService import LoxService, Worker
+
+
+async def serve(test, workers: int = 1, timeout: float = 5.0):
+    service = LoxService(workers, 4, timeout)
+    service.idle = asyncio.Queue()
+    pool = [Worker() for _ in range(workers)]
+    for worker in pool:
+        service.idle.put_nowait(worker)
+    try:
+        await test(service)
+    finally:
+        while not service.idle.empty():
+            service.idle.get_nowait().kill()
+
+
+def test_dead_worker_is_replaced():
+    async def test(service):
+        worker = service.idle.get_nowait()
+        worker.process.kill()
+        worker.process.join()
+        service.idle.put_nowait(worker)
+        status, _ = await service.evaluate("print 1;")
+        assert status == 500
+        status, result = await service.evaluate("print 2;")
+        assert (status, result["output"]) == (200, "2\n")
+
+    asyncio.run(serve(test))
+
+
+def test_cancelled_request_does_not_leak_its_reply():
+    async def test(service):
+        slow = asyncio.create_task(service.evaluate("var n = 0; while (n < 100000000) n = n + 1; print n;"))
+        await asyncio.sleep(0.2)
+        slow.cancel()
+        status, result = await service.evaluate("print 2;")
+        assert (status, result["output"]) == (200, "2\n")
+
+    asyncio.run(serve(test))
+
+
+def request(text: str) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(text.encode())
+    reader.feed_eof()
+    return reader
+
+
+def test_evaluate_reports_output_and_exit_code(lox):
+    assert Worker.evaluate("print 1 + 2;") == {"output": "3\n", "diagnostics": "", "exitCode": 0}
+    result = Worker.evaluate("print 1;\nprint nil + 1;")
+    assert (result["output"], result["exitCode"]) == ("1\n", 70)
+    assert result["diagnostics"].endswith("[line 2]\n")
+    assert Worker.evaluate("print ;")["exitCode"] == 65
+
+
+def test_slow_request_times_out_and_its_worker_is_replaced():
+    async def test(service):
+        status, result = await service.evaluate("while (true) {}")
+        assert status == 504
+        assert result["error"] == "Evaluation exceeded 0.5 seconds."
+        status, result = await service.evaluate("print 3;")
+        assert (status, result["output"]) == (200, "3\n")
+
+    asyncio.run(serve(test, timeout=0.5))
+
+
+def test_full_queue_is_rejected():
+    async def test(service):
+        service.waiting = service.maxQueue
+        status, result = await service.evaluate("print 1;")
+        assert (status, result) == (503, {"error": "Too many queued requests."})
+        service.waiting = 0
+        await service.evaluate("print 1;")
+        metrics = service.metrics.snapshot(service.waiting, service.running)
+        assert metrics["counts"] == {"rejected": 1, "completed": 1}
+        assert (metrics["queueDepth"], metrics["running"]) == (0, 0)
+
+    asyncio.run(serve(test))
+
+
+def test_routes():
+    async def test(service):
+        status, result = await service.route(request(
+            "POST /eval HTTP/1.1\r\nContent-Length: 9\r\n\r\nprint 4;\n"))
+        assert (status, result["output"]) == (200, "4\n")
+        status, metrics = await service.route(request("GET /metrics HTTP/1.1\r\n\r\n"))
+        assert (status, metrics["counts"]) == (200, {"completed": 1})
+        assert (await service.route(request("GET /eval HTTP/1.1\r\n\r\n")))[0] == 405
+        assert (await service.route(request("GET /other HTTP/1.1\r\n\r\n")))[0] == 404
+        status, _ = await service.route(request(
+            f"POST /eval HTTP/1.1\r\nContent-Length: {LoxService.MAX_BODY + 1}\r\n\r\n"))
+        assert status == 413
+
+    asyncio.run(serve(test))
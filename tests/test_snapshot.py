@@ -0,0 +1,80 @@
+import contextlib
+import io
+
+import pytest
+
+from Lox import Lox
+from Snapshot import Snapshot
+
+
+# Runs a source as a script in a fresh interpreter, as a new process
+# would, and returns what it printed and its exit code.
+@pytest.fixture
+def script(lox):
+    options = dict(Lox.options)
+
+    def script(source: str, *args: str):
+        Lox.options.update(options)
+        assert Lox.parseFlags(list(args)) == []
+        Lox.reset()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = Lox.runScript(source)
+        return output.getvalue(), code
+
+    return script
+
+
+SETUP = """
+var greeting = "hi";
+var table = map();
+table["n"] = 2;
+fun scale(x) { return x * table["n"]; }
+fun counter() { var n = 0; fun inc() { n = n + 1; return n; } return inc; }
+var tick = counter();
+tick();
+"""
+
+
+def test_globals_round_trip(script, tmp_path):
+    path = tmp_path / "warm.snap"
+    assert script(SETUP, f"--save-snapshot={path}") == ("", 0)
+    output, code = script("print greeting; print scale(21); print tick(); print len(greeting);", f"--load-snapshot={path}")
+    assert code == 0
+    assert output.splitlines() == ["hi", "42", "2", "2"]
+
+
+def test_failed_script_is_not_saved(script, tmp_path):
+    path = tmp_path / "warm.snap"
+    assert script("var a = 1; print nil + 1;", f"--save-snapshot={path}")[1] == 70
+    assert not path.exists()
+
+
+def test_open_file_cannot_be_saved(script, tmp_path):
+    data = tmp_path / "data.txt"
+    data.write_text("x\n")
+    output, code = script(f'var f = open("{data}", "r");', f"--save-snapshot={tmp_path / 'warm.snap'}")
+    assert code == 70
+    assert output.startswith("Cannot save snapshot: Cannot snapshot <file")
+
+
+def test_missing_snapshot(script, tmp_path):
+    output, code = script("print 1;", f"--load-snapshot={tmp_path / 'missing.snap'}")
+    assert code == 66
+    assert output.startswith("Cannot read snapshot:")
+
+
+@pytest.mark.parametrize("damage, message", [
+    (lambda data: b"NOTASNAP" + data[8:], "is not a Lox snapshot."),
+    (lambda data: data[:len(Snapshot.MAGIC) + 2], "has a corrupt header"),
+    (lambda data: data.replace(Snapshot.version().encode(), b"0" * 16), "was written by a different interpreter version."),
+    (lambda data: data[:-8], "is corrupt"),
+])
+def test_damaged_snapshot(script, tmp_path, damage, message):
+    path = tmp_path / "warm.snap"
+    script(SETUP, f"--save-snapshot={path}")
+    path.write_bytes(damage(path.read_bytes()))
+    output, code = script("print greeting;", f"--load-snapshot={path}")
+    assert code == 65
+    assert output.startswith("Invalid snapshot:")
+    assert message in output
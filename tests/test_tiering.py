@@ -0,0 +1,47 @@
+import pytest
+
+import LoopTier
+from Lox import Lox
+
+SHORT_LOOPS = ("fun sum(k) { var s = 0; var i = 0; while (i < k) { s = s + i; i = i + 1; } return s; }"
+               " var n = 0; var r = 0; while (r < 500) { n = n + sum(20); r = r + 1; } print n;")
+
+SOURCES = {
+    "counting loop": "var n = 0; var i = 0; while (i < 5000) { n = n + i * 2; i = i + 1; } print n;",
+    "short loops": SHORT_LOOPS,
+    "nested loops": ("var n = 0; for (var i = 0; i < 60; i = i + 1) {"
+                     " for (var j = 0; j < 60; j = j + 1) { var p = i * j; if (p > 100) n = n + p; } } print n;"),
+    "deoptimizes to strings": ("var v = 0; var i = 0; while (i < 1000) { if (i == 600) v = \"s\"; v = v + 1; i = i + 1; }"
+                               " print v;"),
+    "globals change between runs": ("var scale = 1; fun f() { var s = 0; for (var i = 0; i < 100; i = i + 1) s = s + scale;"
+                                    " return s; } var t = 0; for (var r = 0; r < 20; r = r + 1) { scale = r; t = t + f(); }"
+                                    " print t;"),
+    "recursion re-enters the loop": ("fun f(d) { var s = 0; for (var i = 0; i < 300; i = i + 1) {"
+                                     " if (d > 0 and i == 150) s = s + f(d - 1); s = s + 1; } return s; } print f(3);"),
+    "invariant hoisted in a hot loop": ("var w = 3; fun f(k) { var s = 0; for (var i = 0; i < 40; i = i + 1) s = s + w * k;"
+                                        " return s; } var t = 0; for (var r = 0; r < 50; r = r + 1) t = t + f(r); print t;"),
+}
+
+
+@pytest.mark.parametrize("name", SOURCES)
+@pytest.mark.parametrize("loopOpt", [(), ("--no-loop-opt",)])
+def test_tiered_matches_tree_walker(run, name, loopOpt):
+    source = SOURCES[name]
+    assert run(source, *loopOpt) == run(source, "--no-tiering", *loopOpt)
+
+
+def test_runtime_error_in_compiled_loop(outcome):
+    source = "var i = 0; var x = 1; while (i < 1000) { if (i == 900) x = nil; i = i + x; } print i;"
+    assert outcome(source) == outcome(source, "--no-tiering")
+    assert outcome(source)[1] == 70
+
+
+def test_short_loop_is_promoted_and_compiled_once(run, monkeypatch):
+    compiled = []
+    compile = LoopTier.LoopCompiler.compile
+    monkeypatch.setattr(LoopTier.LoopCompiler, "compile", lambda self: compiled.append(self) or compile(self))
+    assert run(SHORT_LOOPS, "--no-loop-opt") == "95000\n"
+    tiering = Lox.interpreter.tiering
+    # The inner loop runs 20 iterations a call, well under the threshold.
+    assert len(tiering.compiled) == 2
+    assert len(compiled) == 2
@@ -25,18 +25,25 @@ class GenerateAst:
             "Binary   -> left: Expr, operator: Token, right: Expr",
             "Call     -> callee: Expr, paren: Token, arguments: List[Expr]", 
             "Grouping -> expression: Expr",
+            "Index    -> object: Expr, bracket: Token, index: Expr",
             "Literal  -> value: object",
             "Logical  -> left: Expr, operator: Token, right: Expr",
+            "SetIndex -> object: Expr, bracket: Token, index: Expr, value: Expr",
             "Unary    -> operator: Token, right: Expr",
-            "Variable -> name: Token"
+            "Variable -> name: Token",
+            "Yield    -> keyword: Token, value: Expr"
         ])
 
         GenerateAst.defineAst(outputDir, "Stmt", [
             "Block      -> statements: List[Stmt]",
             "Expression -> expression: Expr",
-            "If         -> condition: Expr, thenBranch: Stmt, elseBranch: Stmt",
-            "Print      -> expression: Expr",
-            "While      -> condition: Expr, body: Stmt",
+            "Function   -> name: Token, params: List[Token], body: List[Stmt], memo: int",
+            "If         -> keyword: Token, condition: Expr, thenBranch: Stmt, elseBranch: Stmt",
+            "Import     -> keyword: Token, path: Token",
+            "Parallel   -> keyword: Token, reduction: Token, target: Token, loop: Stmt",
+            "Print      -> keyword: Token, expression: Expr",
+            "Return     -> keyword: Token, value: Expr",
+            "While      -> keyword: Token, condition: Expr, body: Stmt",
             "Var        -> name: Token, initializer: Expr"
         ])
 